@@ -0,0 +1,11 @@
+"""
+App configuration for the api application.
+"""
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    """Django application configuration for the api app."""
+
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api'
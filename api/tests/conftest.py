@@ -0,0 +1,51 @@
+"""
+Pytest fixtures for the api application tests.
+
+This module provides fixtures for creating test data used in api tests.
+"""
+import pytest
+from django.contrib.auth.models import User
+
+from lettings.models import Address, Letting
+from profiles.models import Profile
+
+
+@pytest.fixture
+def lettings_batch():
+    """
+    Create three Letting instances with their addresses.
+
+    Returns:
+        list: The created lettings, in ID order.
+    """
+    lettings = []
+    for number, city in enumerate(["Springfield", "Shelbyville", "Ogdenville"], 1):
+        address = Address.objects.create(
+            number=number,
+            street="Main Street",
+            city=city,
+            state="IL",
+            zip_code=62701,
+            country_iso_code="USA",
+        )
+        lettings.append(
+            Letting.objects.create(title=f"Letting {number}", address=address)
+        )
+    return lettings
+
+
+@pytest.fixture
+def profile():
+    """
+    Create a test Profile instance with its user.
+
+    Returns:
+        Profile: A test profile object.
+    """
+    user = User.objects.create_user(
+        username="testuser",
+        first_name="Ada",
+        last_name="Lovelace",
+        email="ada@example.com",
+    )
+    return Profile.objects.create(user=user, favorite_city="London")
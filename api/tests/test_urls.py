@@ -0,0 +1,38 @@
+"""
+Tests for the api application URLs.
+
+This module contains tests for URL resolution in the api app.
+"""
+import pytest
+from django.urls import reverse, resolve
+
+from api import views
+
+
+@pytest.mark.django_db
+class TestApiUrls:
+    """Tests for the api URL configuration."""
+
+    def test_lettings_url_resolves(self):
+        """Test that the lettings list URL resolves to the correct view."""
+        url = reverse("api:lettings")
+        assert url == "/api/lettings/"
+        assert resolve(url).func == views.lettings
+
+    def test_nearby_lettings_url_resolves(self):
+        """Test that the nearby lettings URL resolves to the correct view."""
+        url = reverse("api:lettings-nearby")
+        assert url == "/api/lettings/nearby/"
+        assert resolve(url).func == views.nearby_lettings
+
+    def test_letting_url_resolves(self):
+        """Test that the letting detail URL resolves to the correct view."""
+        url = reverse("api:letting", args=[1])
+        assert url == "/api/lettings/1/"
+        assert resolve(url).func == views.letting
+
+    def test_profile_url_resolves(self):
+        """Test that the profile detail URL resolves to the correct view."""
+        url = reverse("api:profile", args=["testuser"])
+        assert url == "/api/profiles/testuser/"
+        assert resolve(url).func == views.profile
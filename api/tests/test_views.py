@@ -0,0 +1,293 @@
+"""
+Tests for the api application views.
+
+This module contains integration tests for the JSON API endpoints.
+"""
+import json
+
+import pytest
+from django.urls import reverse
+
+
+def get_json(response):
+    """
+    Decode the JSON body of a regular or streaming response.
+
+    Args:
+        response: The HTTP response.
+
+    Returns:
+        The decoded JSON document.
+    """
+    if response.streaming:
+        return json.loads(b"".join(response.streaming_content))
+    return json.loads(response.content)
+
+
+@pytest.mark.django_db
+class TestLettingsListEndpoint:
+    """Tests for the streaming lettings list endpoint."""
+
+    def test_list_is_streamed(self, client, lettings_batch):
+        """
+        Test that the list is a streaming JSON response with every letting.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        response = client.get(reverse("api:lettings"))
+        assert response.streaming
+        assert response["Content-Type"] == "application/json"
+        data = get_json(response)
+        assert [row["title"] for row in data["results"]] == [
+            "Letting 1", "Letting 2", "Letting 3"
+        ]
+        assert data["results"][0]["city"] == "Springfield"
+        assert data["next"] is None
+
+    def test_keyset_pagination(self, client, lettings_batch):
+        """
+        Test that the next link of a page leads to the following rows.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        data = get_json(client.get(reverse("api:lettings"), {"limit": 2}))
+        assert data["count"] == 2
+        data = get_json(client.get(data["next"]))
+        assert [row["id"] for row in data["results"]] == [lettings_batch[2].id]
+        assert data["next"] is None
+
+    def test_field_selection(self, client, lettings_batch):
+        """
+        Test that only the requested fields, plus the ID, are returned.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        data = get_json(client.get(reverse("api:lettings"), {"fields": "title,city"}))
+        assert data["results"][0] == {
+            "id": lettings_batch[0].id,
+            "title": "Letting 1",
+            "city": "Springfield",
+        }
+
+    def test_field_selection_is_kept_in_next_link(self, client, lettings_batch):
+        """
+        Test that the next link keeps the field selection.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        data = get_json(client.get(reverse("api:lettings"), {"fields": "city", "limit": 1}))
+        assert "fields=id%2Ccity" in data["next"]
+
+    def test_list_runs_a_single_query(
+        self, client, lettings_batch, django_assert_num_queries
+    ):
+        """
+        Test that a page runs a single joined query.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        with django_assert_num_queries(1):
+            get_json(client.get(reverse("api:lettings")))
+
+    @pytest.mark.parametrize(
+        "params", [{"fields": "title,price"}, {"limit": "0"}, {"limit": "abc"}]
+    )
+    def test_invalid_parameters(self, client, params):
+        """
+        Test that invalid parameters return a 400 JSON error.
+
+        Args:
+            client: The Django test client.
+            params: The invalid query string parameters.
+        """
+        response = client.get(reverse("api:lettings"), params)
+        assert response.status_code == 400
+        assert "error" in get_json(response)
+
+    def test_limit_is_capped(self, client, settings, lettings_batch):
+        """
+        Test that the limit cannot exceed API_MAX_PAGE_SIZE.
+
+        Args:
+            client: The Django test client.
+            settings: The pytest-django settings fixture.
+            lettings_batch: The lettings_batch fixture.
+        """
+        settings.API_MAX_PAGE_SIZE = 2
+        data = get_json(client.get(reverse("api:lettings"), {"limit": 1000}))
+        assert data["count"] == 2
+
+
+@pytest.mark.django_db
+class TestLettingDetailEndpoint:
+    """Tests for the letting detail endpoint."""
+
+    def test_letting_detail(self, client, lettings_batch):
+        """
+        Test that a letting is returned with its address.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        letting = lettings_batch[1]
+        data = get_json(client.get(reverse("api:letting", args=[letting.id])))
+        assert data["title"] == "Letting 2"
+        assert data["city"] == "Shelbyville"
+        assert data["zip_code"] == 62701
+
+    def test_letting_detail_fields(self, client, lettings_batch):
+        """
+        Test that the detail endpoint honours the field selection.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        url = reverse("api:letting", args=[lettings_batch[0].id])
+        assert get_json(client.get(url, {"fields": "state"})) == {"state": "IL"}
+
+    def test_letting_not_found(self, client):
+        """
+        Test that a missing letting returns a 404 JSON error.
+
+        Args:
+            client: The Django test client.
+        """
+        response = client.get(reverse("api:letting", args=[999]))
+        assert response.status_code == 404
+        assert "error" in get_json(response)
+
+    def test_letting_detail_conditional_get(self, client, lettings_batch):
+        """
+        Test that an unchanged letting answers 304 Not Modified.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        url = reverse("api:letting", args=[lettings_batch[0].id])
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+@pytest.mark.django_db
+class TestProfileDetailEndpoint:
+    """Tests for the profile detail endpoint."""
+
+    def test_profile_detail(self, client, profile):
+        """
+        Test that a profile is returned with its user details.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+        """
+        data = get_json(client.get(reverse("api:profile", args=["testuser"])))
+        assert data == {
+            "username": "testuser",
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "email": "ada@example.com",
+            "favorite_city": "London",
+        }
+
+    def test_profile_detail_fields(self, client, profile):
+        """
+        Test that the profile endpoint honours the field selection.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+        """
+        url = reverse("api:profile", args=["testuser"])
+        assert get_json(client.get(url, {"fields": "favorite_city"})) == {
+            "favorite_city": "London"
+        }
+
+    def test_profile_invalid_fields(self, client, profile):
+        """
+        Test that an unknown field returns a 400 JSON error.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+        """
+        url = reverse("api:profile", args=["testuser"])
+        assert client.get(url, {"fields": "password"}).status_code == 400
+
+    def test_profile_not_found(self, client):
+        """
+        Test that a missing profile returns a 404 JSON error.
+
+        Args:
+            client: The Django test client.
+        """
+        response = client.get(reverse("api:profile", args=["nobody"]))
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestNearbyLettingsEndpoint:
+    """Tests for the nearby lettings endpoint."""
+
+    def test_nearby_by_zip_code(self, client, lettings_batch):
+        """
+        Test that geocoded lettings are listed by distance to a zip code.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        for offset, letting in zip((0.02, 0.01), lettings_batch[:2]):
+            letting.address.latitude = 39.8003 + offset
+            letting.address.longitude = -89.6497
+            letting.address.save()
+        response = client.get(reverse("api:lettings-nearby"), {"zip_code": 62701})
+        data = response.json()
+        assert [row["id"] for row in data["results"]] == [
+            lettings_batch[1].id, lettings_batch[0].id
+        ]
+        assert data["results"][0]["distance_km"] == pytest.approx(1.112, abs=0.01)
+
+    def test_nearby_by_coordinates(self, client, lettings_batch):
+        """
+        Test that a point can be given instead of a zip code.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        response = client.get(reverse("api:lettings-nearby"), {"lat": 40, "lng": -89})
+        assert response.json() == {"origin": {"lat": 40.0, "lng": -89.0}, "results": []}
+
+    @pytest.mark.parametrize("query, status", [
+        ({}, 400),
+        ({"zip_code": "abc"}, 400),
+        ({"lat": "north", "lng": "0"}, 400),
+        ({"lat": "91", "lng": "0"}, 400),
+        ({"zip_code": "1"}, 404),
+    ])
+    def test_invalid_origin(self, client, query, status):
+        """
+        Test that a missing, malformed or unknown origin is rejected.
+
+        Args:
+            client: The Django test client.
+            query: The query string parameters.
+            status: The expected status code.
+        """
+        response = client.get(reverse("api:lettings-nearby"), query)
+        assert response.status_code == status
+        assert "error" in response.json()
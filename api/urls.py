@@ -0,0 +1,19 @@
+"""
+URL configuration for the api application.
+
+This module defines the URL patterns of the read-only JSON API,
+including the lettings list, the nearby lettings search and the letting
+and profile detail endpoints.
+"""
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('lettings/', views.lettings, name='lettings'),
+    path('lettings/nearby/', views.nearby_lettings, name='lettings-nearby'),
+    path('lettings/<int:letting_id>/', views.letting, name='letting'),
+    path('profiles/<str:username>/', views.profile, name='profile'),
+]
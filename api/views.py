@@ -0,0 +1,309 @@
+"""
+Views for the api application.
+
+This module contains the read-only JSON endpoints for lettings and
+profiles. The lettings list is streamed row by row with keyset
+pagination, and every endpoint accepts a ``fields`` parameter so that
+clients only pay for the columns they need.
+"""
+
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import urlencode
+
+from lettings.geo import nearest_lettings, zip_code_centroid
+from lettings.models import Letting
+from lettings.views import letting_state
+from oc_lettings_site.conditional import conditional_page
+from oc_lettings_site.pagination import parse_cursor
+from oc_lettings_site.replicas import replica_reads
+from profiles.models import Profile
+from profiles.views import profile_state
+
+logger = logging.getLogger(__name__)
+
+# Public field names mapped to their ORM lookup, in output order
+LETTING_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "number": "address__number",
+    "street": "address__street",
+    "city": "address__city",
+    "state": "address__state",
+    "zip_code": "address__zip_code",
+    "country_iso_code": "address__country_iso_code",
+}
+
+PROFILE_FIELDS = {
+    "username": "user__username",
+    "first_name": "user__first_name",
+    "last_name": "user__last_name",
+    "email": "user__email",
+    "favorite_city": "favorite_city",
+}
+
+
+class BadRequest(ValueError):
+    """Raised when a query string parameter is invalid."""
+
+
+def select_fields(request, available, required=()):
+    """
+    Return the fields requested by the ``fields`` query parameter.
+
+    Args:
+        request: The HTTP request object.
+        available: The public field names mapped to their ORM lookup.
+        required: Fields always included in the output.
+
+    Returns:
+        list: The selected public field names, in output order.
+
+    Raises:
+        BadRequest: If an unknown field is requested.
+    """
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(available)
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise BadRequest(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    requested.update(required)
+    return [name for name in available if name in requested]
+
+
+def get_limit(request):
+    """
+    Return the page size requested by the ``limit`` query parameter.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        int: The page size, capped at ``API_MAX_PAGE_SIZE``.
+
+    Raises:
+        BadRequest: If the limit is not a positive integer.
+    """
+    raw = request.GET.get("limit")
+    if raw is None:
+        return settings.API_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise BadRequest("limit must be a positive integer")
+    if limit < 1:
+        raise BadRequest("limit must be a positive integer")
+    return min(limit, settings.API_MAX_PAGE_SIZE)
+
+
+def error_response(message, status):
+    """
+    Build a JSON error response.
+
+    Args:
+        message: The error message.
+        status: The HTTP status code.
+
+    Returns:
+        JsonResponse: The error response.
+    """
+    return JsonResponse({"error": message}, status=status)
+
+
+def stream_page(rows, fields, limit, next_url):
+    """
+    Serialize a page of rows as a JSON document, one row at a time.
+
+    Args:
+        rows: An iterator of value tuples, the first value being the ID.
+        fields: The public names of the values of each row.
+        limit: The page size; one extra row means a next page exists.
+        next_url: A callable building the next page URL from a cursor.
+
+    Yields:
+        str: Chunks of the JSON document.
+    """
+    yield '{"results": ['
+    count = 0
+    last_id = None
+    has_next = False
+    for row in rows:
+        if count == limit:
+            has_next = True
+            break
+        prefix = ", " if count else ""
+        yield prefix + json.dumps(dict(zip(fields, row[1:])), cls=DjangoJSONEncoder)
+        count += 1
+        last_id = row[0]
+    next_link = next_url(last_id) if has_next else None
+    yield f'], "count": {count}, "next": {json.dumps(next_link)}}}'
+
+
+@replica_reads
+def lettings(request):
+    """
+    Stream a page of lettings as JSON.
+
+    Lettings are ordered by ID and paginated with the ``after`` cursor and
+    the ``limit`` page size. Rows are read with ``values_list().iterator()``
+    and serialized as they arrive, so the whole page is never held in
+    memory.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: The JSON page of lettings.
+    """
+    logger.info("API lettings list accessed")
+    try:
+        fields = select_fields(request, LETTING_FIELDS, required=("id",))
+        limit = get_limit(request)
+    except BadRequest as error:
+        return error_response(str(error), 400)
+    after = parse_cursor(request.GET.get("after"))
+    queryset = Letting.objects.order_by("id")
+    # Resolve the database now: the rows are read after the view returns
+    queryset = queryset.using(queryset.db)
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    rows = queryset.values_list(
+        "id", *(LETTING_FIELDS[name] for name in fields)
+    )[:limit + 1].iterator(chunk_size=settings.API_CHUNK_SIZE)
+
+    def next_url(cursor):
+        query = {"after": cursor, "limit": limit}
+        if "fields" in request.GET:
+            query["fields"] = ",".join(fields)
+        return f"{request.path}?{urlencode(query)}"
+
+    return StreamingHttpResponse(
+        stream_page(rows, fields, limit, next_url),
+        content_type="application/json",
+    )
+
+
+def get_origin(request):
+    """
+    Return the point given by the ``zip_code`` or ``lat``/``lng`` parameters.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        tuple: The latitude and longitude, or None if the zip code is unknown.
+
+    Raises:
+        BadRequest: If the parameters are missing or invalid.
+    """
+    if "zip_code" in request.GET:
+        try:
+            return zip_code_centroid(int(request.GET["zip_code"]))
+        except ValueError:
+            raise BadRequest("zip_code must be an integer")
+    try:
+        latitude = float(request.GET["lat"])
+        longitude = float(request.GET["lng"])
+    except KeyError:
+        raise BadRequest("zip_code, or lat and lng, are required")
+    except ValueError:
+        raise BadRequest("lat and lng must be numbers")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise BadRequest("lat and lng are out of range")
+    return latitude, longitude
+
+
+@replica_reads
+def nearby_lettings(request):
+    """
+    Return the lettings nearest to a zip code or a point, closest first.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        JsonResponse: The lettings with their distance in kilometres.
+    """
+    logger.info("API nearby lettings accessed")
+    try:
+        origin = get_origin(request)
+        limit = get_limit(request)
+    except BadRequest as error:
+        return error_response(str(error), 400)
+    if origin is None:
+        return error_response(f"Unknown zip code {request.GET['zip_code']}", 404)
+    results = [
+        {
+            "id": letting.id,
+            "title": letting.title,
+            "city": letting.address.city,
+            "zip_code": letting.address.zip_code,
+            "distance_km": round(letting.distance, 3),
+        }
+        for letting in nearest_lettings(*origin, limit=limit)
+    ]
+    return JsonResponse({"origin": {"lat": origin[0], "lng": origin[1]}, "results": results})
+
+
+@replica_reads
+@conditional_page(letting_state)
+def letting(request, letting_id):
+    """
+    Return a letting and its address as JSON.
+
+    Args:
+        request: The HTTP request object.
+        letting_id: The ID of the letting.
+
+    Returns:
+        JsonResponse: The letting, or a 404 error.
+    """
+    logger.info("API letting detail accessed for ID: %s", letting_id)
+    try:
+        fields = select_fields(request, LETTING_FIELDS)
+    except BadRequest as error:
+        return error_response(str(error), 400)
+    row = (
+        Letting.objects.filter(id=letting_id)
+        .values_list(*(LETTING_FIELDS[name] for name in fields))
+        .first()
+    )
+    if row is None:
+        logger.error("Letting with ID %s not found", letting_id)
+        return error_response(f"Letting with ID {letting_id} does not exist", 404)
+    return JsonResponse(dict(zip(fields, row)))
+
+
+@replica_reads
+@conditional_page(profile_state)
+def profile(request, username):
+    """
+    Return a profile and its user details as JSON.
+
+    Args:
+        request: The HTTP request object.
+        username: The username of the profile.
+
+    Returns:
+        JsonResponse: The profile, or a 404 error.
+    """
+    logger.info("API profile detail accessed for username: %s", username)
+    try:
+        fields = select_fields(request, PROFILE_FIELDS)
+    except BadRequest as error:
+        return error_response(str(error), 400)
+    row = (
+        Profile.objects.filter(user__username=username)
+        .values_list(*(PROFILE_FIELDS[name] for name in fields))
+        .first()
+    )
+    if row is None:
+        logger.error("Profile for username '%s' not found", username)
+        return error_response(f"Profile for username '{username}' does not exist", 404)
+    return JsonResponse(dict(zip(fields, row)))
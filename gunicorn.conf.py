@@ -0,0 +1,80 @@
+"""
+Gunicorn configuration of the OC Lettings project.
+
+Gunicorn reads this file from its working directory (``/app`` in the
+Docker image); the command line options of the Dockerfile complete it.
+
+With ``WEB_PRELOAD`` (the default), the master imports the application
+and warms it up (see oc_lettings_site/warmup.py) before forking the
+workers, which share its memory copy-on-write: a new worker is ready in
+a few milliseconds instead of importing Django, the admin and the views
+itself. The database connections inherited by the workers are dropped
+after the fork (see oc_lettings_site/database.py), the log listeners
+restarted (logs.py) and the metrics written to a file per process
+(metrics.py), which the master archives when the worker stops. Without
+``WEB_PRELOAD``, each worker imports the application, e.g. to reload the
+code on ``SIGHUP``.
+"""
+
+import os
+
+preload_app = os.environ.get("WEB_PRELOAD", "true").lower() in ("true", "1", "yes", "on")
+
+
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+
+
+def get_settings():
+    """Return the Django settings, loading them if the application is not preloaded."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "oc_lettings_site.settings")
+    from django.conf import settings
+
+    return settings
+
+
+def on_starting(server):
+    """
+    Delete the metrics files of a previous server.
+
+    A per-process cache is reported with several workers: the signals
+    would only evict the cached pages of the worker handling the write.
+
+    Args:
+        server: The gunicorn arbiter.
+    """
+    from oc_lettings_site.metrics import reset_metrics
+
+    settings = get_settings()
+    reset_metrics(settings.METRICS_DIR)
+    if server.cfg.workers > 1 and settings.CACHES["default"]["BACKEND"] == LOCMEM_BACKEND:
+        server.log.warning(
+            "CACHE_BACKEND=locmem with %d workers: each worker keeps its own cache "
+            "and serves stale pages after a write. Use CACHE_BACKEND=file.",
+            server.cfg.workers,
+        )
+
+
+def child_exit(server, worker):
+    """
+    Archive the metrics of a stopped worker.
+
+    Args:
+        server: The gunicorn arbiter.
+        worker: The stopped worker.
+    """
+    from oc_lettings_site.metrics import archive_process
+
+    archive_process(get_settings().METRICS_DIR, worker.pid)
+
+
+def when_ready(server):
+    """
+    Warm the preloaded application up before the workers are forked.
+
+    Args:
+        server: The gunicorn arbiter.
+    """
+    if preload_app:
+        from oc_lettings_site.warmup import warm_up
+
+        server.log.info("Application warmed up in %.0f ms", warm_up() * 1000)
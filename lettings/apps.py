@@ -9,3 +9,7 @@ class LettingsConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lettings'
+
+    def ready(self):
+        """Connect the signal handlers of the application."""
+        from . import signals  # noqa: F401
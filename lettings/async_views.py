@@ -0,0 +1,165 @@
+"""
+Async views for the lettings application.
+
+These views serve the same pages as ``lettings.views`` with the async ORM,
+so that an ASGI server runs them in its event loop instead of a thread.
+They are routed instead of the synchronous views when the
+``ASYNC_VIEWS`` setting is enabled, which ``oc_lettings_site.asgi`` does
+by default.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import render
+
+from oc_lettings_site.cache import aget_fragment_version, cache_response, fragment_context
+from oc_lettings_site.conditional import conditional_page, rows_state
+from oc_lettings_site.pagination import aget_keyset_page
+from oc_lettings_site.replicas import replica_reads
+
+from .models import Letting
+from .search import get_search_backend, parse_page_number
+from .views import get_search_query
+
+logger = logging.getLogger(__name__)
+
+
+def search(request, query):
+    """
+    Return the requested page of search results.
+
+    Args:
+        request: The HTTP request object.
+        query: The search query.
+
+    Returns:
+        SearchPage: The page of ranked results.
+    """
+    return get_search_backend().search(
+        query, parse_page_number(request.GET.get("page")), settings.LETTINGS_PAGE_SIZE
+    )
+
+
+async def get_index_page(request):
+    """
+    Return the lettings index page requested by the query string.
+
+    Like ``lettings.views.get_index_page``, the page is fetched once per
+    request and shared by the view and its conditional GET state. The
+    search backends run raw SQL, which has no async API, in a thread.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        KeysetPage or SearchPage: The requested page.
+    """
+    if hasattr(request, "lettings_page"):
+        return request.lettings_page
+    query = get_search_query(request)
+    if query:
+        request.lettings_page = await sync_to_async(search)(request, query)
+    else:
+        request.lettings_page = await aget_keyset_page(
+            request,
+            Letting.objects.only("id", "title", "updated_at"),
+            settings.LETTINGS_PAGE_SIZE,
+        )
+    return request.lettings_page
+
+
+async def index_state(request):
+    """
+    Compute the state of a lettings index page for conditional GET.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        tuple: The fingerprint and the last modification date of the page,
+        or None for search results.
+    """
+    if get_search_query(request):
+        return None
+    page = await get_index_page(request)
+    fingerprint, last_modified = rows_state((row.pk, row.updated_at) for row in page)
+    return f"{fingerprint}|{page.has_previous}|{page.has_next}", last_modified
+
+
+async def letting_state(request, letting_id):
+    """
+    Compute the state of a letting detail page for conditional GET.
+
+    Args:
+        request: The HTTP request object.
+        letting_id: The ID of the letting.
+
+    Returns:
+        tuple: The fingerprint and the last modification date of the page,
+        or None if the letting does not exist.
+    """
+    dates = await (
+        Letting.objects.filter(id=letting_id)
+        .values_list("updated_at", "address__updated_at")
+        .afirst()
+    )
+    if dates is None:
+        return None
+    return rows_state([(f"letting{letting_id}", dates[0]), ("address", dates[1])])
+
+
+@replica_reads
+@conditional_page(index_state)
+async def index(request):
+    """
+    Display a page of lettings, like ``lettings.views.index``.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        HttpResponse: The rendered lettings list template.
+    """
+    logger.info("Lettings index page accessed")
+    page = await get_index_page(request)
+    context = {
+        "lettings_list": page,
+        "page": page,
+        "query": get_search_query(request),
+        **fragment_context(await aget_fragment_version("lettings"), page),
+    }
+    return render(request, "lettings/index.html", context)
+
+
+@replica_reads
+@conditional_page(letting_state)
+@cache_response("letting", "letting_id")
+async def letting(request, letting_id):
+    """
+    Display details of a specific letting, like ``lettings.views.letting``.
+
+    Args:
+        request: The HTTP request object.
+        letting_id: The ID of the letting to display.
+
+    Returns:
+        HttpResponse: The rendered letting detail template.
+
+    Raises:
+        Http404: If no letting with the given ID exists.
+    """
+    logger.info("Letting detail page accessed for ID: %s", letting_id)
+    try:
+        letting = await Letting.objects.select_related("address").aget(id=letting_id)
+        logger.debug("Found letting: %s", letting.title)
+    except Letting.DoesNotExist:
+        logger.error("Letting with ID %s not found", letting_id)
+        raise Http404(f"Letting with ID {letting_id} does not exist")
+    context = {
+        "title": letting.title,
+        "address": letting.address,
+    }
+    return render(request, "lettings/letting.html", context)
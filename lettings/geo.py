@@ -0,0 +1,295 @@
+"""
+Geographic proximity search for the lettings application.
+
+Addresses store the latitude and longitude of their zip code centroid and
+the matching geohash, an indexed string whose prefixes are nested grid
+cells. The nearest lettings to a point are found by reading the 3x3 block
+of cells around it, at the finest precision holding enough candidates, so
+distances are only computed for a few rows. The search never goes beyond
+the block of ``COARSEST_PRECISION`` cells (about 600 km around the point),
+so a sparse area returns fewer lettings instead of ranking every row. No
+spatial extension of the database is needed.
+
+Centroids come from the CSV file named by the ``ZIP_CENTROIDS_FILE``
+setting, with ``zip_code``, ``latitude`` and ``longitude`` columns; the
+bundled ``data/zip_centroids.csv`` holds a small sample. The U.S. Census
+Gazetteer ZCTA file (``GEOID``, ``INTPTLAT``, ``INTPTLONG``, tab
+separated) is accepted too.
+"""
+
+import csv
+import functools
+import math
+import os
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Letting
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+# Precisions of the blocks read by nearest_lettings, finest first
+FINEST_PRECISION = 6
+COARSEST_PRECISION = 2
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+ZIP_CENTROIDS_PATH = os.path.join(os.path.dirname(__file__), "data", "zip_centroids.csv")
+
+# Column names of the bundled file and of the Census Gazetteer file
+CENTROID_COLUMNS = (
+    ("zip_code", "latitude", "longitude"),
+    ("GEOID", "INTPTLAT", "INTPTLONG"),
+)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Encode a point as a geohash.
+
+    Args:
+        latitude: The latitude, in degrees.
+        longitude: The longitude, in degrees.
+        precision: The number of characters of the geohash.
+
+    Returns:
+        str: The geohash of the cell holding the point.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        # Even bits split the longitude, odd bits the latitude
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """
+    Return the size of the geohash cells of a precision.
+
+    Args:
+        precision: The number of characters of the geohash.
+
+    Returns:
+        tuple: The height and the width of a cell, in degrees.
+    """
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def neighbor_cells(latitude, longitude, precision):
+    """
+    Return the geohashes of the 3x3 block of cells centred on a point.
+
+    Args:
+        latitude: The latitude, in degrees.
+        longitude: The longitude, in degrees.
+        precision: The number of characters of the geohashes.
+
+    Returns:
+        set: The geohashes of the cell of the point and of its neighbours.
+    """
+    height, width = cell_size(precision)
+    cells = set()
+    for lat_step in (-1, 0, 1):
+        lat = min(max(latitude + lat_step * height, -90.0), 90.0)
+        for lon_step in (-1, 0, 1):
+            lon = (longitude + lon_step * width + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(lat, lon, precision))
+    return cells
+
+
+def covered_radius(latitude, precision):
+    """
+    Return a distance within which every point lies in the 3x3 block of cells.
+
+    The block extends at least one cell beyond the cell of the point in
+    every direction, so this is the smallest cell dimension, in kilometres,
+    measured at the latitude of the block edge closest to a pole.
+
+    Args:
+        latitude: The latitude of the point, in degrees.
+        precision: The number of characters of the geohashes.
+
+    Returns:
+        float: The radius, in kilometres.
+    """
+    height, width = cell_size(precision)
+    edge = min(abs(latitude) + 2 * height, 90.0)
+    return min(height, width * math.cos(math.radians(edge))) * KM_PER_DEGREE
+
+
+def haversine(latitude1, longitude1, latitude2, longitude2):
+    """
+    Return the great-circle distance between two points.
+
+    Args:
+        latitude1: The latitude of the first point, in degrees.
+        longitude1: The longitude of the first point, in degrees.
+        latitude2: The latitude of the second point, in degrees.
+        longitude2: The longitude of the second point, in degrees.
+
+    Returns:
+        float: The distance, in kilometres.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (latitude1, longitude1, latitude2, longitude2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def geohash_prefix_filter(prefixes):
+    """
+    Build a filter matching the addresses whose geohash starts with a prefix.
+
+    Each prefix becomes a range on the geohash index (``>= prefix`` and
+    ``< prefix + "~"``), which every database serves with an index seek,
+    unlike ``LIKE``.
+
+    Args:
+        prefixes: The geohash prefixes.
+
+    Returns:
+        Q: The filter on ``address__geohash``.
+    """
+    condition = Q()
+    for prefix in prefixes:
+        condition |= Q(address__geohash__gte=prefix, address__geohash__lt=prefix + "~")
+    return condition
+
+
+def nearest_lettings(latitude, longitude, limit=10):
+    """
+    Return the lettings nearest to a point, closest first.
+
+    Starting from fine cells, the 3x3 block of cells around the point is
+    read at decreasing precisions until it holds ``limit`` lettings all
+    within the radius the block is known to cover, which guarantees that
+    no letting outside the block is closer. The block of
+    ``COARSEST_PRECISION`` cells is the last one read: with fewer lettings
+    in it, only these are returned.
+
+    Args:
+        latitude: The latitude, in degrees.
+        longitude: The longitude, in degrees.
+        limit: The maximum number of lettings.
+
+    Returns:
+        list: The lettings, each with a ``distance`` attribute in kilometres.
+    """
+    queryset = Letting.objects.select_related("address").exclude(address__geohash="")
+    for precision in range(FINEST_PRECISION, COARSEST_PRECISION - 1, -1):
+        cells = neighbor_cells(latitude, longitude, precision)
+        candidates = rank_by_distance(
+            queryset.filter(geohash_prefix_filter(cells)), latitude, longitude
+        )
+        if len(candidates) >= limit and (
+            candidates[limit - 1].distance <= covered_radius(latitude, precision)
+        ):
+            break
+    return candidates[:limit]
+
+
+def rank_by_distance(queryset, latitude, longitude):
+    """
+    Sort lettings by their distance to a point.
+
+    Args:
+        queryset: The lettings, with their address selected.
+        latitude: The latitude, in degrees.
+        longitude: The longitude, in degrees.
+
+    Returns:
+        list: The lettings, each with a ``distance`` attribute in kilometres.
+    """
+    lettings = list(queryset)
+    for letting in lettings:
+        letting.distance = haversine(
+            latitude, longitude, letting.address.latitude, letting.address.longitude
+        )
+    return sorted(lettings, key=lambda letting: (letting.distance, letting.pk))
+
+
+def read_centroids(path):
+    """
+    Read the zip code centroids of a CSV file.
+
+    Args:
+        path: The path of the CSV or Gazetteer file.
+
+    Returns:
+        dict: ``(latitude, longitude)`` pairs by zip code.
+
+    Raises:
+        ValueError: If the file has no known zip code and coordinate columns.
+    """
+    with open(path, encoding="utf-8", newline="") as file:
+        sample = file.readline()
+        file.seek(0)
+        delimiter = "\t" if "\t" in sample else ","
+        reader = csv.DictReader(file, delimiter=delimiter, skipinitialspace=True)
+        # Gazetteer headers may carry trailing spaces
+        fieldnames = {name.strip(): name for name in reader.fieldnames or ()}
+        for columns in CENTROID_COLUMNS:
+            if all(column in fieldnames for column in columns):
+                zip_column, lat_column, lon_column = (fieldnames[c] for c in columns)
+                break
+        else:
+            raise ValueError(f"{path}: expected zip_code, latitude and longitude columns")
+        return {
+            int(row[zip_column]): (float(row[lat_column]), float(row[lon_column]))
+            for row in reader
+        }
+
+
+def get_centroids_path():
+    """Return the path of the zip code centroid file in use."""
+    return settings.ZIP_CENTROIDS_FILE or ZIP_CENTROIDS_PATH
+
+
+@functools.lru_cache(maxsize=4)
+def load_centroids(path):
+    """
+    Read and memoize the centroids of a zip code file.
+
+    Args:
+        path: The path of the CSV or Gazetteer file.
+
+    Returns:
+        dict: ``(latitude, longitude)`` pairs by zip code.
+    """
+    return read_centroids(path)
+
+
+def zip_code_centroid(zip_code):
+    """
+    Return the coordinates of a zip code.
+
+    Args:
+        zip_code: The zip code.
+
+    Returns:
+        tuple: The latitude and longitude, or None if the zip code is unknown.
+    """
+    return load_centroids(get_centroids_path()).get(zip_code)
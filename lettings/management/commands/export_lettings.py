@@ -0,0 +1,30 @@
+"""
+Management command to export lettings with their address.
+
+The columns match those read by ``import_lettings``, plus the ID and the
+modification date.
+"""
+from lettings.models import Letting
+from oc_lettings_site.exporting import ExportCommand
+
+
+class Command(ExportCommand):
+    """Stream every letting and its address as CSV or JSON Lines."""
+
+    help = "Export lettings and their address as CSV or JSONL (optionally gzipped)."
+
+    columns = (
+        ("id", "id"),
+        ("title", "title"),
+        ("number", "address__number"),
+        ("street", "address__street"),
+        ("city", "address__city"),
+        ("state", "address__state"),
+        ("zip_code", "address__zip_code"),
+        ("country_iso_code", "address__country_iso_code"),
+        ("updated_at", "updated_at"),
+    )
+
+    def get_queryset(self):
+        """Return every letting."""
+        return Letting.objects.all()
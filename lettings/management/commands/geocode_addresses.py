@@ -0,0 +1,96 @@
+"""
+Management command to fill the coordinates of addresses from their zip code.
+
+Coordinates are read offline from a zip code centroid file: the file of
+the ``ZIP_CENTROIDS_FILE`` setting (the bundled sample by default), or any
+file with ``zip_code``, ``latitude`` and ``longitude`` columns, such as the
+U.S. Census Gazetteer ZCTA file. The
+addresses are updated with ``bulk_update`` in batches, geohash included.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from lettings.geo import encode_geohash, get_centroids_path, read_centroids
+from lettings.models import Address
+
+
+class Command(BaseCommand):
+    """Fill the latitude, longitude and geohash of addresses."""
+
+    help = "Geocode addresses from an offline zip code centroid file."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--file",
+            help="Zip code centroid file (default: the ZIP_CENTROIDS_FILE setting).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Geocode every address, not only those without coordinates.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of addresses updated per query (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        """Run the geocoding."""
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+        path = options["file"] or get_centroids_path()
+        try:
+            centroids = read_centroids(path)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read {path}: {error}")
+
+        addresses = Address.objects.only("id", "zip_code").order_by("pk")
+        if not options["all"]:
+            addresses = addresses.filter(latitude__isnull=True)
+        geocoded = 0
+        unknown = 0
+        last_id = 0
+        # Read by keyset batches: SQLite cursors see the rows being updated
+        while True:
+            batch = list(addresses.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            found = []
+            for address in batch:
+                point = centroids.get(address.zip_code)
+                if point is None:
+                    unknown += 1
+                    continue
+                address.latitude, address.longitude = point
+                address.geohash = encode_geohash(*point)
+                found.append(address)
+            geocoded += self.flush(found)
+        self.stdout.write(self.style.SUCCESS(
+            f"Geocoded {geocoded} addresses, {unknown} with an unknown zip code."
+        ))
+
+    @staticmethod
+    def flush(batch):
+        """
+        Save the coordinates of a batch of addresses.
+
+        ``bulk_update`` skips the signals, so the geohash is set by the
+        caller and ``updated_at`` is left unchanged: the pages do not show
+        coordinates.
+
+        Args:
+            batch: The addresses to update.
+
+        Returns:
+            int: The number of updated addresses.
+        """
+        if batch:
+            with transaction.atomic():
+                Address.objects.bulk_update(batch, ["latitude", "longitude", "geohash"])
+        return len(batch)
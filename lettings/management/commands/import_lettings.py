@@ -0,0 +1,310 @@
+"""
+Management command to bulk import lettings from a CSV or JSONL file.
+
+Each record holds the title of a letting and the fields of its address.
+Records are streamed from the input, validated with the model field
+validators and inserted with ``bulk_create`` in batches, each batch in its
+own transaction. After every committed batch, the number of consumed
+records is written to a checkpoint file so that an interrupted import can
+be resumed with ``--resume``.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from lettings.models import Address, Letting
+
+ADDRESS_FIELDS = ("number", "street", "city", "state", "zip_code", "country_iso_code")
+REQUIRED_FIELDS = ("title",) + ADDRESS_FIELDS
+
+
+def read_csv(stream):
+    """
+    Yield the records of a CSV stream with a header row.
+
+    Args:
+        stream: A text stream.
+
+    Yields:
+        dict: One record per data row.
+    """
+    yield from csv.DictReader(stream)
+
+
+def read_jsonl(stream):
+    """
+    Yield the records of a JSON Lines stream, ignoring blank lines.
+
+    Args:
+        stream: A text stream.
+
+    Yields:
+        dict: One record per line.
+
+    Raises:
+        CommandError: If a line is not a JSON object.
+    """
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise CommandError(f"Line {line_number}: invalid JSON ({error})")
+        if not isinstance(record, dict):
+            raise CommandError(f"Line {line_number}: expected a JSON object")
+        yield record
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+def build_letting(record):
+    """
+    Build and validate an unsaved Letting and its Address from a record.
+
+    Values are converted and checked with the field validators of the
+    models (e.g. ``MaxValueValidator``, ``MinLengthValidator``). The
+    uniqueness of the address is not checked, as the address is new.
+
+    Args:
+        record: A mapping with the title and the address fields.
+
+    Returns:
+        tuple: The unsaved Address and Letting.
+
+    Raises:
+        ValidationError: If a field is missing or invalid.
+    """
+    missing = [name for name in REQUIRED_FIELDS if record.get(name) in (None, "")]
+    if missing:
+        raise ValidationError({name: "This field is required." for name in missing})
+    address = Address(**{name: record[name] for name in ADDRESS_FIELDS})
+    address.clean_fields(exclude=["updated_at"])
+    letting = Letting(title=record["title"])
+    letting.clean_fields(exclude=["address", "updated_at"])
+    return address, letting
+
+
+class Command(BaseCommand):
+    """Import lettings and their addresses from a CSV or JSONL file."""
+
+    help = "Bulk import lettings from a CSV or JSONL file (use - for stdin)."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument("path", help="Input file, or - to read stdin.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format (default: guessed from the file extension).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of lettings inserted per transaction (default: 1000).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint file (default: <path>.checkpoint).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip the records already imported according to the checkpoint.",
+        )
+        parser.add_argument(
+            "--skip-invalid",
+            action="store_true",
+            help="Report and skip invalid records instead of stopping.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the import."""
+        path = options["path"]
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+        file_format = options["format"] or self.guess_format(path)
+        checkpoint = options["checkpoint"] or (
+            None if path == "-" else f"{path}.checkpoint"
+        )
+        if options["resume"] and checkpoint is None:
+            raise CommandError("--resume needs --checkpoint when reading stdin.")
+        if not options["resume"] and checkpoint and os.path.exists(checkpoint):
+            raise CommandError(
+                f"A checkpoint of a previous import exists ({checkpoint}): "
+                "rerun with --resume, or delete it to start over."
+            )
+        skip = self.read_checkpoint(checkpoint) if options["resume"] else 0
+
+        self.verbosity = options["verbosity"]
+        started = time.perf_counter()
+        self.imported = 0
+        self.consumed = skip
+        self.skipped = 0
+        with self.open_input(path) as stream:
+            records = READERS[file_format](stream)
+            batch = []
+            for record_number, record in enumerate(records, 1):
+                if record_number <= skip:
+                    continue
+                try:
+                    batch.append(build_letting(record))
+                except ValidationError as error:
+                    if not options["skip_invalid"]:
+                        raise CommandError(
+                            f"Record {record_number} is invalid: {self.format_error(error)}. "
+                            f"{self.imported} lettings were imported; fix the input "
+                            "and rerun with --resume."
+                        )
+                    self.skipped += 1
+                    self.stderr.write(
+                        f"Skipping record {record_number}: {self.format_error(error)}"
+                    )
+                if len(batch) >= batch_size:
+                    self.flush(batch, record_number, checkpoint, started)
+                    batch = []
+                self.consumed = record_number
+            self.flush(batch, self.consumed, checkpoint, started)
+
+        elapsed = time.perf_counter() - started
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.imported} lettings in {elapsed:.2f}s "
+            f"({self.rate(self.imported, elapsed):.0f} rows/s), "
+            f"skipped {self.skipped} invalid records."
+        ))
+
+    def flush(self, batch, consumed, checkpoint, started):
+        """
+        Insert a batch of lettings in one transaction and save the checkpoint.
+
+        Args:
+            batch: The (Address, Letting) pairs to insert.
+            consumed: The number of input records consumed so far.
+            checkpoint: The checkpoint file path, or None.
+            started: The start time of the import.
+        """
+        if batch:
+            with transaction.atomic():
+                addresses = Address.objects.bulk_create(
+                    [address for address, _ in batch]
+                )
+                lettings = []
+                for address, (_, letting) in zip(addresses, batch):
+                    letting.address = address
+                    lettings.append(letting)
+                Letting.objects.bulk_create(lettings)
+            self.imported += len(batch)
+        if checkpoint:
+            self.write_checkpoint(checkpoint, consumed)
+        elapsed = time.perf_counter() - started
+        if self.verbosity >= 2:
+            self.stdout.write(
+                f"{self.imported} lettings imported "
+                f"({self.rate(self.imported, elapsed):.0f} rows/s)"
+            )
+
+    @staticmethod
+    def guess_format(path):
+        """
+        Guess the input format from the file extension.
+
+        Args:
+            path: The input path.
+
+        Returns:
+            str: ``"csv"`` or ``"jsonl"``.
+
+        Raises:
+            CommandError: If the extension is not recognised.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            return "csv"
+        if extension in (".jsonl", ".ndjson"):
+            return "jsonl"
+        raise CommandError("Cannot guess the input format, use --format.")
+
+    @staticmethod
+    def open_input(path):
+        """
+        Open the input file, or wrap stdin, as a text stream.
+
+        Args:
+            path: The input path, or - for stdin.
+
+        Returns:
+            A text stream usable as a context manager.
+        """
+        if path == "-":
+            return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+        try:
+            return open(path, encoding="utf-8", newline="")
+        except OSError as error:
+            raise CommandError(f"Cannot open {path}: {error}")
+
+    @staticmethod
+    def read_checkpoint(checkpoint):
+        """
+        Return the number of records already imported.
+
+        Args:
+            checkpoint: The checkpoint file path.
+
+        Returns:
+            int: The number of records to skip, 0 without a checkpoint.
+        """
+        try:
+            with open(checkpoint, encoding="utf-8") as file:
+                return int(json.load(file)["consumed"])
+        except FileNotFoundError:
+            return 0
+        except (ValueError, KeyError) as error:
+            raise CommandError(f"Invalid checkpoint file {checkpoint}: {error}")
+
+    @staticmethod
+    def write_checkpoint(checkpoint, consumed):
+        """
+        Atomically save the number of records consumed.
+
+        Args:
+            checkpoint: The checkpoint file path.
+            consumed: The number of input records consumed so far.
+        """
+        temporary = f"{checkpoint}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"consumed": consumed}, file)
+        os.replace(temporary, checkpoint)
+
+    @staticmethod
+    def format_error(error):
+        """
+        Format a validation error on a single line.
+
+        Args:
+            error: The ValidationError.
+
+        Returns:
+            str: The field errors, separated by semicolons.
+        """
+        return "; ".join(
+            f"{field}: {' '.join(messages)}"
+            for field, messages in error.message_dict.items()
+        )
+
+    @staticmethod
+    def rate(rows, elapsed):
+        """Return the number of rows per second."""
+        return rows / elapsed if elapsed > 0 else 0.0
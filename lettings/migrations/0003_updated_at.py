@@ -0,0 +1,29 @@
+"""
+Add the updated_at timestamp to the Address and Letting models.
+
+Existing rows are backfilled with the date of the migration.
+"""
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0002_migrate_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='letting',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
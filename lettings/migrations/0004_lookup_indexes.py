@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='address',
+            options={'verbose_name_plural': 'addresses'},
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['state', 'city'], name='address_state_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['zip_code'], name='address_zip_code_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['country_iso_code'], name='address_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='letting',
+            index=models.Index(fields=['title'], name='letting_title_idx'),
+        ),
+    ]
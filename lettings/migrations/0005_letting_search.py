@@ -0,0 +1,131 @@
+"""
+Full-text search tables for the lettings application.
+
+This migration creates the search table used by ``lettings.search`` and
+the triggers keeping it in sync with the lettings and their addresses:
+
+- SQLite: the FTS5 virtual table ``lettings_letting_fts``, whose rowid is
+  the ID of the letting;
+- PostgreSQL: the ``lettings_letting_search`` table holding a weighted
+  ``tsvector`` per letting, with a GIN index.
+
+Existing lettings are indexed. Other database vendors are left unchanged.
+"""
+from django.db import migrations
+
+from ._search_triggers import SQLITE_DROP_TRIGGERS, SQLITE_TRIGGERS
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE lettings_letting_fts USING fts5(
+        title, street, city, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    *SQLITE_TRIGGERS,
+    """
+    INSERT INTO lettings_letting_fts (rowid, title, street, city)
+    SELECT l.id, l.title, a.street, a.city
+    FROM lettings_letting l JOIN lettings_address a ON a.id = l.address_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    *SQLITE_DROP_TRIGGERS,
+    "DROP TABLE IF EXISTS lettings_letting_fts",
+]
+
+# Title matches rank above city matches, which rank above street matches
+POSTGRESQL_DOCUMENT = """
+    setweight(to_tsvector('simple', {title}), 'A')
+    || setweight(to_tsvector('simple', a.city), 'B')
+    || setweight(to_tsvector('simple', a.street), 'C')
+"""
+
+POSTGRESQL_FORWARD = [
+    """
+    CREATE TABLE lettings_letting_search (
+        letting_id bigint PRIMARY KEY
+            REFERENCES lettings_letting (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX lettings_letting_search_document_idx
+    ON lettings_letting_search USING GIN (document)
+    """,
+    f"""
+    CREATE FUNCTION lettings_letting_search_letting() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO lettings_letting_search (letting_id, document)
+        SELECT NEW.id, {POSTGRESQL_DOCUMENT.format(title="NEW.title")}
+        FROM lettings_address a WHERE a.id = NEW.address_id
+        ON CONFLICT (letting_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER lettings_letting_search_letting
+    AFTER INSERT OR UPDATE OF title, address_id ON lettings_letting
+    FOR EACH ROW EXECUTE FUNCTION lettings_letting_search_letting()
+    """,
+    f"""
+    CREATE FUNCTION lettings_letting_search_address() RETURNS trigger AS $$
+    BEGIN
+        UPDATE lettings_letting_search s
+        SET document = {POSTGRESQL_DOCUMENT.format(title="l.title")}
+        FROM lettings_letting l, lettings_address a
+        WHERE l.address_id = NEW.id AND a.id = NEW.id AND s.letting_id = l.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER lettings_letting_search_address
+    AFTER UPDATE OF street, city ON lettings_address
+    FOR EACH ROW EXECUTE FUNCTION lettings_letting_search_address()
+    """,
+    f"""
+    INSERT INTO lettings_letting_search (letting_id, document)
+    SELECT l.id, {POSTGRESQL_DOCUMENT.format(title="l.title")}
+    FROM lettings_letting l JOIN lettings_address a ON a.id = l.address_id
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP TRIGGER IF EXISTS lettings_letting_search_address ON lettings_address",
+    "DROP TRIGGER IF EXISTS lettings_letting_search_letting ON lettings_letting",
+    "DROP FUNCTION IF EXISTS lettings_letting_search_address()",
+    "DROP FUNCTION IF EXISTS lettings_letting_search_letting()",
+    "DROP TABLE IF EXISTS lettings_letting_search",
+]
+
+FORWARD = {"sqlite": SQLITE_FORWARD, "postgresql": POSTGRESQL_FORWARD}
+BACKWARD = {"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRESQL_BACKWARD}
+
+
+def run_statements(statements):
+    """
+    Build a migration function running the SQL of the database vendor.
+
+    Args:
+        statements: The SQL statements, by database vendor.
+
+    Returns:
+        callable: A function usable by RunPython.
+    """
+    def run(_apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0004_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_statements(FORWARD), run_statements(BACKWARD)),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:50
+
+import django.core.validators
+from django.db import migrations, models
+
+from ._search_triggers import create_sqlite_triggers, drop_sqlite_triggers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0005_letting_search'),
+    ]
+
+    operations = [
+        # SQLite rebuilds lettings_address to add the fields
+        migrations.RunPython(drop_sqlite_triggers, create_sqlite_triggers),
+        migrations.AddField(
+            model_name='address',
+            name='geohash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['geohash'], name='address_geohash_idx'),
+        ),
+        migrations.RunPython(create_sqlite_triggers, drop_sqlite_triggers),
+    ]
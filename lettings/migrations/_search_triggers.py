@@ -0,0 +1,88 @@
+"""
+SQLite triggers keeping the lettings full-text search table in sync.
+
+On SQLite, Django rebuilds a table to alter it (e.g. to add a field): the
+table is copied, dropped and renamed, which breaks the triggers reading
+it. Migrations altering ``lettings_letting`` or ``lettings_address`` drop
+these triggers first and create them again afterwards, with
+``drop_sqlite_triggers`` and ``create_sqlite_triggers``.
+
+The module name starts with an underscore so the migration loader skips it.
+"""
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER lettings_letting_fts_insert AFTER INSERT ON lettings_letting
+    BEGIN
+        INSERT INTO lettings_letting_fts (rowid, title, street, city)
+        SELECT NEW.id, NEW.title, a.street, a.city
+        FROM lettings_address a WHERE a.id = NEW.address_id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_letting_fts_update
+    AFTER UPDATE OF title, address_id ON lettings_letting
+    BEGIN
+        DELETE FROM lettings_letting_fts WHERE rowid = OLD.id;
+        INSERT INTO lettings_letting_fts (rowid, title, street, city)
+        SELECT NEW.id, NEW.title, a.street, a.city
+        FROM lettings_address a WHERE a.id = NEW.address_id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_letting_fts_delete AFTER DELETE ON lettings_letting
+    BEGIN
+        DELETE FROM lettings_letting_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_address_fts_update
+    AFTER UPDATE OF street, city ON lettings_address
+    BEGIN
+        UPDATE lettings_letting_fts SET street = NEW.street, city = NEW.city
+        WHERE rowid IN (SELECT id FROM lettings_letting WHERE address_id = NEW.id);
+    END
+    """,
+]
+
+SQLITE_DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS lettings_address_fts_update",
+    "DROP TRIGGER IF EXISTS lettings_letting_fts_delete",
+    "DROP TRIGGER IF EXISTS lettings_letting_fts_update",
+    "DROP TRIGGER IF EXISTS lettings_letting_fts_insert",
+]
+
+
+def run_sqlite(statements, schema_editor):
+    """
+    Run SQL statements on SQLite databases only.
+
+    Args:
+        statements: The SQL statements.
+        schema_editor: The database schema editor.
+    """
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in statements:
+            schema_editor.execute(sql)
+
+
+def create_sqlite_triggers(_apps, schema_editor):
+    """
+    Create the full-text search triggers on SQLite.
+
+    Args:
+        apps: The app registry.
+        schema_editor: The database schema editor.
+    """
+    run_sqlite(SQLITE_TRIGGERS, schema_editor)
+
+
+def drop_sqlite_triggers(_apps, schema_editor):
+    """
+    Drop the full-text search triggers on SQLite.
+
+    Args:
+        apps: The app registry.
+        schema_editor: The database schema editor.
+    """
+    run_sqlite(SQLITE_DROP_TRIGGERS, schema_editor)
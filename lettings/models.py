@@ -5,7 +5,7 @@ This module defines the database models for managing rental property addresses
 and lettings information.
 """
 from django.db import models
-from django.core.validators import MaxValueValidator, MinLengthValidator
+from django.core.validators import MaxValueValidator, MinLengthValidator, MinValueValidator
 
 
 class Address(models.Model):
@@ -19,6 +19,10 @@ class Address(models.Model):
         state: Two-letter state code.
         zip_code: ZIP/postal code (up to 99999).
         country_iso_code: Three-letter ISO country code.
+        latitude: Latitude of the zip code centroid, if geocoded.
+        longitude: Longitude of the zip code centroid, if geocoded.
+        geohash: Geohash of the coordinates, empty if not geocoded.
+        updated_at: Date of the last modification.
     """
     number = models.PositiveIntegerField(validators=[MaxValueValidator(9999)])
     street = models.CharField(max_length=64)
@@ -30,9 +34,25 @@ class Address(models.Model):
     country_iso_code = models.CharField(
         max_length=3, validators=[MinLengthValidator(3)]
     )
+    latitude = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True, blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "addresses"
+        indexes = [
+            models.Index(fields=["state", "city"], name="address_state_city_idx"),
+            models.Index(fields=["zip_code"], name="address_zip_code_idx"),
+            models.Index(fields=["country_iso_code"], name="address_country_idx"),
+            models.Index(fields=["geohash"], name="address_geohash_idx"),
+        ]
 
     def __str__(self):
         """Return the street address as string representation."""
@@ -46,10 +66,17 @@ class Letting(models.Model):
     Attributes:
         title: The title/name of the letting.
         address: One-to-one relationship with an Address.
+        updated_at: Date of the last modification.
     """
 
     title = models.CharField(max_length=256)
     address = models.OneToOneField(Address, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["title"], name="letting_title_idx"),
+        ]
 
     def __str__(self):
         """Return the letting title as string representation."""
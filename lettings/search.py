@@ -0,0 +1,218 @@
+"""
+Full-text search over lettings for the lettings application.
+
+This module defines a common search interface with one implementation per
+database vendor:
+
+- SQLite: an FTS5 virtual table, ``lettings_letting_fts``, ranked with bm25;
+- PostgreSQL: a ``tsvector`` document table, ``lettings_letting_search``,
+  with a GIN index, ranked with ``ts_rank``;
+- other databases: an unranked ``icontains`` fallback.
+
+The search tables index the title of each letting with the street and the
+city of its address. Database triggers created by the
+``0005_letting_search`` migration keep them in sync with the models.
+"""
+
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import Letting
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Split a search query into words, dropping the search syntax characters.
+
+    Args:
+        text: The raw search query.
+
+    Returns:
+        list: The lowercase words of the query.
+    """
+    return [token.lower() for token in TOKEN.findall(text)]
+
+
+def parse_page_number(value):
+    """
+    Convert a raw page number from the query string to an integer.
+
+    Args:
+        value: The raw value of the ``page`` parameter.
+
+    Returns:
+        int: The page number, 1 if it is missing or malformed.
+    """
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return 1
+    return max(number, 1)
+
+
+class SearchPage:
+    """
+    A page of search results, in rank order.
+
+    Attributes:
+        object_list: The lettings of the page.
+        number: The page number, starting at 1.
+        has_next: True if more results exist after this page.
+    """
+
+    def __init__(self, object_list, number, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.has_next = has_next
+
+    @property
+    def has_previous(self):
+        """Return True if the page is not the first one."""
+        return self.number > 1
+
+    @property
+    def has_other_pages(self):
+        """Return True if the page has a previous or a next page."""
+        return self.has_previous or self.has_next
+
+    @property
+    def previous_page_number(self):
+        """Return the number of the previous page."""
+        return self.number - 1
+
+    @property
+    def next_page_number(self):
+        """Return the number of the next page."""
+        return self.number + 1
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class SearchBackend:
+    """
+    Base class of the lettings search backends.
+
+    Subclasses implement ``get_results``, which returns the lettings
+    matching the query words, best first.
+    """
+
+    def __init__(self, using="default"):
+        self.using = using
+
+    def search(self, text, page_number=1, page_size=50):
+        """
+        Return a page of lettings matching a search query.
+
+        Args:
+            text: The raw search query.
+            page_number: The page number, starting at 1.
+            page_size: The maximum number of lettings on the page.
+
+        Returns:
+            SearchPage: The requested page of results.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return SearchPage([], page_number, False)
+        offset = (page_number - 1) * page_size
+        # One extra row tells whether a next page exists, without COUNT(*)
+        rows = list(self.get_results(tokens, page_size + 1, offset))
+        return SearchPage(rows[:page_size], page_number, len(rows) > page_size)
+
+    def get_results(self, tokens, limit, offset):
+        """
+        Return the lettings matching every token, best first.
+
+        Args:
+            tokens: The words of the query.
+            limit: The maximum number of lettings.
+            offset: The number of lettings to skip.
+
+        Returns:
+            An iterable of Letting instances with their ID and title.
+        """
+        raise NotImplementedError
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Search backend using the FTS5 table ``lettings_letting_fts``."""
+
+    # bm25 weights of the title, street and city columns
+    SQL = (
+        "SELECT l.id, l.title, l.updated_at FROM lettings_letting_fts "
+        "JOIN lettings_letting l ON l.id = lettings_letting_fts.rowid "
+        "WHERE lettings_letting_fts MATCH %s "
+        "ORDER BY bm25(lettings_letting_fts, 10.0, 1.0, 2.0), l.id "
+        "LIMIT %s OFFSET %s"
+    )
+
+    def get_results(self, tokens, limit, offset):
+        """Match every token as a prefix, e.g. ``"spring"* "main"*``."""
+        match = " ".join(f'"{token}"*' for token in tokens)
+        return Letting.objects.using(self.using).raw(self.SQL, [match, limit, offset])
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """Search backend using the GIN-indexed ``lettings_letting_search`` table."""
+
+    SQL = (
+        "SELECT l.id, l.title, l.updated_at FROM lettings_letting_search s "
+        "JOIN lettings_letting l ON l.id = s.letting_id, "
+        "to_tsquery('simple', %s) query "
+        "WHERE s.document @@ query "
+        "ORDER BY ts_rank(s.document, query) DESC, l.id "
+        "LIMIT %s OFFSET %s"
+    )
+
+    def get_results(self, tokens, limit, offset):
+        """Match every token as a prefix, e.g. ``spring:* & main:*``."""
+        query = " & ".join(f"{token}:*" for token in tokens)
+        return Letting.objects.using(self.using).raw(self.SQL, [query, limit, offset])
+
+
+class BasicSearchBackend(SearchBackend):
+    """Unranked ``icontains`` search for the other database vendors."""
+
+    def get_results(self, tokens, limit, offset):
+        """Match every token in the title, the street or the city."""
+        queryset = Letting.objects.using(self.using).only("id", "title", "updated_at")
+        for token in tokens:
+            queryset = queryset.filter(
+                Q(title__icontains=token)
+                | Q(address__street__icontains=token)
+                | Q(address__city__icontains=token)
+            )
+        return queryset.order_by("id")[offset:offset + limit]
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(using=None):
+    """
+    Return the search backend matching a database vendor.
+
+    Args:
+        using: The database alias, by default the one the routers choose
+            to read lettings.
+
+    Returns:
+        SearchBackend: The search backend.
+    """
+    using = using or router.db_for_read(Letting)
+    vendor = connections[using].vendor
+    return BACKENDS.get(vendor, BasicSearchBackend)(using)
@@ -0,0 +1,75 @@
+"""
+Signal handlers for the lettings application.
+
+This module evicts the cached letting detail pages and the cached rows of
+the lettings index when a Letting or its Address is saved or deleted, and
+keeps the geohash of an Address in sync with its coordinates.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from oc_lettings_site.cache import bump_fragment_version, evict_responses
+
+from .geo import encode_geohash
+from .models import Address, Letting
+
+
+@receiver(pre_save, sender=Address)
+def set_address_geohash(sender, instance, **kwargs):
+    """
+    Compute the geohash of an address from its coordinates.
+
+    Args:
+        sender: The Address model class.
+        instance: The address being saved.
+        **kwargs: Additional signal arguments.
+    """
+    if instance.latitude is None or instance.longitude is None:
+        instance.geohash = ""
+    else:
+        instance.geohash = encode_geohash(instance.latitude, instance.longitude)
+
+
+@receiver([post_save, post_delete], sender=Letting)
+def evict_letting_page(sender, instance, **kwargs):
+    """
+    Evict the cached detail page of a saved or deleted letting.
+
+    Args:
+        sender: The Letting model class.
+        instance: The saved or deleted letting.
+        **kwargs: Additional signal arguments.
+    """
+    evict_responses("letting", instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Address)
+def evict_address_letting_page(sender, instance, **kwargs):
+    """
+    Evict the cached detail page of the letting located at an address.
+
+    Args:
+        sender: The Address model class.
+        instance: The saved or deleted address.
+        **kwargs: Additional signal arguments.
+    """
+    letting_ids = Letting.objects.filter(address_id=instance.pk).values_list(
+        "pk", flat=True
+    )
+    evict_responses("letting", *letting_ids)
+
+
+@receiver([post_save, post_delete], sender=Letting)
+@receiver([post_save, post_delete], sender=Address)
+def bump_lettings_fragments(sender, instance, **kwargs):
+    """
+    Invalidate the cached rows of the lettings index.
+
+    Address changes count too, as they change the search results.
+
+    Args:
+        sender: The Letting or Address model class.
+        instance: The saved or deleted instance.
+        **kwargs: Additional signal arguments.
+    """
+    bump_fragment_version("lettings")
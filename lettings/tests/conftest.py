@@ -38,3 +38,27 @@ def letting(address):
         Letting: A test letting object.
     """
     return Letting.objects.create(title="Test Letting", address=address)
+
+
+@pytest.fixture
+def lettings_batch():
+    """
+    Create five Letting instances with their addresses.
+
+    Returns:
+        list: The created lettings, in ID order.
+    """
+    lettings = []
+    for number in range(1, 6):
+        address = Address.objects.create(
+            number=number,
+            street="Oak Street",
+            city="Springfield",
+            state="IL",
+            zip_code=62701,
+            country_iso_code="USA",
+        )
+        lettings.append(
+            Letting.objects.create(title=f"Letting {number}", address=address)
+        )
+    return lettings
@@ -0,0 +1,158 @@
+"""
+Tests for the async views of the lettings application.
+
+The views are called directly, as an ASGI server would, with their async
+ORM queries run against the test database.
+"""
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import Http404
+from django.test import RequestFactory
+
+from lettings import async_views, views
+
+
+@pytest.fixture
+def rf():
+    """
+    Create a request factory.
+
+    Returns:
+        RequestFactory: A Django request factory.
+    """
+    return RequestFactory()
+
+
+@pytest.mark.django_db
+class TestAsyncLettingsIndexView:
+    """Tests for the async lettings index view."""
+
+    def test_index_lists_lettings(self, rf, settings, lettings_batch):
+        """
+        Test that the async index renders the first page of lettings.
+
+        Args:
+            rf: The request factory.
+            settings: The pytest-django settings fixture.
+            lettings_batch: Five lettings.
+        """
+        settings.LETTINGS_PAGE_SIZE = 2
+        request = rf.get("/lettings/")
+        response = async_to_sync(async_views.index)(request)
+        assert response.status_code == 200
+        assert list(request.lettings_page) == lettings_batch[:2]
+        assert request.lettings_page.next_cursor == lettings_batch[1].id
+        assert b"Letting 1" in response.content
+
+    def test_previous_page(self, rf, settings, lettings_batch):
+        """
+        Test that the ``before`` cursor is handled by the async pagination.
+
+        Args:
+            rf: The request factory.
+            settings: The pytest-django settings fixture.
+            lettings_batch: Five lettings.
+        """
+        settings.LETTINGS_PAGE_SIZE = 2
+        request = rf.get("/lettings/", {"before": lettings_batch[4].id})
+        async_to_sync(async_views.index)(request)
+        assert list(request.lettings_page) == lettings_batch[2:4]
+        assert request.lettings_page.has_previous
+
+    def test_page_runs_a_single_query(
+        self, rf, settings, lettings_batch, django_assert_num_queries
+    ):
+        """
+        Test that a page and its conditional GET state share one query.
+
+        Args:
+            rf: The request factory.
+            settings: The pytest-django settings fixture.
+            lettings_batch: Five lettings.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        settings.LETTINGS_PAGE_SIZE = 2
+        with django_assert_num_queries(1):
+            async_to_sync(async_views.index)(rf.get("/lettings/"))
+
+    def test_same_etag_as_sync_view(self, rf, lettings_batch):
+        """
+        Test that both views give the same ETag, so clients keep their copy.
+
+        Args:
+            rf: The request factory.
+            lettings_batch: Five lettings.
+        """
+        sync_response = views.index(rf.get("/lettings/"))
+        async_response = async_to_sync(async_views.index)(rf.get("/lettings/"))
+        assert async_response["ETag"] == sync_response["ETag"]
+
+    def test_unchanged_index_returns_304(self, rf, lettings_batch):
+        """
+        Test that the async index answers conditional requests.
+
+        Args:
+            rf: The request factory.
+            lettings_batch: Five lettings.
+        """
+        etag = async_to_sync(async_views.index)(rf.get("/lettings/"))["ETag"]
+        request = rf.get("/lettings/", HTTP_IF_NONE_MATCH=etag)
+        assert async_to_sync(async_views.index)(request).status_code == 304
+
+    def test_search(self, rf, lettings_batch):
+        """
+        Test that the ``q`` parameter searches the lettings.
+
+        Args:
+            rf: The request factory.
+            lettings_batch: Five lettings.
+        """
+        request = rf.get("/lettings/", {"q": "Letting 3"})
+        response = async_to_sync(async_views.index)(request)
+        assert response.status_code == 200
+        assert lettings_batch[2] in list(request.lettings_page)
+        assert not response.has_header("ETag")
+
+
+@pytest.mark.django_db
+class TestAsyncLettingDetailView:
+    """Tests for the async letting detail view."""
+
+    def test_letting_detail(self, rf, letting):
+        """
+        Test that the async detail view renders the letting and caches it.
+
+        Args:
+            rf: The request factory.
+            letting: The letting fixture.
+        """
+        view = async_to_sync(async_views.letting)
+        response = view(rf.get("/lettings/"), letting_id=letting.id)
+        assert response.status_code == 200
+        assert b"Test Letting" in response.content
+        assert response["X-Cache"] == "MISS"
+        response = view(rf.get("/lettings/"), letting_id=letting.id)
+        assert response["X-Cache"] == "HIT"
+
+    def test_unchanged_letting_returns_304(self, rf, letting):
+        """
+        Test that the async detail view answers conditional requests.
+
+        Args:
+            rf: The request factory.
+            letting: The letting fixture.
+        """
+        view = async_to_sync(async_views.letting)
+        etag = view(rf.get("/lettings/"), letting_id=letting.id)["ETag"]
+        request = rf.get("/lettings/", HTTP_IF_NONE_MATCH=etag)
+        assert view(request, letting_id=letting.id).status_code == 304
+
+    def test_unknown_letting_raises_404(self, rf):
+        """
+        Test that an unknown letting raises Http404.
+
+        Args:
+            rf: The request factory.
+        """
+        with pytest.raises(Http404):
+            async_to_sync(async_views.letting)(rf.get("/lettings/"), letting_id=999)
@@ -0,0 +1,269 @@
+"""
+Tests for the lettings application management commands.
+
+This module contains tests for the import_lettings, export_lettings and
+geocode_addresses commands.
+"""
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from lettings.models import Address, Letting
+
+CSV_HEADER = "title,number,street,city,state,zip_code,country_iso_code\n"
+
+
+def csv_row(number, title=None, state="IL"):
+    """
+    Build a CSV data row.
+
+    Args:
+        number: The street number, also used in the default title.
+        title: The title of the letting.
+        state: The state code.
+
+    Returns:
+        str: The CSV line.
+    """
+    title = title or f"Letting {number}"
+    return f"{title},{number},Main Street,Springfield,{state},62701,USA\n"
+
+
+def run_import(*args):
+    """
+    Run import_lettings and capture its output.
+
+    Args:
+        *args: The command arguments.
+
+    Returns:
+        tuple: The standard output and error output.
+    """
+    stdout, stderr = StringIO(), StringIO()
+    call_command("import_lettings", *args, stdout=stdout, stderr=stderr)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportLettingsCommand:
+    """Tests for the import_lettings management command."""
+
+    def test_import_csv(self, tmp_path):
+        """
+        Test that a CSV file is imported in batches.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "lettings.csv"
+        path.write_text(CSV_HEADER + "".join(csv_row(n) for n in range(1, 6)))
+        stdout, _ = run_import(str(path), "--batch-size", "2")
+        assert Letting.objects.count() == 5
+        assert Letting.objects.get(title="Letting 3").address.number == 3
+        assert "Imported 5 lettings" in stdout
+        assert "rows/s" in stdout
+        assert not (tmp_path / "lettings.csv.checkpoint").exists()
+
+    def test_import_jsonl(self, tmp_path):
+        """
+        Test that a JSON Lines file is imported.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        record = {
+            "title": "Beach House", "number": 7, "street": "Ocean Drive",
+            "city": "Miami", "state": "FL", "zip_code": 33139,
+            "country_iso_code": "USA",
+        }
+        path = tmp_path / "lettings.jsonl"
+        path.write_text(json.dumps(record) + "\n\n")
+        run_import(str(path))
+        letting = Letting.objects.get()
+        assert letting.title == "Beach House"
+        assert letting.address.city == "Miami"
+
+    def test_invalid_record_stops_import(self, tmp_path):
+        """
+        Test that an invalid record stops the import after the last full batch.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "lettings.csv"
+        rows = [csv_row(1), csv_row(2), csv_row(3), csv_row(4, state="I")]
+        path.write_text(CSV_HEADER + "".join(rows))
+        with pytest.raises(CommandError, match="Record 4 is invalid: state"):
+            run_import(str(path), "--batch-size", "2")
+        assert Letting.objects.count() == 2
+        checkpoint = json.loads((tmp_path / "lettings.csv.checkpoint").read_text())
+        assert checkpoint == {"consumed": 2}
+
+    def test_resume_after_failure(self, tmp_path):
+        """
+        Test that --resume skips the records already imported.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "lettings.csv"
+        path.write_text(CSV_HEADER + csv_row(1) + csv_row(2) + csv_row(99999))
+        with pytest.raises(CommandError):
+            run_import(str(path), "--batch-size", "1")
+        with pytest.raises(CommandError, match="--resume"):
+            run_import(str(path), "--batch-size", "1")
+
+        path.write_text(CSV_HEADER + csv_row(1) + csv_row(2) + csv_row(3))
+        stdout, _ = run_import(str(path), "--batch-size", "1", "--resume")
+        assert "Imported 1 lettings" in stdout
+        assert sorted(Letting.objects.values_list("title", flat=True)) == [
+            "Letting 1", "Letting 2", "Letting 3"
+        ]
+
+    def test_skip_invalid(self, tmp_path):
+        """
+        Test that --skip-invalid reports invalid records and imports the others.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "lettings.csv"
+        path.write_text(CSV_HEADER + csv_row(1) + "Broken,abc,,,,,\n" + csv_row(2))
+        stdout, stderr = run_import(str(path), "--skip-invalid")
+        assert Letting.objects.count() == 2
+        assert Address.objects.count() == 2
+        assert "Skipping record 2" in stderr
+        assert "skipped 1 invalid records" in stdout
+
+    def test_unknown_format(self, tmp_path):
+        """
+        Test that an unknown extension requires --format.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "lettings.txt"
+        path.write_text(CSV_HEADER)
+        with pytest.raises(CommandError, match="--format"):
+            run_import(str(path))
+        run_import(str(path), "--format", "csv")
+
+
+@pytest.mark.django_db
+class TestExportLettingsCommand:
+    """Tests for the export_lettings management command."""
+
+    def test_export_csv_round_trip(self, tmp_path, lettings_batch):
+        """
+        Test that an exported CSV file can be imported back.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+            lettings_batch: The lettings_batch fixture.
+        """
+        path = tmp_path / "lettings.csv"
+        call_command("export_lettings", "-o", str(path), "--chunk-size", "2", stderr=StringIO())
+        lines = path.read_text().splitlines()
+        assert lines[0] == (
+            "id,title,number,street,city,state,zip_code,country_iso_code,updated_at"
+        )
+        assert len(lines) == 6
+        assert lines[1].startswith(f"{lettings_batch[0].id},Letting 1,1,Oak Street,Springfield")
+
+        Letting.objects.all().delete()
+        run_import(str(path))
+        assert Letting.objects.count() == 5
+
+    def test_export_gzipped_jsonl(self, tmp_path, lettings_batch):
+        """
+        Test that a .gz output is a gzipped JSON Lines file.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+            lettings_batch: The lettings_batch fixture.
+        """
+        path = tmp_path / "lettings.jsonl.gz"
+        stderr = StringIO()
+        call_command("export_lettings", "-o", str(path), "--format", "jsonl", stderr=stderr)
+        with gzip.open(path, "rt") as file:
+            records = [json.loads(line) for line in file]
+        assert [record["title"] for record in records][:2] == ["Letting 1", "Letting 2"]
+        assert records[0]["city"] == "Springfield"
+        assert "Exported 5 rows" in stderr.getvalue()
+
+    def test_export_runs_a_single_query(self, tmp_path, lettings_batch, django_assert_num_queries):
+        """
+        Test that the address is joined instead of queried per row.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+            lettings_batch: The lettings_batch fixture.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        with django_assert_num_queries(1):
+            call_command("export_lettings", "-o", str(tmp_path / "out.csv"), stderr=StringIO())
+
+    def test_export_to_stdout(self, capsys, lettings_batch):
+        """
+        Test that the default output is stdout.
+
+        Args:
+            capsys: The pytest output capture fixture.
+            lettings_batch: The lettings_batch fixture.
+        """
+        call_command("export_lettings", stderr=StringIO())
+        assert capsys.readouterr().out.count("Springfield") == 5
+
+
+@pytest.mark.django_db
+class TestGeocodeAddressesCommand:
+    """Tests for the geocode_addresses management command."""
+
+    def test_geocode_from_bundled_file(self, lettings_batch):
+        """
+        Test that addresses get the coordinates and geohash of their zip code.
+
+        Args:
+            lettings_batch: The lettings_batch fixture.
+        """
+        stdout = StringIO()
+        call_command("geocode_addresses", "--batch-size", "2", stdout=stdout)
+        assert "Geocoded 5 addresses, 0 with an unknown zip code." in stdout.getvalue()
+        address = Address.objects.get(pk=lettings_batch[0].address_id)
+        assert address.latitude == pytest.approx(39.8003)
+        assert address.geohash.startswith("dp0")
+
+    def test_gazetteer_file_and_unknown_zip_codes(self, tmp_path, address):
+        """
+        Test that a Gazetteer file is read and unknown zip codes are counted.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+            address: The address fixture.
+        """
+        Address.objects.create(
+            number=1, street="Elm Street", city="Nowhere", state="ZZ",
+            zip_code=99999, country_iso_code="USA",
+        )
+        path = tmp_path / "gazetteer.txt"
+        path.write_text("GEOID\tALAND\tINTPTLAT\tINTPTLONG \n62701\t1\t39.8\t-89.65\n")
+        stdout = StringIO()
+        call_command("geocode_addresses", "--file", str(path), stdout=stdout)
+        assert "Geocoded 1 addresses, 1 with an unknown zip code." in stdout.getvalue()
+        address.refresh_from_db()
+        assert (address.latitude, address.longitude) == (39.8, -89.65)
+
+    def test_invalid_file(self, tmp_path):
+        """
+        Test that a file without coordinate columns is rejected.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "centroids.csv"
+        path.write_text("zip,lat\n62701,39.8\n")
+        with pytest.raises(CommandError, match="Cannot read"):
+            call_command("geocode_addresses", "--file", str(path))
@@ -0,0 +1,138 @@
+"""
+Tests for the geographic proximity search of the lettings application.
+
+This module contains tests for the geohash helpers and the nearest
+lettings query.
+"""
+import pytest
+
+from lettings.geo import (
+    COARSEST_PRECISION,
+    FINEST_PRECISION,
+    covered_radius,
+    encode_geohash,
+    haversine,
+    nearest_lettings,
+    neighbor_cells,
+    zip_code_centroid,
+)
+from lettings.models import Address, Letting
+
+SPRINGFIELD = (39.8003, -89.6497)
+
+
+def create_letting(number, latitude, longitude):
+    """
+    Create a geocoded letting.
+
+    Args:
+        number: The street number, also used in the title.
+        latitude: The latitude of the address.
+        longitude: The longitude of the address.
+
+    Returns:
+        Letting: The created letting.
+    """
+    address = Address.objects.create(
+        number=number,
+        street="Main Street",
+        city="Springfield",
+        state="IL",
+        zip_code=62701,
+        country_iso_code="USA",
+        latitude=latitude,
+        longitude=longitude,
+    )
+    return Letting.objects.create(title=f"Letting {number}", address=address)
+
+
+def test_encode_geohash():
+    """Test a known geohash value."""
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_neighbor_cells_wrap_around_the_antimeridian():
+    """Test that the cells east of the antimeridian are in the block."""
+    cells = neighbor_cells(0.0, 179.99, 2)
+    assert len(cells) == 9
+    assert encode_geohash(0.0, -179.99, 2) in cells
+
+
+def test_haversine():
+    """Test the distance between Springfield and Chicago (about 290 km)."""
+    assert haversine(*SPRINGFIELD, 41.8858, -87.6181) == pytest.approx(288, abs=15)
+
+
+@pytest.mark.django_db
+class TestNearestLettings:
+    """Tests for the nearest lettings query."""
+
+    def test_saving_an_address_sets_its_geohash(self):
+        """Test that the geohash follows the coordinates of the address."""
+        letting = create_letting(1, *SPRINGFIELD)
+        assert letting.address.geohash == encode_geohash(*SPRINGFIELD)
+        letting.address.latitude = None
+        letting.address.save()
+        assert letting.address.geohash == ""
+
+    def test_nearest_lettings_are_sorted_by_distance(self):
+        """Test that the closest lettings come first, with their distance."""
+        far = create_letting(1, 41.8858, -87.6181)
+        near = create_letting(2, 39.8103, -89.6497)
+        nearest = create_letting(3, 39.8013, -89.6497)
+        create_letting(4, 47.6114, -122.3305)
+        result = nearest_lettings(*SPRINGFIELD, limit=3)
+        assert result == [nearest, near, far]
+        assert result[0].distance == pytest.approx(0.111, abs=0.01)
+
+    def test_candidates_are_read_from_nearby_cells(self, django_assert_num_queries):
+        """Test that enough close lettings are found with a single query."""
+        close = [create_letting(number, 39.8003 + number / 1000, -89.6497) for number in (1, 2)]
+        create_letting(3, 47.6114, -122.3305)
+        with django_assert_num_queries(1):
+            assert nearest_lettings(*SPRINGFIELD, limit=2) == close
+
+    def test_ungeocoded_lettings_are_ignored(self, letting):
+        """
+        Test that addresses without coordinates are never returned.
+
+        Args:
+            letting: The letting fixture, without coordinates.
+        """
+        assert nearest_lettings(*SPRINGFIELD) == []
+
+    def test_sparse_area_reads_a_bounded_block(self, django_assert_num_queries):
+        """
+        Test that a large limit in a sparse area never ranks distant lettings.
+
+        Args:
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        near = create_letting(1, 39.9, -89.5)
+        create_letting(2, 48.8566, 2.3522)  # Paris, outside the coarsest block
+        passes = FINEST_PRECISION - COARSEST_PRECISION + 1
+        with django_assert_num_queries(passes):
+            assert nearest_lettings(*SPRINGFIELD, limit=1000) == [near]
+        with django_assert_num_queries(passes):
+            assert nearest_lettings(0.0, 0.0, limit=1000) == []
+
+    def test_covered_radius_shrinks_with_precision(self):
+        """Test that finer cells cover a smaller radius."""
+        assert covered_radius(40.0, 5) < covered_radius(40.0, 4) < covered_radius(40.0, 3)
+        assert covered_radius(40.0, COARSEST_PRECISION) > 500
+
+
+def test_zip_code_centroid(settings, tmp_path):
+    """
+    Test that centroids come from the bundled file or the configured one.
+
+    Args:
+        settings: The pytest-django settings fixture.
+        tmp_path: The pytest temporary directory.
+    """
+    assert zip_code_centroid(62701) == SPRINGFIELD
+    assert zip_code_centroid(1) is None
+    path = tmp_path / "centroids.csv"
+    path.write_text("zip_code,latitude,longitude\n1,10.5,20.5\n")
+    settings.ZIP_CENTROIDS_FILE = str(path)
+    assert zip_code_centroid(1) == (10.5, 20.5)
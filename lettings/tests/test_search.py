@@ -0,0 +1,195 @@
+"""
+Tests for the lettings search backends.
+
+This module contains tests for the full-text search of lettings by title,
+street and city, and for its integration in the lettings index view.
+"""
+import pytest
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+from lettings.search import (
+    BasicSearchBackend,
+    SQLiteSearchBackend,
+    get_search_backend,
+    parse_page_number,
+    tokenize,
+)
+
+
+@pytest.fixture
+def search_lettings():
+    """
+    Create lettings with distinct titles, streets and cities.
+
+    Returns:
+        dict: The created lettings, by short name.
+    """
+    rows = {
+        "cottage": ("Lakeside Cottage", "Harbor Road", "Springfield"),
+        "loft": ("City Loft", "Lakeside Avenue", "Shelbyville"),
+        "cabin": ("Mountain Cabin", "Pine Street", "Ogdenville"),
+        "cafe": ("Café Studio", "Main Street", "Lakeside"),
+    }
+    lettings = {}
+    for number, (name, (title, street, city)) in enumerate(rows.items(), 1):
+        address = Address.objects.create(
+            number=number,
+            street=street,
+            city=city,
+            state="IL",
+            zip_code=62701,
+            country_iso_code="USA",
+        )
+        lettings[name] = Letting.objects.create(title=title, address=address)
+    return lettings
+
+
+def test_tokenize_drops_search_syntax():
+    """Test that quotes and operators of the search syntax are removed."""
+    assert tokenize('"Lake*" OR -main:') == ["lake", "or", "main"]
+
+
+@pytest.mark.parametrize("value, expected", [(None, 1), ("abc", 1), ("-2", 1), ("3", 3)])
+def test_parse_page_number(value, expected):
+    """
+    Test that missing or malformed page numbers fall back to 1.
+
+    Args:
+        value: The raw page number.
+        expected: The expected page number.
+    """
+    assert parse_page_number(value) == expected
+
+
+@pytest.mark.django_db
+class TestSQLiteSearchBackend:
+    """Tests for the FTS5 search backend."""
+
+    def test_default_backend_uses_fts5(self):
+        """Test that the SQLite test database uses the FTS5 backend."""
+        assert isinstance(get_search_backend(), SQLiteSearchBackend)
+
+    def test_search_matches_title_street_and_city(self, search_lettings):
+        """
+        Test that a word is found in titles, streets and cities, title first.
+
+        Args:
+            search_lettings: The search_lettings fixture.
+        """
+        page = get_search_backend().search("lakeside")
+        assert list(page)[0] == search_lettings["cottage"]
+        assert set(page) == {
+            search_lettings["cottage"], search_lettings["loft"], search_lettings["cafe"]
+        }
+
+    def test_search_matches_prefixes_of_every_word(self, search_lettings):
+        """
+        Test that every word must match, as a prefix.
+
+        Args:
+            search_lettings: The search_lettings fixture.
+        """
+        assert list(get_search_backend().search("spring harb")) == [
+            search_lettings["cottage"]
+        ]
+
+    def test_search_ignores_diacritics(self, search_lettings):
+        """
+        Test that accented words match their unaccented form.
+
+        Args:
+            search_lettings: The search_lettings fixture.
+        """
+        assert list(get_search_backend().search("cafe")) == [search_lettings["cafe"]]
+
+    def test_triggers_follow_updates_and_deletes(self, search_lettings):
+        """
+        Test that the FTS5 table follows the lettings and their addresses.
+
+        Args:
+            search_lettings: The search_lettings fixture.
+        """
+        backend = get_search_backend()
+        cabin = search_lettings["cabin"]
+        cabin.title = "Forest Chalet"
+        cabin.save()
+        cabin.address.city = "Capital City"
+        cabin.address.save()
+        assert list(backend.search("chalet capital")) == [cabin]
+        assert not backend.search("mountain")
+
+        cabin.delete()
+        assert not backend.search("chalet")
+
+    def test_search_is_paginated(self, search_lettings):
+        """
+        Test that results are split in pages with a next page flag.
+
+        Args:
+            search_lettings: The search_lettings fixture.
+        """
+        backend = get_search_backend()
+        first = backend.search("lakeside", page_number=1, page_size=2)
+        second = backend.search("lakeside", page_number=2, page_size=2)
+        assert len(first) == 2
+        assert first.has_next and not first.has_previous
+        assert len(second) == 1
+        assert second.has_previous and not second.has_next
+        assert set(first) | set(second) == set(backend.search("lakeside"))
+
+    def test_blank_query_returns_no_results(self, search_lettings):
+        """
+        Test that a query without words returns an empty page.
+
+        Args:
+            search_lettings: The search_lettings fixture.
+        """
+        assert not get_search_backend().search('" * -')
+
+
+@pytest.mark.django_db
+def test_basic_backend_matches_every_word(search_lettings):
+    """
+    Test that the fallback backend matches every word in any column.
+
+    Args:
+        search_lettings: The search_lettings fixture.
+    """
+    page = BasicSearchBackend().search("lakeside spring")
+    assert list(page) == [search_lettings["cottage"]]
+
+
+@pytest.mark.django_db
+class TestLettingsIndexSearch:
+    """Tests for the search of the lettings index view."""
+
+    def test_search_results(self, client, search_lettings, django_assert_num_queries):
+        """
+        Test that the q parameter renders the ranked results in one query.
+
+        Args:
+            client: The Django test client.
+            search_lettings: The search_lettings fixture.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        with django_assert_num_queries(1):
+            response = client.get(reverse("lettings:index"), {"q": "cabin"})
+        assert list(response.context["page"]) == [search_lettings["cabin"]]
+        assert response.context["query"] == "cabin"
+        assert "ETag" not in response
+
+    def test_search_pagination_links(self, client, settings, search_lettings):
+        """
+        Test that the pagination links keep the search query.
+
+        Args:
+            client: The Django test client.
+            settings: The pytest-django settings fixture.
+            search_lettings: The search_lettings fixture.
+        """
+        settings.LETTINGS_PAGE_SIZE = 2
+        response = client.get(reverse("lettings:index"), {"q": "lake side"})
+        assert b"No lettings match your search." in response.content
+        response = client.get(reverse("lettings:index"), {"q": "lakeside"})
+        assert b"?q=lakeside&amp;page=2" in response.content
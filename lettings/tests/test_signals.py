@@ -0,0 +1,118 @@
+"""
+Tests for the lettings application signals.
+
+This module checks that cached letting pages and the cached rows of the
+lettings index are invalidated when a Letting or its Address changes.
+"""
+import pytest
+from django.urls import reverse
+
+from lettings.models import Letting
+from oc_lettings_site.cache import get_fragment_version, get_view_cache
+
+
+@pytest.mark.django_db
+class TestLettingPageEviction:
+    """Tests for the eviction of cached letting detail pages."""
+
+    def test_detail_page_is_cached(self, client, letting):
+        """
+        Test that the second request for a letting is a cache hit.
+
+        Args:
+            client: The Django test client.
+            letting: The letting fixture.
+        """
+        url = reverse("lettings:letting", args=[letting.id])
+        assert client.get(url)["X-Cache"] == "MISS"
+        assert client.get(url)["X-Cache"] == "HIT"
+
+    def test_letting_save_evicts_page(self, client, letting):
+        """
+        Test that saving a letting refreshes its cached page.
+
+        Args:
+            client: The Django test client.
+            letting: The letting fixture.
+        """
+        url = reverse("lettings:letting", args=[letting.id])
+        client.get(url)
+        letting.title = "Renamed Letting"
+        letting.save()
+        response = client.get(url)
+        assert response["X-Cache"] == "MISS"
+        assert b"Renamed Letting" in response.content
+
+    def test_address_save_evicts_page(self, client, letting):
+        """
+        Test that saving the address of a letting refreshes its page.
+
+        Args:
+            client: The Django test client.
+            letting: The letting fixture.
+        """
+        url = reverse("lettings:letting", args=[letting.id])
+        client.get(url)
+        letting.address.city = "Shelbyville"
+        letting.address.save()
+        assert b"Shelbyville" in client.get(url).content
+
+    def test_letting_delete_evicts_page(self, client, letting):
+        """
+        Test that deleting a letting removes its cached page.
+
+        Args:
+            client: The Django test client.
+            letting: The letting fixture.
+        """
+        url = reverse("lettings:letting", args=[letting.id])
+        client.get(url)
+        letting.address.delete()
+        assert get_view_cache().get(f"view:letting:{letting.id}") is None
+        assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+class TestLettingsRowsFragment:
+    """Tests for the cached rows of the lettings index."""
+
+    def test_rows_are_served_from_the_fragment_cache(self, client, letting):
+        """
+        Test that the rows are rendered once, until the version is bumped.
+
+        ``update`` sends no signal and keeps the modification date, so the
+        cached rows are served; ``save`` bumps the version.
+
+        Args:
+            client: The Django test client.
+            letting: The letting fixture.
+        """
+        url = reverse("lettings:index")
+        client.get(url)
+        Letting.objects.filter(pk=letting.pk).update(title="Silently Renamed")
+        assert b"Test Letting" in client.get(url).content
+        letting.title = "Renamed Letting"
+        letting.save()
+        assert b"Renamed Letting" in client.get(url).content
+
+    def test_address_save_bumps_version(self, letting):
+        """
+        Test that saving an address invalidates the rows, as search results change.
+
+        Args:
+            letting: The letting fixture.
+        """
+        version = get_fragment_version("lettings")
+        letting.address.save()
+        assert get_fragment_version("lettings") != version
+
+    def test_letting_delete_bumps_version(self, letting):
+        """
+        Test that deleting a letting invalidates the rows.
+
+        Args:
+            letting: The letting fixture.
+        """
+        version = get_fragment_version("lettings")
+        letting.delete()
+        assert get_fragment_version("lettings") != version
@@ -69,3 +69,124 @@ class TestLettingDetailView:
         response = client.get(reverse("lettings:letting", args=[letting.id]))
         assert response.context["title"] == "Test Letting"
         assert response.context["address"].city == "Springfield"
+
+
+@pytest.mark.django_db
+class TestLettingsIndexPagination:
+    """Tests for the keyset pagination of the lettings index view."""
+
+    def test_first_page(self, client, settings, lettings_batch):
+        """
+        Test that the first page holds the first lettings and a next cursor.
+
+        Args:
+            client: The Django test client.
+            settings: The pytest-django settings fixture.
+            lettings_batch: The lettings_batch fixture.
+        """
+        settings.LETTINGS_PAGE_SIZE = 2
+        response = client.get(reverse("lettings:index"))
+        page = response.context["page"]
+        assert list(page) == lettings_batch[:2]
+        assert not page.has_previous
+        assert page.next_cursor == lettings_batch[1].id
+
+    def test_next_and_previous_pages(self, client, settings, lettings_batch):
+        """
+        Test that the after and before cursors navigate between pages.
+
+        Args:
+            client: The Django test client.
+            settings: The pytest-django settings fixture.
+            lettings_batch: The lettings_batch fixture.
+        """
+        settings.LETTINGS_PAGE_SIZE = 2
+        url = reverse("lettings:index")
+        response = client.get(url, {"after": lettings_batch[1].id})
+        page = response.context["page"]
+        assert list(page) == lettings_batch[2:4]
+        assert page.previous_cursor == lettings_batch[2].id
+
+        response = client.get(url, {"before": page.previous_cursor})
+        assert list(response.context["page"]) == lettings_batch[:2]
+
+    def test_invalid_cursor_returns_first_page(self, client, lettings_batch):
+        """
+        Test that a malformed cursor falls back to the first page.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        response = client.get(reverse("lettings:index"), {"after": "abc"})
+        assert response.status_code == 200
+        assert list(response.context["page"]) == lettings_batch
+
+    def test_page_runs_bounded_queries(
+        self, client, settings, lettings_batch, django_assert_num_queries
+    ):
+        """
+        Test that a page runs its query and an EXISTS, without any COUNT(*).
+
+        Args:
+            client: The Django test client.
+            settings: The pytest-django settings fixture.
+            lettings_batch: The lettings_batch fixture.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        settings.LETTINGS_PAGE_SIZE = 2
+        with django_assert_num_queries(2) as captured:
+            client.get(reverse("lettings:index"), {"after": lettings_batch[0].id})
+        assert not any("COUNT(" in query["sql"].upper() for query in captured.captured_queries)
+        assert captured.captured_queries[1]["sql"].endswith("LIMIT 1")
+
+
+@pytest.mark.django_db
+class TestLettingsConditionalGet:
+    """Tests for the conditional GET support of the lettings views."""
+
+    def test_unchanged_letting_returns_304(
+        self, client, letting, django_assert_num_queries
+    ):
+        """
+        Test that a current ETag answers 304 after a single query.
+
+        Args:
+            client: The Django test client.
+            letting: The letting fixture.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        url = reverse("lettings:letting", args=[letting.id])
+        etag = client.get(url)["ETag"]
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_address_change_invalidates_etag(self, client, letting):
+        """
+        Test that changing the address changes the letting ETag.
+
+        Args:
+            client: The Django test client.
+            letting: The letting fixture.
+        """
+        url = reverse("lettings:letting", args=[letting.id])
+        etag = client.get(url)["ETag"]
+        letting.address.street = "Elm Street"
+        letting.address.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_unchanged_index_returns_304(self, client, lettings_batch):
+        """
+        Test that an unchanged index page answers 304 and a new title does not.
+
+        Args:
+            client: The Django test client.
+            lettings_batch: The lettings_batch fixture.
+        """
+        url = reverse("lettings:index")
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        lettings_batch[0].title = "Renamed"
+        lettings_batch[0].save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
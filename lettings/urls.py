@@ -4,13 +4,17 @@ URL configuration for the lettings application.
 This module defines the URL patterns for the lettings app,
 including the list view and detail view for individual lettings.
 """
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'lettings'
 
+# The async views serve the same pages under ASGI
+pages = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('<int:letting_id>/', views.letting, name='letting'),
+    path('', pages.index, name='index'),
+    path('<int:letting_id>/', pages.letting, name='letting'),
 ]
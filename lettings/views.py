@@ -6,17 +6,120 @@ This module contains the view functions for displaying lettings information.
 
 import logging
 
+from django.conf import settings
 from django.http import Http404
 from django.shortcuts import render
 
+from oc_lettings_site.cache import cache_response, fragment_context, get_fragment_version
+from oc_lettings_site.conditional import conditional_page, rows_state
+from oc_lettings_site.pagination import get_keyset_page
+from oc_lettings_site.replicas import replica_reads
+
 from .models import Letting
+from .search import get_search_backend, parse_page_number
 
 logger = logging.getLogger(__name__)
 
 
+def get_search_query(request):
+    """
+    Return the search query of the ``q`` query string parameter.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        str: The stripped search query, empty when not searching.
+    """
+    return request.GET.get("q", "").strip()
+
+
+def get_index_page(request):
+    """
+    Return the lettings index page requested by the query string.
+
+    Without a ``q`` search query, the page is selected by the keyset
+    cursors. With one, it is a page of ranked search results selected by
+    the ``page`` number. The page is built once per request and shared by
+    the view and its conditional GET state, so both run the same single
+    query.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        KeysetPage or SearchPage: The requested page.
+    """
+    if hasattr(request, "lettings_page"):
+        return request.lettings_page
+    query = get_search_query(request)
+    if query:
+        request.lettings_page = get_search_backend().search(
+            query,
+            parse_page_number(request.GET.get("page")),
+            settings.LETTINGS_PAGE_SIZE,
+        )
+    else:
+        request.lettings_page = get_keyset_page(
+            request,
+            Letting.objects.only("id", "title", "updated_at"),
+            settings.LETTINGS_PAGE_SIZE,
+        )
+    return request.lettings_page
+
+
+def index_state(request):
+    """
+    Compute the state of a lettings index page for conditional GET.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        tuple: The fingerprint and the last modification date of the page,
+        or None for search results, whose ranking has no modification date.
+    """
+    if get_search_query(request):
+        return None
+    page = get_index_page(request)
+    fingerprint, last_modified = rows_state((row.pk, row.updated_at) for row in page)
+    return f"{fingerprint}|{page.has_previous}|{page.has_next}", last_modified
+
+
+def letting_state(request, letting_id):
+    """
+    Compute the state of a letting detail page for conditional GET.
+
+    Args:
+        request: The HTTP request object.
+        letting_id: The ID of the letting.
+
+    Returns:
+        tuple: The fingerprint and the last modification date of the page,
+        or None if the letting does not exist.
+    """
+    dates = (
+        Letting.objects.filter(id=letting_id)
+        .values_list("updated_at", "address__updated_at")
+        .first()
+    )
+    if dates is None:
+        return None
+    return rows_state([(f"letting{letting_id}", dates[0]), ("address", dates[1])])
+
+
+@replica_reads
+@conditional_page(index_state)
 def index(request):
     """
-    Display list of all lettings.
+    Display a page of lettings.
+
+    Lettings are paginated by ID with the ``after``/``before`` cursors of
+    the query string, so each page runs a single query whatever the size
+    of the table. Unchanged pages are answered with 304 Not Modified.
+    The ``q`` parameter searches the titles and addresses instead, with
+    ranked results paginated by the ``page`` parameter. The rendered rows
+    are cached until a letting or an address changes.
 
     Args:
         request: The HTTP request object.
@@ -25,16 +128,26 @@ def index(request):
         HttpResponse: The rendered lettings list template.
     """
     logger.info("Lettings index page accessed")
-    lettings_list = Letting.objects.all()
-    logger.debug("Retrieved %d lettings", lettings_list.count())
-    context = {"lettings_list": lettings_list}
+    page = get_index_page(request)
+    context = {
+        "lettings_list": page,
+        "page": page,
+        "query": get_search_query(request),
+        **fragment_context(get_fragment_version("lettings"), page),
+    }
     return render(request, "lettings/index.html", context)
 
 
+@replica_reads
+@conditional_page(letting_state)
+@cache_response("letting", "letting_id")
 def letting(request, letting_id):
     """
     Display details of a specific letting.
 
+    Rendered pages are cached until the letting or its address changes,
+    and unchanged pages are answered with 304 Not Modified.
+
     Args:
         request: The HTTP request object.
         letting_id: The ID of the letting to display.
@@ -47,7 +160,7 @@ def letting(request, letting_id):
     """
     logger.info("Letting detail page accessed for ID: %s", letting_id)
     try:
-        letting = Letting.objects.get(id=letting_id)
+        letting = Letting.objects.select_related("address").get(id=letting_id)
         logger.debug("Found letting: %s", letting.title)
     except Letting.DoesNotExist:
         logger.error("Letting with ID %s not found", letting_id)
@@ -9,3 +9,7 @@ class OCLettingsSiteConfig(AppConfig):
     """Django application configuration for oc_lettings_site."""
 
     name = "oc_lettings_site"
+
+    def ready(self):
+        """Connect the signal handler tuning the SQLite connections."""
+        from . import sqlite  # noqa: F401
@@ -2,7 +2,14 @@
 ASGI configuration for the OC Lettings project.
 
 This module exposes the ASGI callable as a module-level variable named 'application'.
-It is used for deploying the application with ASGI-compatible servers.
+It is used for deploying the application with ASGI-compatible servers,
+e.g. ``uvicorn oc_lettings_site.asgi:application``.
+
+Unless set otherwise in the environment, the async views of the lettings
+and profiles pages are enabled (``ASYNC_VIEWS``) and PostgreSQL
+connections are not kept between requests (``DB_CONN_MAX_AGE=0``): each
+ASGI request runs its queries in a thread of its own, so persistent
+connections would pile up. Use ``DB_POOL=true`` to reuse them instead.
 """
 
 import os
@@ -10,5 +17,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "oc_lettings_site.settings")
+os.environ.setdefault("ASYNC_VIEWS", "true")
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
@@ -0,0 +1,30 @@
+"""
+Async views for the OC Lettings main application.
+
+The home page has no database access, but an async view spares it the
+thread Django runs synchronous views in under ASGI. It is routed instead
+of ``oc_lettings_site.views.index`` when ``ASYNC_VIEWS`` is enabled.
+"""
+
+import logging
+
+from django.shortcuts import render
+
+from .cache import cache_response
+
+logger = logging.getLogger(__name__)
+
+
+@cache_response("home")
+async def index(request):
+    """
+    Display the home page, like ``oc_lettings_site.views.index``.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        HttpResponse: The rendered home page template.
+    """
+    logger.info("Home page accessed")
+    return render(request, "index.html")
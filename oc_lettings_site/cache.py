@@ -0,0 +1,335 @@
+"""
+Response cache for the detail pages of the OC Lettings project.
+
+This module provides a view decorator that stores rendered pages in the
+Django cache configured by ``VIEW_CACHE_ALIAS``, keyed by a URL argument,
+and a helper to evict them. Eviction is driven by the model signals of the
+lettings and profiles applications.
+
+The hits and misses of each page type are always counted by ``stats``, per
+process, and logged with their hit ratio every ``VIEW_CACHE_LOG_INTERVAL``
+seconds on the ``oc_lettings_site.cache`` logger, to size the cache. With
+``METRICS_ENABLED``, they are also counted by the
+``view_cache_lookups_total`` metric, summed across the workers on
+``/metrics`` with its ``view_cache_hit_ratio``.
+
+Pages read from a replica are served but not stored: the replica may
+still hold the row a write changed, after its signal evicted the page, and
+no later signal would evict the stale copy. The cache is filled by the
+requests reading the primary (pinned clients, no replica).
+
+The rows of the list pages are cached as template fragments (``{% cache %}``)
+keyed by a version per list, which the model signals bump with
+``bump_fragment_version`` instead of deleting every cached page.
+"""
+
+import logging
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from . import metrics
+from .replicas import reads_replica
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStats:
+    """
+    Thread-safe hit and miss counters of the response cache.
+
+    Counters are kept per process and per page type (the cache prefix).
+
+    Attributes:
+        last_log: The ``time.monotonic()`` of the last log of the counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self.last_log = time.monotonic()
+
+    def record(self, prefix, hit):
+        """
+        Count a cache lookup, and log the counters if it is time to.
+
+        Args:
+            prefix: The page type of the lookup.
+            hit: True if the page was found in the cache.
+        """
+        with self._lock:
+            counters = self._counters.setdefault(prefix, {"hits": 0, "misses": 0})
+            counters["hits" if hit else "misses"] += 1
+        self.maybe_log()
+
+    def snapshot(self):
+        """
+        Return a copy of the counters with their hit ratio.
+
+        Returns:
+            dict: The hits, misses and hit_ratio of each page type.
+        """
+        with self._lock:
+            snapshot = {}
+            for prefix, counters in self._counters.items():
+                total = counters["hits"] + counters["misses"]
+                snapshot[prefix] = {
+                    **counters,
+                    "hit_ratio": counters["hits"] / total if total else 0.0,
+                }
+            return snapshot
+
+    def maybe_log(self):
+        """Log the counters if ``VIEW_CACHE_LOG_INTERVAL`` seconds passed since the last log."""
+        interval = settings.VIEW_CACHE_LOG_INTERVAL
+        if not interval:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self.last_log < interval:
+                return
+            self.last_log = now
+        data = self.snapshot()
+        logger.info(
+            "View cache: %s",
+            ", ".join(
+                f"{prefix} {counters['hits']} hits, {counters['misses']} misses "
+                f"({counters['hit_ratio']:.0%})"
+                for prefix, counters in sorted(data.items())
+            ),
+            extra={"cache_stats": data},
+        )
+
+    def reset(self):
+        """Reset every counter to zero."""
+        with self._lock:
+            self._counters.clear()
+            self.last_log = time.monotonic()
+
+
+stats = CacheStats()
+
+
+def get_view_cache():
+    """Return the cache backend used to store rendered pages."""
+    return caches[settings.VIEW_CACHE_ALIAS]
+
+
+def make_cache_key(prefix, value):
+    """
+    Build the cache key of a page.
+
+    Args:
+        prefix: The page type, e.g. ``"letting"``.
+        value: The URL argument identifying the page.
+
+    Returns:
+        str: The cache key.
+    """
+    return f"view:{prefix}:{value}"
+
+
+def evict_responses(prefix, *values):
+    """
+    Remove cached pages from the cache.
+
+    Args:
+        prefix: The page type of the pages.
+        *values: The URL arguments identifying the pages.
+    """
+    keys = [make_cache_key(prefix, value) for value in values]
+    if keys:
+        get_view_cache().delete_many(keys)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Evicted cached pages: %s", ", ".join(keys))
+
+
+def make_version_key(name):
+    """
+    Build the cache key holding the version of a list of fragments.
+
+    Args:
+        name: The list name, e.g. ``"lettings"``.
+
+    Returns:
+        str: The cache key.
+    """
+    return f"fragment-version:{name}"
+
+
+def new_version():
+    """
+    Return a fragment version that was never used before.
+
+    Versions are timestamps rather than counters, so a version lost with
+    its cache entry (eviction, restart) cannot match older fragments.
+    """
+    return time.time_ns()
+
+
+def get_fragment_version(name):
+    """
+    Return the current version of a list of fragments.
+
+    Args:
+        name: The list name.
+
+    Returns:
+        int: The version, to vary the ``{% cache %}`` keys on.
+    """
+    return get_view_cache().get_or_set(make_version_key(name), new_version, None)
+
+
+async def aget_fragment_version(name):
+    """
+    Return the current version of a list of fragments, for async views.
+
+    Args:
+        name: The list name.
+
+    Returns:
+        int: The version, to vary the ``{% cache %}`` keys on.
+    """
+    return await get_view_cache().aget_or_set(make_version_key(name), new_version, None)
+
+
+def bump_fragment_version(name):
+    """
+    Invalidate every cached fragment of a list.
+
+    Args:
+        name: The list name.
+    """
+    get_view_cache().set(make_version_key(name), new_version(), None)
+    logger.debug("Bumped the fragment version of %s", name)
+
+
+def fragment_context(version, rows):
+    """
+    Build the template variables of a cached list of rows.
+
+    The fragment key varies on the list version and on the ID and the
+    modification date of the rows, so every page (cursor, search query)
+    gets its own fragment, and rows read from a lagging replica never
+    fill the fragment of the current data.
+
+    Args:
+        version: The version returned by ``get_fragment_version``.
+        rows: The rows of the page, with their ``updated_at`` date.
+
+    Returns:
+        dict: ``fragment_version``, ``fragment_key`` and ``fragment_timeout``.
+    """
+    return {
+        "fragment_version": version,
+        "fragment_key": ",".join(f"{row.pk}@{row.updated_at.timestamp()}" for row in rows),
+        "fragment_timeout": settings.VIEW_CACHE_TIMEOUT,
+    }
+
+
+def cached_response(prefix, cached):
+    """
+    Build the response of a cache lookup and count it.
+
+    Args:
+        prefix: The page type of the lookup.
+        cached: The ``(content, content_type)`` pair found, or None.
+
+    Returns:
+        HttpResponse: The cached page, or None on a miss.
+    """
+    stats.record(prefix, hit=cached is not None)
+    metrics.observe_cache_lookup(prefix, hit=cached is not None)
+    if cached is None:
+        return None
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def is_cacheable(response):
+    """Return True if a rendered response can be stored in the cache."""
+    return response.status_code == 200 and not response.streaming and not reads_replica()
+
+
+def get_page_key(prefix, url_kwarg, kwargs):
+    """
+    Build the cache key of the page requested with URL arguments.
+
+    Pages without URL argument, such as the static home page, are keyed by
+    ``PAGE_VERSION`` so that deploying new templates renews them.
+
+    Args:
+        prefix: The page type.
+        url_kwarg: The name of the URL argument identifying the page, or None.
+        kwargs: The URL arguments of the request.
+
+    Returns:
+        str: The cache key.
+    """
+    value = kwargs[url_kwarg] if url_kwarg else f"v{settings.PAGE_VERSION}"
+    return make_cache_key(prefix, value)
+
+
+def cache_response(prefix, url_kwarg=None):
+    """
+    Cache the successful GET responses of a view.
+
+    Async views use the async API of the cache backend.
+
+    Args:
+        prefix: The page type, used in the cache key and the counters.
+        url_kwarg: The name of the URL argument identifying the page, or
+            None for a view serving a single page.
+
+    Returns:
+        callable: The view decorator.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view(request, *args, **kwargs)
+                cache = get_view_cache()
+                key = get_page_key(prefix, url_kwarg, kwargs)
+                response = cached_response(prefix, await cache.aget(key))
+                if response is not None:
+                    return response
+                response = await view(request, *args, **kwargs)
+                if is_cacheable(response):
+                    await cache.aset(
+                        key,
+                        (response.content, response["Content-Type"]),
+                        settings.VIEW_CACHE_TIMEOUT,
+                    )
+                response["X-Cache"] = "MISS"
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            cache = get_view_cache()
+            key = get_page_key(prefix, url_kwarg, kwargs)
+            response = cached_response(prefix, cache.get(key))
+            if response is not None:
+                return response
+            response = view(request, *args, **kwargs)
+            if is_cacheable(response):
+                cache.set(
+                    key,
+                    (response.content, response["Content-Type"]),
+                    settings.VIEW_CACHE_TIMEOUT,
+                )
+            response["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,178 @@
+"""
+Pre-compressed variants of the static files and their negotiation.
+
+WhiteNoise writes a gzip (``.gz``) variant of each collected file, and a
+Brotli (``.br``) one only if the optional ``brotli`` package is installed.
+``Compressor`` also writes a Zstandard (``.zst``) variant, at the maximum
+level of each algorithm since the files are compressed once at build time,
+and logs the encoders which are missing instead of silently skipping them.
+``brotli`` and ``zstandard`` are in the ``production`` Poetry group, like
+uvicorn, installed in the Docker image; on Python 3.14 the standard
+``compression.zstd`` module is used when ``zstandard`` is missing.
+
+``NegotiatedStaticFile`` serves, for each request, the smallest variant
+accepted by its ``Accept-Encoding`` header, honouring ``q=0`` and ``*``,
+where WhiteNoise only searches the header for the encoding names.
+"""
+
+import logging
+import os
+import re
+
+from whitenoise.compress import Compressor as WhiteNoiseCompressor
+from whitenoise.responders import StaticFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+    try:
+        from compression import zstd
+    except ImportError:
+        zstd = None
+
+logger = logging.getLogger(__name__)
+
+# Content-Encoding of each variant, by file suffix
+ENCODINGS = {".br": "br", ".zst": "zstd", ".gz": "gzip"}
+
+ZSTD_LEVEL = 22
+
+ACCEPT_ENCODING = re.compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*")
+
+
+def compress_zstd(data):
+    """
+    Compress data with Zstandard at the maximum level.
+
+    Args:
+        data: The bytes to compress.
+
+    Returns:
+        bytes: The compressed data, or None if no Zstandard encoder is installed.
+    """
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if zstd is not None:
+        return zstd.compress(data, level=ZSTD_LEVEL)
+    return None
+
+
+def missing_encoders():
+    """
+    Return the optional encoders which are not installed.
+
+    Returns:
+        list: The names of the missing packages.
+    """
+    missing = []
+    if brotli is None:
+        missing.append("brotli")
+    if compress_zstd(b"") is None:
+        missing.append("zstandard")
+    return missing
+
+
+class Compressor(WhiteNoiseCompressor):
+    """WhiteNoise's compressor, with Brotli at its best quality and Zstandard."""
+
+    # AVIF images (see images.py) are already compressed
+    SKIP_COMPRESS_EXTENSIONS = (*WhiteNoiseCompressor.SKIP_COMPRESS_EXTENSIONS, "avif", "zst")
+
+    def __init__(self, *args, use_zstd=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_brotli = self.use_brotli and brotli is not None
+        self.use_zstd = use_zstd and compress_zstd(b"") is not None
+        for package in missing_encoders():
+            logger.warning("%s is not installed, no static file is compressed with it", package)
+
+    @staticmethod
+    def compress_brotli(data):
+        """Compress data with Brotli at the maximum quality."""
+        return brotli.compress(data, quality=11)
+
+    def compress(self, path):
+        """
+        Write the compressed variants of a file which are small enough.
+
+        Args:
+            path: The path of the file.
+
+        Returns:
+            list: The paths of the written variants.
+        """
+        filenames = super().compress(path)
+        if self.use_zstd:
+            with open(path, "rb") as file:
+                stat_result = os.fstat(file.fileno())
+                data = file.read()
+            compressed = compress_zstd(data)
+            if self.is_compressed_effectively("Zstandard", path, len(data), compressed):
+                filenames.append(self.write_data(path, compressed, ".zst", stat_result))
+        return filenames
+
+
+def parse_accept_encoding(header):
+    """
+    Parse an ``Accept-Encoding`` header.
+
+    Args:
+        header: The header value.
+
+    Returns:
+        dict: The quality value of each listed encoding, in lower case.
+        Invalid quality values count as 1.
+    """
+    qualities = {}
+    for item in header.split(","):
+        match = ACCEPT_ENCODING.fullmatch(item)
+        if match:
+            try:
+                quality = float(match.group(2) or 1)
+            except ValueError:
+                quality = 1.0
+            qualities[match.group(1).lower()] = quality
+    return qualities
+
+
+class NegotiatedStaticFile(StaticFile):
+    """A static file served with the smallest variant the client accepts."""
+
+    @staticmethod
+    def get_alternatives(base_headers, files):
+        """
+        Return the variants of the file, smallest first.
+
+        Args:
+            base_headers: The headers common to all the variants.
+            files: The ``FileEntry`` of each encoding, None for the file itself.
+
+        Returns:
+            list: The (encoding, path, headers) of each variant.
+        """
+        alternatives = StaticFile.get_alternatives(base_headers, files)
+        return [
+            (dict(headers).get("Content-Encoding"), path, headers)
+            for _, path, headers in alternatives
+        ]
+
+    def get_path_and_headers(self, request_headers):
+        """
+        Return the smallest variant accepted by the request.
+
+        Args:
+            request_headers: The WSGI environ of the request.
+
+        Returns:
+            tuple: The path and headers of the variant.
+        """
+        qualities = parse_accept_encoding(request_headers.get("HTTP_ACCEPT_ENCODING", ""))
+        default = qualities.get("*", 0)
+        for encoding, path, headers in self.alternatives:
+            if encoding is None or qualities.get(encoding, default) > 0:
+                return path, headers
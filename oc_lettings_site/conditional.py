@@ -0,0 +1,135 @@
+"""
+Conditional GET support for the OC Lettings project.
+
+This module provides a view decorator that computes the ETag and the
+Last-Modified date of a page from a single narrow query, before the view
+runs, and answers ``304 Not Modified`` when the client copy is current.
+It works like Django's ``condition`` decorator, which would need one call
+(and one query) per validator.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(fingerprint):
+    """
+    Build a weak ETag from the fingerprint of a page.
+
+    The ``PAGE_VERSION`` and ``STATIC_VERSION`` settings are mixed in so that
+    deploying new templates or static files invalidates the pages held by
+    clients.
+
+    Args:
+        fingerprint: A string describing the state of the page data.
+
+    Returns:
+        str: The quoted weak ETag.
+    """
+    data = f"{settings.PAGE_VERSION}:{settings.STATIC_VERSION}:{fingerprint}".encode()
+    return f'W/"{hashlib.md5(data, usedforsecurity=False).hexdigest()}"'
+
+
+def evaluate_state(request, state):
+    """
+    Compare the state of a page with the validators sent by the client.
+
+    Args:
+        request: The HTTP request object.
+        state: The ``(fingerprint, last_modified)`` tuple of the page.
+
+    Returns:
+        tuple: The ETag, the Last-Modified timestamp and the 304 or 412
+        response, or None when the view must render the page.
+    """
+    fingerprint, last_modified = state
+    etag = make_etag(fingerprint)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    return etag, timestamp, response
+
+
+def add_validators(response, etag, timestamp):
+    """
+    Set the validators and the revalidation policy of a page.
+
+    Args:
+        response: The response of the view, or the 304 response.
+        etag: The ETag of the page.
+        timestamp: The Last-Modified timestamp of the page, or None.
+
+    Returns:
+        HttpResponse: The response.
+    """
+    if response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+        if timestamp and not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(timestamp)
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_page(state_func):
+    """
+    Answer conditional GET requests from the state of the page data.
+
+    ``state_func`` is called with the arguments of the view and returns a
+    ``(fingerprint, last_modified)`` tuple, or None when the page has no
+    validators (e.g. the object does not exist). Async views take an async
+    ``state_func``.
+
+    Args:
+        state_func: The callable computing the state of the page.
+
+    Returns:
+        callable: The view decorator.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view(request, *args, **kwargs)
+                state = await state_func(request, *args, **kwargs)
+                if state is None:
+                    return await view(request, *args, **kwargs)
+                etag, timestamp, response = evaluate_state(request, state)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return add_validators(response, etag, timestamp)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            state = state_func(request, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+            etag, timestamp, response = evaluate_state(request, state)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return add_validators(response, etag, timestamp)
+        return wrapper
+    return decorator
+
+
+def rows_state(rows):
+    """
+    Compute the state of a page listing several rows.
+
+    Args:
+        rows: ``(pk, updated_at)`` pairs of the rows shown on the page.
+
+    Returns:
+        tuple: The fingerprint and the latest modification date of the rows.
+    """
+    rows = list(rows)
+    fingerprint = ",".join(f"{pk}@{updated_at.isoformat()}" for pk, updated_at in rows)
+    last_modified = max((updated_at for _, updated_at in rows), default=None)
+    return fingerprint, last_modified
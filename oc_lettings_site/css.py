@@ -0,0 +1,365 @@
+"""
+Stylesheet pruning for the OC Lettings project.
+
+The theme stylesheet (``static/css/styles.css``, Bootstrap and the SB UI
+Kit) defines thousands of rules, of which the templates use a few dozen.
+This module provides what the ``build_css`` command needs to keep only
+those:
+
+- ``parse`` splits a stylesheet into ``Rule`` objects, with the rules of
+  ``@media`` and ``@supports`` blocks nested in their block;
+- ``find_template_names`` reads the classes and ids of the ``class`` and
+  ``id`` attributes of templates, optionally up to a
+  ``{# below-the-fold #}`` marker;
+- ``prune`` keeps the selectors whose classes and ids are all used, and
+  ``serialize`` writes the kept rules back, one per line.
+
+The parser only understands what the theme uses: comments, strings, rule
+sets, nested and statement at-rules. Selectors are matched on their
+classes and ids only: rules on elements, attributes and pseudo-classes are
+kept, and ``:not()`` arguments are ignored.
+"""
+
+import re
+from collections import namedtuple
+
+# A rule: its selectors or at-rule prelude, and its declarations (str),
+# nested rules (list) or None for a statement at-rule such as @charset
+Rule = namedtuple("Rule", ["prelude", "body"])
+
+# At-rules containing rule sets rather than declarations
+NESTED_AT_RULES = ("@media", "@supports", "@document", "@layer", "@container")
+
+BELOW_THE_FOLD = "{# below-the-fold #}"
+
+ATTRIBUTE = re.compile(r'\b(class|id)\s*=\s*"([^"]*)"')
+TEMPLATE_CODE = re.compile(r"{[{%#].*?[}%#]}", re.DOTALL)
+CLASS_SELECTOR = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+ID_SELECTOR = re.compile(r"#(-?[_a-zA-Z][\w-]*)")
+KEYFRAMES = re.compile(r"^@(?:-webkit-)?keyframes\s+(\S+)")
+
+
+def skip_string(css, pos):
+    """
+    Return the position after the quoted string starting at ``pos``.
+
+    Args:
+        css: The stylesheet.
+        pos: The position of the opening quote.
+
+    Returns:
+        int: The position after the closing quote.
+    """
+    quote = css[pos]
+    pos += 1
+    while pos < len(css) and css[pos] != quote:
+        pos += 2 if css[pos] == "\\" else 1
+    return pos + 1
+
+
+def strip_comments(css):
+    """
+    Remove the comments of a stylesheet, except those in strings.
+
+    Args:
+        css: The stylesheet.
+
+    Returns:
+        str: The stylesheet without comments.
+    """
+    parts = []
+    start = pos = 0
+    while pos < len(css):
+        if css[pos] in "\"'":
+            pos = skip_string(css, pos)
+        elif css.startswith("/*", pos):
+            parts.append(css[start:pos])
+            end = css.find("*/", pos + 2)
+            pos = start = len(css) if end == -1 else end + 2
+        else:
+            pos += 1
+    parts.append(css[start:])
+    return "".join(parts)
+
+
+def find_block_end(css, pos):
+    """
+    Return the position of the brace closing the block opened at ``pos``.
+
+    Args:
+        css: The stylesheet.
+        pos: The position of the opening brace.
+
+    Returns:
+        int: The position of the closing brace.
+    """
+    depth = 0
+    while pos < len(css):
+        char = css[pos]
+        if char in "\"'":
+            pos = skip_string(css, pos)
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return pos
+        pos += 1
+    return pos
+
+
+def parse_block(css, pos):
+    """
+    Parse the rules of a stylesheet or of a nested block.
+
+    Args:
+        css: The stylesheet, without comments.
+        pos: The position of the first rule.
+
+    Returns:
+        tuple: The list of rules and the position after the block.
+    """
+    rules = []
+    start = pos
+    while pos < len(css):
+        char = css[pos]
+        if char in "\"'":
+            pos = skip_string(css, pos)
+        elif char == ";":
+            rules.append(Rule(" ".join(css[start:pos].split()), None))
+            pos = start = pos + 1
+        elif char == "{":
+            prelude = " ".join(css[start:pos].split())
+            if prelude.startswith(NESTED_AT_RULES):
+                children, pos = parse_block(css, pos + 1)
+                rules.append(Rule(prelude, children))
+            else:
+                end = find_block_end(css, pos)
+                rules.append(Rule(prelude, css[pos + 1:end].strip()))
+                pos = end + 1
+            start = pos
+        elif char == "}":
+            return rules, pos + 1
+        else:
+            pos += 1
+    return rules, pos
+
+
+def parse(css):
+    """
+    Parse a stylesheet.
+
+    Args:
+        css: The stylesheet.
+
+    Returns:
+        list: The ``Rule`` objects of the stylesheet.
+    """
+    return parse_block(strip_comments(css), 0)[0]
+
+
+def split_selectors(prelude):
+    """
+    Split a selector list on the commas outside parentheses and brackets.
+
+    Args:
+        prelude: The selector list of a rule.
+
+    Returns:
+        list: The selectors.
+    """
+    selectors = []
+    depth = 0
+    start = 0
+    for pos, char in enumerate(prelude):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(prelude[start:pos].strip())
+            start = pos + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def remove_arguments(selector):
+    """
+    Remove the attribute selectors and the ``:not()`` arguments of a selector.
+
+    Args:
+        selector: A selector.
+
+    Returns:
+        str: The selector with ``[...]`` and ``:not(...)`` removed.
+    """
+    selector = re.sub(r"\[[^\]]*\]", "", selector)
+    while ":not(" in selector:
+        start = selector.index(":not(")
+        depth = 0
+        for end in range(start + 4, len(selector)):
+            depth += {"(": 1, ")": -1}.get(selector[end], 0)
+            if depth == 0:
+                break
+        selector = selector[:start] + selector[end + 1:]
+    return selector
+
+
+def selector_names(selector):
+    """
+    Return the classes and ids required by a selector.
+
+    Args:
+        selector: A selector.
+
+    Returns:
+        set: The class names and the ids prefixed with ``#``.
+    """
+    selector = remove_arguments(selector)
+    return set(CLASS_SELECTOR.findall(selector)) | {
+        f"#{name}" for name in ID_SELECTOR.findall(selector)
+    }
+
+
+def find_template_names(source, above_the_fold=False):
+    """
+    Return the classes and ids of the elements of a template.
+
+    Args:
+        source: The template source.
+        above_the_fold: Only read the source before the
+            ``{# below-the-fold #}`` marker, if any.
+
+    Returns:
+        set: The class names and the ids prefixed with ``#``.
+    """
+    if above_the_fold:
+        source = source.split(BELOW_THE_FOLD, 1)[0]
+    names = set()
+    for attribute, value in ATTRIBUTE.findall(source):
+        for name in TEMPLATE_CODE.sub(" ", value).split():
+            names.add(f"#{name}" if attribute == "id" else name)
+    return names
+
+
+def prune(rules, names, keep_urls=True):
+    """
+    Keep the rules whose selectors only use known classes and ids.
+
+    ``@font-face`` and other at-rules with declarations are kept, except
+    the ``@keyframes`` which no kept rule animates.
+
+    Args:
+        rules: The rules of a stylesheet.
+        names: The used class names and ids (prefixed with ``#``).
+        keep_urls: False to drop the rules and at-rules referencing a
+            file with ``url()``, whose relative URLs would break once
+            inlined in a page.
+
+    Returns:
+        list: The kept rules, with only their used selectors.
+    """
+    def prune_rules(rules):
+        kept = []
+        for rule in rules:
+            if isinstance(rule.body, list):
+                children = prune_rules(rule.body)
+                if children:
+                    kept.append(Rule(rule.prelude, children))
+            elif not keep_urls and rule.body is not None and "url(" in rule.body:
+                continue
+            elif rule.prelude.startswith("@"):
+                if keep_urls or rule.body is not None:
+                    kept.append(rule)
+            else:
+                selectors = [
+                    selector for selector in split_selectors(rule.prelude)
+                    if selector_names(selector) <= names
+                ]
+                if selectors:
+                    kept.append(Rule(", ".join(selectors), rule.body))
+        return kept
+
+    kept = prune_rules(rules)
+    animations = " ".join(declarations(kept, with_keyframes=False))
+    return remove_keyframes(kept, animations)
+
+
+def declarations(rules, with_keyframes=True):
+    """
+    Yield the declaration blocks of rules, nested ones included.
+
+    Args:
+        rules: The rules.
+        with_keyframes: False to skip the ``@keyframes`` blocks.
+
+    Yields:
+        str: The declarations of each rule.
+    """
+    for rule in rules:
+        if isinstance(rule.body, list):
+            yield from declarations(rule.body, with_keyframes)
+        elif rule.body and (with_keyframes or not KEYFRAMES.match(rule.prelude)):
+            yield rule.body
+
+
+def remove_keyframes(rules, animations):
+    """
+    Remove the ``@keyframes`` whose name is not used by the declarations.
+
+    Args:
+        rules: The rules.
+        animations: The declarations of the kept rules.
+
+    Returns:
+        list: The rules without the unused ``@keyframes``.
+    """
+    kept = []
+    for rule in rules:
+        match = KEYFRAMES.match(rule.prelude)
+        if match and not re.search(rf"(?<![\w-]){re.escape(match.group(1))}(?![\w-])",
+                                   animations):
+            continue
+        if isinstance(rule.body, list):
+            rule = Rule(rule.prelude, remove_keyframes(rule.body, animations))
+        kept.append(rule)
+    return kept
+
+
+def minify_declarations(body):
+    """
+    Remove the insignificant whitespace of a declaration block.
+
+    Args:
+        body: The declarations of a rule.
+
+    Returns:
+        str: The declarations on one line.
+    """
+    return re.sub(r"\s*([;{}])\s*", r"\1", " ".join(body.split())).rstrip(";")
+
+
+def serialize(rules, indent=""):
+    """
+    Write rules as a stylesheet, one rule per line.
+
+    Args:
+        rules: The rules.
+        indent: The indentation of the rules, for nested blocks.
+
+    Returns:
+        str: The stylesheet.
+    """
+    lines = []
+    for rule in rules:
+        if rule.body is None:
+            lines.append(f"{indent}{rule.prelude};")
+        elif isinstance(rule.body, list):
+            lines.append(f"{indent}{rule.prelude} {{")
+            lines.append(serialize(rule.body, indent + "  "))
+            lines.append(f"{indent}}}")
+        else:
+            selectors = ",".join(split_selectors(rule.prelude))
+            lines.append(f"{indent}{selectors}{{{minify_declarations(rule.body)}}}")
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+"""
+Streaming export helpers for the OC Lettings project.
+
+This module provides the base class of the ``export_*`` management
+commands. Rows are read with ``values_list().iterator()``, which uses a
+server-side cursor on PostgreSQL, and written one at a time as CSV or JSON
+Lines, optionally gzip-compressed, so memory stays constant whatever the
+size of the table.
+"""
+
+import contextlib
+import csv
+import datetime
+import gzip
+import io
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+FORMATS = ("csv", "jsonl")
+
+
+def write_csv(stream, header, rows):
+    """
+    Write rows as CSV with a header line.
+
+    Args:
+        stream: A text stream.
+        header: The column names.
+        rows: An iterable of value tuples.
+
+    Returns:
+        int: The number of rows written.
+    """
+    writer = csv.writer(stream)
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow(
+            value.isoformat() if isinstance(value, datetime.datetime) else value
+            for value in row
+        )
+        count += 1
+    return count
+
+
+def write_jsonl(stream, header, rows):
+    """
+    Write rows as JSON Lines, one object per row.
+
+    Args:
+        stream: A text stream.
+        header: The column names, used as object keys.
+        rows: An iterable of value tuples.
+
+    Returns:
+        int: The number of rows written.
+    """
+    count = 0
+    for row in rows:
+        stream.write(json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder))
+        stream.write("\n")
+        count += 1
+    return count
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+@contextlib.contextmanager
+def open_output(path, compress):
+    """
+    Open the export destination as a text stream.
+
+    Args:
+        path: The output file path, or - for stdout.
+        compress: True to gzip the output.
+
+    Yields:
+        A text stream.
+    """
+    if path == "-":
+        if not compress:
+            yield sys.stdout
+            sys.stdout.flush()
+            return
+        with gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb") as binary:
+            with io.TextIOWrapper(binary, encoding="utf-8", newline="") as stream:
+                yield stream
+        return
+    try:
+        if compress:
+            output = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            output = open(path, "w", encoding="utf-8", newline="")
+    except OSError as error:
+        raise CommandError(f"Cannot open {path}: {error}")
+    with output:
+        yield output
+
+
+class ExportCommand(BaseCommand):
+    """
+    Base class of the streaming export commands.
+
+    Subclasses define ``columns``, a sequence of ``(name, lookup)`` pairs,
+    and ``get_queryset()``. Related fields are read through the lookups of
+    ``values_list``, so they are joined in the same query.
+    """
+
+    columns = ()
+
+    def get_queryset(self):
+        """Return the queryset to export."""
+        raise NotImplementedError
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "-o", "--output",
+            default="-",
+            help="Output file (default: stdout). A .gz suffix enables gzip.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default="csv",
+            help="Output format (default: csv).",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the output with gzip.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched per database round trip (default: 2000).",
+        )
+
+    def handle(self, *args, **options):
+        """Run the export."""
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be a positive integer.")
+        output = options["output"]
+        compress = options["gzip"] or output.endswith(".gz")
+        header = [name for name, _ in self.columns]
+        rows = (
+            self.get_queryset()
+            .order_by("pk")
+            .values_list(*(lookup for _, lookup in self.columns))
+            .iterator(chunk_size=options["chunk_size"])
+        )
+        started = time.perf_counter()
+        with open_output(output, compress) as stream:
+            count = WRITERS[options["format"]](stream, header, rows)
+        elapsed = time.perf_counter() - started
+        self.stderr.write(
+            f"Exported {count} rows in {elapsed:.2f}s", style_func=self.style.SUCCESS
+        )
@@ -0,0 +1,232 @@
+"""
+Responsive variants of the theme images.
+
+During ``collectstatic``, ``ImageVariantsMixin`` writes, for each PNG or
+JPEG image under ``assets/img``, copies resized to the
+``STATIC_IMAGE_WIDTHS`` narrower than the image, in its own format and in
+WebP and AVIF (``assets/img/logo.140w.webp``). The variants are added to
+the collected files, so the storage hashes and compresses them like the
+others. A variant is only kept if it is smaller than the image it replaces.
+
+The variants of each image are listed in ``images.json`` in
+``STATIC_ROOT``, which the ``{% picture %}`` tag reads to write the
+``<picture>`` element of an image. The variants need Pillow, from the
+``production`` Poetry group installed in the Docker image: without it,
+or for an AVIF-less Pillow, ``collectstatic`` logs the missing formats
+and the pages link the original image. Pillow is only imported by
+``collectstatic``, not by the web workers which import this storage.
+"""
+
+import io
+import json
+import logging
+import os
+import posixpath
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+IMAGES_NAME = "images.json"
+IMAGE_DIR = "assets/img/"
+
+# Media type and Pillow format of the images, by extension
+SOURCE_FORMATS = {
+    ".png": ("image/png", "PNG"),
+    ".jpg": ("image/jpeg", "JPEG"),
+    ".jpeg": ("image/jpeg", "JPEG"),
+}
+# Formats of the variants, smallest first, with their encoding options
+VARIANT_FORMATS = {
+    ".avif": ("image/avif", "AVIF", {"quality": 60}),
+    ".webp": ("image/webp", "WEBP", {"quality": 80, "method": 6}),
+}
+SAVE_OPTIONS = {"PNG": {"optimize": True}, "JPEG": {"quality": 85, "optimize": True}}
+
+
+@lru_cache(maxsize=1)
+def load_pillow():
+    """
+    Import Pillow on first use.
+
+    Returns:
+        module: The ``PIL.Image`` module, or None if Pillow is not installed.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def available_formats():
+    """
+    Return the variant formats Pillow can write.
+
+    Returns:
+        dict: The entries of ``VARIANT_FORMATS`` supported by Pillow.
+    """
+    if load_pillow() is None:
+        return {}
+    from PIL import features
+
+    return {
+        extension: variant for extension, variant in VARIANT_FORMATS.items()
+        if features.check(variant[1].lower())
+    }
+
+
+def variant_name(name, width, extension):
+    """
+    Return the name of a variant of an image.
+
+    Args:
+        name: The name of the image.
+        width: The width of the variant, or None for the full width.
+        extension: The extension of the variant.
+
+    Returns:
+        str: ``logo.140w.webp`` for ``logo.png`` at 140 pixels.
+    """
+    root = os.path.splitext(name)[0]
+    return f"{root}.{width}w{extension}" if width else f"{root}{extension}"
+
+
+def encode(image, image_format, options):
+    """
+    Encode an image.
+
+    Args:
+        image: The Pillow image.
+        image_format: The Pillow format name.
+        options: The encoder options.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    output = io.BytesIO()
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    image.save(output, image_format, **options)
+    return output.getvalue()
+
+
+def build_variants(name, data, widths, formats):
+    """
+    Build the variants of an image.
+
+    Args:
+        name: The name of the image.
+        data: The content of the image.
+        widths: The widths of the resized variants.
+        formats: The variant formats, as in ``VARIANT_FORMATS``.
+
+    Returns:
+        tuple: The (width, height) of the image, the content of each
+        variant by name, and the (media type, width, name) of each source,
+        the image itself included.
+    """
+    pil_image = load_pillow()
+    extension = os.path.splitext(name)[1]
+    media_type, source_format = SOURCE_FORMATS[extension.lower()]
+    with pil_image.open(io.BytesIO(data)) as image:
+        image.load()
+    size = image.size
+    files = {}
+    sources = [(media_type, size[0], name)]
+    resized = {None: (image, len(data))}
+    for width in sorted(set(widths)):
+        if width < size[0]:
+            copy = image.resize((width, round(size[1] * width / size[0])), pil_image.LANCZOS)
+            content = encode(copy, source_format, SAVE_OPTIONS[source_format])
+            if len(content) < len(data):
+                resized[width] = (copy, len(content))
+                files[variant_name(name, width, extension)] = content
+                sources.append((media_type, width, variant_name(name, width, extension)))
+    for variant_extension, (variant_type, variant_format, options) in formats.items():
+        for width, (copy, fallback_size) in resized.items():
+            content = encode(copy, variant_format, options)
+            if len(content) < fallback_size:
+                files[variant_name(name, width, variant_extension)] = content
+                sources.append((variant_type, width or size[0],
+                                variant_name(name, width, variant_extension)))
+    return size, files, sources
+
+
+def read_images(static_root):
+    """
+    Read the variants of the images listed by ``collectstatic``.
+
+    Args:
+        static_root: The ``STATIC_ROOT`` directory.
+
+    Returns:
+        dict: The width, height and sources of each image, by name, or an
+        empty dict if ``collectstatic`` did not write the list.
+    """
+    try:
+        with open(os.path.join(static_root, IMAGES_NAME), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+class ImageVariantsMixin:
+    """Static files storage mixin writing the responsive variants of the images."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        """Add the image variants to the collected files, then process them all."""
+        if not dry_run:
+            paths = {**paths, **self.write_image_variants(paths)}
+        yield from super().post_process(paths, dry_run, **options)
+
+    def write_image_variants(self, paths):
+        """
+        Write the variants of the collected images and their list.
+
+        Args:
+            paths: The storage and path of each collected file, by name.
+
+        Returns:
+            dict: The storage and path of each written variant, by name.
+        """
+        images = {
+            name for name in paths
+            if name.replace(os.sep, "/").startswith(IMAGE_DIR)
+            and os.path.splitext(name)[1].lower() in SOURCE_FORMATS
+        }
+        # A list from a previous build would link variants not written again
+        if self.exists(IMAGES_NAME):
+            self.delete(IMAGES_NAME)
+        if not images:
+            return {}
+        if load_pillow() is None:
+            logger.warning("Pillow is not installed, the images have no variants")
+            return {}
+        formats = available_formats()
+        for extension, (_, variant_format, _) in VARIANT_FORMATS.items():
+            if extension not in formats:
+                logger.warning("Pillow cannot write %s, the images have no such variants",
+                               variant_format)
+
+        variants = {}
+        index = {}
+        for name in sorted(images):
+            storage, path = paths[name]
+            with storage.open(path) as file:
+                data = file.read()
+            size, files, sources = build_variants(
+                name, data, settings.STATIC_IMAGE_WIDTHS, formats
+            )
+            for variant, content in files.items():
+                if self.exists(variant):
+                    self.delete(variant)
+                self.save(variant, ContentFile(content))
+                variants[variant] = (self, variant)
+            index[posixpath.join(*name.split(os.sep))] = {
+                "width": size[0], "height": size[1], "sources": sources,
+            }
+        self.save(IMAGES_NAME, ContentFile(json.dumps(index).encode()))
+        return variants
@@ -0,0 +1,162 @@
+"""
+Logging helpers of the OC Lettings project.
+
+- ``BackgroundStreamHandler`` is a ``QueueHandler``: the request thread
+  only puts its records in a queue, and a ``QueueListener`` thread formats
+  them and writes them to the stream. Forked workers (gunicorn
+  ``--preload``) restart the listener of the handlers they inherit.
+- ``JsonFormatter`` writes each record as one JSON object per line, with
+  the fields passed in ``extra`` (the request measurements of
+  ``oc_lettings_site.timing``, the pool stats...).
+- ``parse_log_levels`` reads the per-logger levels of ``LOG_LEVELS``.
+
+Messages below the level of their logger cost a level check only; code
+preparing debug-only data checks ``logger.isEnabledFor(logging.DEBUG)``.
+"""
+
+import copy
+import json
+import logging
+import os
+import queue
+import weakref
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# The attributes of every LogRecord, the others come from ``extra``
+RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime", "taskName"}
+
+_handlers = weakref.WeakSet()
+
+
+def parse_log_levels(value):
+    """
+    Parse the per-logger levels of ``LOG_LEVELS``.
+
+    Args:
+        value: Comma-separated ``logger=LEVEL`` pairs, e.g.
+            ``lettings=DEBUG,oc_lettings_site.timing=WARNING``.
+
+    Returns:
+        dict: The level name of each logger.
+
+    Raises:
+        ValueError: If a pair has no ``=`` or an unknown level.
+    """
+    levels = {}
+    for pair in filter(None, (pair.strip() for pair in value.split(","))):
+        name, separator, level = pair.partition("=")
+        level = level.strip().upper()
+        if not separator or not name.strip() or level not in logging.getLevelNamesMapping():
+            raise ValueError(f"Invalid log level {pair!r}")
+        levels[name.strip()] = level
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as a JSON object on one line."""
+
+    def format(self, record):
+        """
+        Format a record.
+
+        Args:
+            record: The log record.
+
+        Returns:
+            str: The JSON object, with the time, level, logger, message,
+            exception and ``extra`` fields of the record.
+        """
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        for name, value in vars(record).items():
+            if name not in RECORD_ATTRIBUTES:
+                data[name] = value
+        return json.dumps(data, default=str)
+
+
+class BackgroundStreamHandler(QueueHandler):
+    """
+    A stream handler writing from a background thread.
+
+    The formatter set by the logging configuration applies to the stream
+    handler run by the listener, so records are formatted in the
+    background too. The level applies to this handler, so records below it
+    are dropped before they are queued.
+
+    Attributes:
+        target: The ``StreamHandler`` writing the records.
+        listener: The ``QueueListener`` thread feeding it.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(None)
+        self.target = logging.StreamHandler(stream)
+        self.listener = None
+        self.start()
+        _handlers.add(self)
+
+    def setFormatter(self, fmt):
+        """Set the formatter of the stream handler."""
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Prepare a record for the queue, without formatting it.
+
+        The message is merged with its arguments now, since they may change
+        once the call returns, and the traceback is rendered while it exists.
+
+        Args:
+            record: The log record.
+
+        Returns:
+            LogRecord: A copy of the record, ready to be formatted later.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            formatter = self.target.formatter or logging.Formatter()
+            record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def start(self):
+        """Start a new queue and its listener thread."""
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def close(self):
+        """Write the queued records and stop the listener."""
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+        super().close()
+
+
+def restart_listeners():
+    """
+    Restart the listeners of the handlers inherited by a forked process.
+
+    The listener threads of the parent do not exist in the child, and the
+    records queued before the fork are the parent's to write.
+    """
+    for handler in list(_handlers):
+        if handler.listener is not None:
+            handler.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=restart_listeners)
@@ -0,0 +1,209 @@
+"""
+Management command to measure the cost of the Sentry SDK per request.
+
+Each configuration runs in a fresh Python process, since the SDK patches
+Django once per process, and serves the pages through the WSGI
+application like ``benchmark_servers``:
+
+- "off": no Sentry;
+- "full": the former settings, every request traced and profiled, with
+  PII and the Python logs sent;
+- "tail": ``init_sentry`` with ``SENTRY_SLOW_REQUEST_SECONDS=1``, every
+  request traced but only the errors, the slow requests and a sample sent;
+- "head": ``init_sentry`` with the default settings, only a sample of the
+  requests traced.
+
+The SDK sends its envelopes to a local stub transport which serializes
+and counts them, so no Sentry server is needed. The p50 overhead is the
+difference with "off".
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import sentry_sdk
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from sentry_sdk.transport import Transport
+
+from oc_lettings_site.monitoring import init_sentry
+
+from .benchmark_servers import get_default_paths, get_host, run_wsgi
+
+CONFIGS = ("off", "full", "tail", "head")
+
+STUB_DSN = "http://public@localhost/1"
+
+# Environment of each process, read by the settings
+CONFIG_ENVIRONMENT = {
+    "off": {},
+    "full": {},
+    "tail": {"SENTRY_SLOW_REQUEST_SECONDS": "1.0"},
+    "head": {"SENTRY_SLOW_REQUEST_SECONDS": "0"},
+}
+
+
+class CountingTransport(Transport):
+    """
+    A Sentry transport which counts the envelopes instead of sending them.
+
+    Envelopes are serialized like the HTTP transport does before sending
+    them, so that their cost is measured.
+
+    Attributes:
+        items: The number of items sent, by type ("transaction", "profile"...).
+        size: The number of bytes sent.
+    """
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.items = {}
+        self.size = 0
+
+    def capture_envelope(self, envelope):
+        """Serialize an envelope and count its items."""
+        self.size += len(envelope.serialize())
+        for item in envelope.items:
+            self.items[item.type] = self.items.get(item.type, 0) + 1
+
+
+def start_sentry(config, transport):
+    """
+    Start the Sentry SDK of a configuration.
+
+    Args:
+        config: One of ``CONFIGS``.
+        transport: The stub transport.
+    """
+    if config == "off":
+        return
+    if config == "full":
+        sentry_sdk.init(
+            dsn=STUB_DSN,
+            transport=transport,
+            traces_sample_rate=1.0,
+            profiles_sample_rate=1.0,
+            send_default_pii=True,
+            enable_logs=True,
+        )
+        return
+    init_sentry(
+        STUB_DSN,
+        transport=transport,
+        profiles_sample_rate=settings.SENTRY_PROFILES_SAMPLE_RATE,
+        send_default_pii=settings.SENTRY_SEND_DEFAULT_PII,
+        enable_logs=settings.SENTRY_ENABLE_LOGS,
+    )
+
+
+class Command(BaseCommand):
+    """Compare the throughput and latency of the pages with each Sentry configuration."""
+
+    help = "Measure the overhead of the Sentry SDK per request, with a stub transport."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--requests", type=int, default=200,
+            help="Number of requests per page (default: 200).",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=1,
+            help="Number of threads (default: 1).",
+        )
+        parser.add_argument(
+            "--config", choices=CONFIGS,
+            help="Run a single configuration in this process (default: all, in new processes).",
+        )
+        parser.add_argument(
+            "--json", action="store_true",
+            help="Print the results as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the benchmark."""
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        if options["config"]:
+            results = {options["config"]: self.run_config(options)}
+        else:
+            results = {config: self.spawn_config(config, options) for config in CONFIGS}
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{options['requests']} requests per page, concurrency {options['concurrency']}"
+        )
+        self.stdout.write(
+            f"{'config':<6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'overhead':>9} "
+            f"{'traces':>7} {'sent KB':>8}"
+        )
+        baseline = results.get("off", {}).get("p50_ms")
+        for config, result in results.items():
+            overhead = (
+                f"{result['p50_ms'] - baseline:+.2f}" if baseline is not None else "-"
+            )
+            self.stdout.write(
+                f"{config:<6} {result['requests_per_second']:>9} {result['p50_ms']:>8} "
+                f"{result['p99_ms']:>8} {overhead:>9} {result['transactions']:>7} "
+                f"{result['sent_kb']:>8}"
+            )
+
+    def run_config(self, options):
+        """
+        Benchmark one configuration in this process.
+
+        Args:
+            options: The command options.
+
+        Returns:
+            dict: The measurements of ``run_wsgi``, with the numbers of
+            transactions and profiles sent and their size.
+
+        Raises:
+            CommandError: If every request failed.
+        """
+        transport = CountingTransport()
+        start_sentry(options["config"], transport)
+        result = run_wsgi(
+            get_default_paths(), options["requests"], options["concurrency"], get_host()
+        )
+        sentry_sdk.flush()
+        if result["errors"] == result["requests"]:
+            raise CommandError("Every request failed: check ALLOWED_HOSTS and the database.")
+        result["transactions"] = transport.items.get("transaction", 0)
+        result["profiles"] = transport.items.get("profile", 0)
+        result["sent_kb"] = round(transport.size / 1024, 1)
+        return result
+
+    def spawn_config(self, config, options):
+        """
+        Benchmark one configuration in a new process, with its environment.
+
+        Args:
+            config: One of ``CONFIGS``.
+            options: The command options.
+
+        Returns:
+            dict: The measurements of the configuration.
+
+        Raises:
+            CommandError: If the process fails.
+        """
+        command = [
+            sys.executable, "-m", "django", "benchmark_sentry", "--config", config, "--json",
+            "--requests", str(options["requests"]),
+            "--concurrency", str(options["concurrency"]),
+        ]
+        # The settings must not start Sentry with a real DSN
+        environ = {**os.environ, "SENTRY_DSN": "", **CONFIG_ENVIRONMENT[config]}
+        environ.setdefault("DJANGO_SETTINGS_MODULE", "oc_lettings_site.settings")
+        process = subprocess.run(
+            command, cwd=settings.BASE_DIR, env=environ, capture_output=True, text=True
+        )
+        if process.returncode:
+            raise CommandError(f"The {config} benchmark failed:\n{process.stderr}")
+        return json.loads(process.stdout)[config]
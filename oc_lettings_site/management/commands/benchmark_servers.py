@@ -0,0 +1,541 @@
+"""
+Management command to compare the WSGI and ASGI setups of the project.
+
+Each setup runs in a fresh Python process, as a server worker would:
+
+- "wsgi": ``get_wsgi_application()`` with the synchronous views, called
+  by a pool of threads like gunicorn's ``--threads``;
+- "asgi": ``get_asgi_application()`` with the async views
+  (``ASYNC_VIEWS=true``), called by concurrent tasks of an event loop like
+  uvicorn.
+
+The requests are sent in-process, without sockets, so the numbers measure
+Django, the middleware and the views, not the HTTP servers. Throughput,
+p50/p95/p99 latency and database queries per request are reported overall
+and per page. Run ``seed_database`` first to measure large volumes.
+
+``--output`` saves the results as JSON, with the row counts and options of
+the run; ``--compare`` reports the changes from a saved run and fails if a
+page got slower than ``--max-regression``.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_started
+from django.urls import reverse
+
+from lettings.models import Letting
+from oc_lettings_site.timing import install_query_recorder, timed
+from profiles.models import Profile
+
+from .benchmark_sqlite import percentile
+
+SERVERS = ("wsgi", "asgi")
+
+# p95 changes below this are noise, whatever their percentage
+MIN_CHANGE_MS = 1.0
+
+# Environment of each worker process, as set by oc_lettings_site/asgi.py
+SERVER_ENVIRONMENT = {
+    "wsgi": {"ASYNC_VIEWS": "false"},
+    "asgi": {"ASYNC_VIEWS": "true", "DB_CONN_MAX_AGE": "0"},
+}
+
+
+def get_default_paths():
+    """
+    Return the pages requested by default.
+
+    Returns:
+        list: The home page, the index pages and the first detail pages.
+    """
+    paths = [reverse("index"), reverse("lettings:index"), reverse("profiles:index")]
+    letting_id = Letting.objects.order_by("pk").values_list("pk", flat=True).first()
+    if letting_id is not None:
+        paths.append(reverse("lettings:letting", args=[letting_id]))
+    username = (
+        Profile.objects.order_by("pk").values_list("user__username", flat=True).first()
+    )
+    if username is not None:
+        paths.append(reverse("profiles:profile", args=[username]))
+    return paths
+
+
+def get_host():
+    """Return a host name accepted by ``ALLOWED_HOSTS``."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*" and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def split_path(path):
+    """
+    Split a URL path from its query string.
+
+    Args:
+        path: The path, e.g. ``/lettings/?after=10``.
+
+    Returns:
+        tuple: The path and the query string.
+    """
+    path, _, query = path.partition("?")
+    return path, query
+
+
+def call_wsgi(application, path, host):
+    """
+    Send a GET request to a WSGI application.
+
+    Args:
+        application: The WSGI application.
+        path: The URL path, with its query string.
+        host: The Host header.
+
+    Returns:
+        int: The status code of the response.
+    """
+    path, query = split_path(path)
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": host,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host,
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split(" ", 1)[0]))
+
+    body = application(environ, start_response)
+    try:
+        for _ in body:
+            pass
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    return statuses[0]
+
+
+async def call_asgi(application, path, host):
+    """
+    Send a GET request to an ASGI application.
+
+    Args:
+        application: The ASGI application.
+        path: The URL path, with its query string.
+        host: The Host header.
+
+    Returns:
+        int: The status code of the response.
+    """
+    path, query = split_path(path)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", host.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (host, 80),
+    }
+    request_sent = False
+    finished = asyncio.Event()
+    status = None
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            finished.set()
+
+    await application(scope, receive, send)
+    finished.set()
+    return status
+
+
+def summarize(samples, elapsed):
+    """
+    Compute the measurements of a run.
+
+    Args:
+        samples: ``(path, status, latency, queries)`` tuples of the requests.
+        elapsed: The duration of the run, in seconds.
+
+    Returns:
+        dict: The throughput, latency percentiles, mean number of database
+        queries and errors, overall and per path.
+    """
+    def measure(rows, errors):
+        latencies = [latency for _, latency, _ in rows]
+        return {
+            "requests": len(rows),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "queries": round(sum(queries for _, _, queries in rows) / len(rows), 2)
+            if rows else 0.0,
+            "errors": errors,
+        }
+
+    result = measure([sample[1:] for sample in samples], 0)
+    result["requests_per_second"] = round(len(samples) / elapsed, 1)
+    result["paths"] = {}
+    for path in dict.fromkeys(sample[0] for sample in samples):
+        rows = [sample[1:] for sample in samples if sample[0] == path]
+        errors = sum(1 for status, _, _ in rows if status >= 400)
+        result["paths"][path] = measure(rows, errors)
+        result["errors"] += errors
+    return result
+
+
+def compare(previous, results, max_regression):
+    """
+    Compare the results of a run with a saved run.
+
+    Args:
+        previous: The results of the saved run.
+        results: The results of this run.
+        max_regression: The accepted p95 increase and throughput decrease,
+            as a fraction.
+
+    Returns:
+        tuple: The ``(server, page, old p95, new p95, change)`` rows of the
+        pages measured in both runs, the pages as "(all)" for the
+        throughput, and the list of the regressions beyond
+        ``max_regression``. A p95 increase under ``MIN_CHANGE_MS`` is not a
+        regression.
+    """
+    def change(old, new):
+        return (new - old) / old if old else 0.0
+
+    rows = []
+    regressions = []
+    for server, result in results.items():
+        if server not in previous:
+            continue
+        for path, measures in result["paths"].items():
+            old = previous[server]["paths"].get(path)
+            if old is None:
+                continue
+            delta = change(old["p95_ms"], measures["p95_ms"])
+            rows.append((server, path, old["p95_ms"], measures["p95_ms"], delta))
+            if delta > max_regression and measures["p95_ms"] - old["p95_ms"] >= MIN_CHANGE_MS:
+                regressions.append(f"{server} {path}: p95 {delta:+.0%}")
+        old = previous[server]["requests_per_second"]
+        delta = change(old, result["requests_per_second"])
+        rows.append((server, "(all)", old, result["requests_per_second"], delta))
+        if -delta > max_regression:
+            regressions.append(f"{server}: throughput {delta:+.0%}")
+    return rows, regressions
+
+
+def run_wsgi(paths, requests, concurrency, host):
+    """
+    Benchmark the WSGI application with a pool of threads.
+
+    Args:
+        paths: The URL paths, requested in turn.
+        requests: The number of requests per path.
+        concurrency: The number of threads.
+        host: The Host header.
+
+    Returns:
+        dict: The measurements of ``summarize``.
+    """
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+
+    def measure(path):
+        started = time.perf_counter()
+        with timed() as timer:
+            status = call_wsgi(application, path, host)
+        return path, status, time.perf_counter() - started, timer.queries
+
+    for path in paths:
+        call_wsgi(application, path, host)  # Warm up the caches
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(measure, paths * requests))
+    return summarize(samples, time.perf_counter() - started)
+
+
+def run_asgi(paths, requests, concurrency, host):
+    """
+    Benchmark the ASGI application with concurrent tasks.
+
+    Args:
+        paths: The URL paths, requested in turn.
+        requests: The number of requests per path.
+        concurrency: The maximum number of requests in flight.
+        host: The Host header.
+
+    Returns:
+        dict: The measurements of ``summarize``.
+    """
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def main():
+        for path in paths:
+            await call_asgi(application, path, host)  # Warm up the caches
+        slots = asyncio.Semaphore(concurrency)
+
+        async def measure(path):
+            async with slots:
+                started = time.perf_counter()
+                with timed() as timer:
+                    status = await call_asgi(application, path, host)
+                return path, status, time.perf_counter() - started, timer.queries
+
+        started = time.perf_counter()
+        samples = await asyncio.gather(*(measure(path) for path in paths * requests))
+        return summarize(samples, time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+
+class Command(BaseCommand):
+    """Compare the throughput and latency of the WSGI and ASGI setups."""
+
+    help = "Benchmark the pages under WSGI (sync views) and ASGI (async views)."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--requests", type=int, default=200,
+            help="Number of requests per page (default: 200).",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8,
+            help="Requests in flight: threads or tasks (default: 8).",
+        )
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="Page to request, repeatable (default: home, index and detail pages).",
+        )
+        parser.add_argument(
+            "--server", choices=SERVERS,
+            help="Run a single setup in this process (default: both, in new processes).",
+        )
+        parser.add_argument(
+            "--json", action="store_true",
+            help="Print the results as JSON.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Save the results, the row counts and the options to a JSON file.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="JSON file saved by --output to compare the results with.",
+        )
+        parser.add_argument(
+            "--max-regression", type=float, default=20.0,
+            help="Accepted p95 increase and throughput decrease with --compare, "
+                 "in percent (default: 20).",
+        )
+
+    def handle(self, *args, **options):
+        """Run the benchmark."""
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        previous = self.read_results(options["compare"]) if options["compare"] else None
+        if options["server"]:
+            results = {options["server"]: self.run_server(options)}
+        else:
+            results = {server: self.spawn_server(server, options) for server in SERVERS}
+        if options["output"]:
+            self.write_results(options["output"], results, options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.write_table(results, options)
+        if previous is not None:
+            self.write_comparison(previous, results, options["max_regression"] / 100)
+
+    def write_table(self, results, options):
+        """
+        Print the results as a table.
+
+        Args:
+            results: The measurements of each setup.
+            options: The command options.
+        """
+        self.stdout.write(
+            f"{options['requests']} requests per page, concurrency {options['concurrency']}"
+        )
+        self.stdout.write(
+            f"{'server':<6} {'page':<28} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'queries':>7} {'errors':>6}"
+        )
+        for server, result in results.items():
+            rows = [*result["paths"].items(), ("(all)", result)]
+            for path, measures in rows:
+                throughput = result["requests_per_second"] if measures is result else ""
+                self.stdout.write(
+                    f"{server:<6} {path:<28} {throughput:>9} {measures['p50_ms']:>8} "
+                    f"{measures['p95_ms']:>8} {measures['p99_ms']:>8} "
+                    f"{measures['queries']:>7} {measures['errors']:>6}"
+                )
+        if len(results) == 2 and results["wsgi"]["requests_per_second"]:
+            ratio = results["asgi"]["requests_per_second"] / results["wsgi"]["requests_per_second"]
+            self.stdout.write(self.style.SUCCESS(f"ASGI throughput: x{ratio:.2f}"))
+
+    def write_comparison(self, previous, results, max_regression):
+        """
+        Print the changes from a saved run.
+
+        Args:
+            previous: The results of the saved run.
+            results: The results of this run.
+            max_regression: The accepted regression, as a fraction.
+
+        Raises:
+            CommandError: If a page or a throughput regressed beyond it.
+        """
+        rows, regressions = compare(previous, results, max_regression)
+        self.stdout.write(f"{'server':<6} {'page':<28} {'before':>9} {'after':>9} {'change':>7}")
+        for server, path, old, new, delta in rows:
+            self.stdout.write(f"{server:<6} {path:<28} {old:>9} {new:>9} {delta:>+7.0%}")
+        if regressions:
+            raise CommandError("Performance regressions: " + ", ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regression."))
+
+    @staticmethod
+    def read_results(path):
+        """
+        Read the results saved by ``--output``.
+
+        Args:
+            path: The JSON file.
+
+        Returns:
+            dict: The measurements of each setup.
+
+        Raises:
+            CommandError: If the file cannot be read.
+        """
+        try:
+            with open(path, encoding="utf-8") as file:
+                return json.load(file)["results"]
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f"Cannot read the results of {path}: {error}")
+
+    @staticmethod
+    def write_results(path, results, options):
+        """
+        Save the results with the context of the run.
+
+        Args:
+            path: The JSON file.
+            results: The measurements of each setup.
+            options: The command options.
+        """
+        data = {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": settings.DATABASES["default"]["ENGINE"].rsplit(".", 1)[-1],
+            "lettings": Letting.objects.count(),
+            "profiles": Profile.objects.count(),
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "results": results,
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+    def run_server(self, options):
+        """
+        Benchmark one setup in this process.
+
+        Args:
+            options: The command options.
+
+        Returns:
+            dict: The measurements of the setup.
+
+        Raises:
+            CommandError: If every request failed.
+        """
+        paths = options["paths"] or get_default_paths()
+        request_started.connect(install_query_recorder, dispatch_uid="request_timing")
+        runner = run_asgi if options["server"] == "asgi" else run_wsgi
+        result = runner(paths, options["requests"], options["concurrency"], get_host())
+        if result["errors"] == result["requests"]:
+            raise CommandError(
+                "Every request failed: check ALLOWED_HOSTS and the database."
+            )
+        return result
+
+    def spawn_server(self, server, options):
+        """
+        Benchmark one setup in a new process, with its environment.
+
+        Args:
+            server: "wsgi" or "asgi".
+            options: The command options.
+
+        Returns:
+            dict: The measurements of the setup.
+
+        Raises:
+            CommandError: If the process fails.
+        """
+        command = [
+            sys.executable, "-m", "django", "benchmark_servers", "--server", server, "--json",
+            "--requests", str(options["requests"]),
+            "--concurrency", str(options["concurrency"]),
+        ]
+        for path in options["paths"] or ():
+            command += ["--path", path]
+        environ = {**os.environ, **SERVER_ENVIRONMENT[server]}
+        environ.setdefault("DJANGO_SETTINGS_MODULE", "oc_lettings_site.settings")
+        process = subprocess.run(
+            command, cwd=settings.BASE_DIR, env=environ, capture_output=True, text=True
+        )
+        if process.returncode:
+            raise CommandError(f"The {server} benchmark failed:\n{process.stderr}")
+        return json.loads(process.stdout)[server]
@@ -0,0 +1,249 @@
+"""
+Management command to benchmark the SQLite performance profile.
+
+For each profile, a temporary SQLite file is filled with lettings-like
+rows, then reader threads run primary key and range lookups while one
+writer thread commits small update transactions, as gunicorn threads do.
+The "default" profile uses the SQLite defaults (rollback journal,
+``synchronous=FULL``), the "tuned" profile the ``SQLITE_PRAGMAS`` setting
+with the WAL mode of the Docker image (``SQLITE_WAL``).
+Read and write throughput, read latency and "database is locked" errors
+are reported for each profile.
+"""
+
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site.sqlite import apply_pragmas
+
+PROFILES = ("default", "tuned")
+
+# Set by SQLITE_WAL, which local runs leave off: the files are temporary here
+WAL_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+
+# Python's default, which Django keeps: wait 5 seconds for a lock
+CONNECT_TIMEOUT = 5.0
+
+
+def create_database(path, rows):
+    """
+    Create a benchmark database with a lettings-like table.
+
+    Args:
+        path: The path of the SQLite file.
+        rows: The number of rows to insert.
+    """
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE letting (id INTEGER PRIMARY KEY, title TEXT, "
+            "city TEXT, updated_at REAL)"
+        )
+        connection.execute("CREATE INDEX letting_city_idx ON letting (city)")
+        connection.executemany(
+            "INSERT INTO letting (title, city, updated_at) VALUES (?, ?, ?)",
+            (
+                (f"Letting {number}", f"City {number % 100}", time.time())
+                for number in range(rows)
+            ),
+        )
+    connection.close()
+
+
+def percentile(values, fraction):
+    """
+    Return a percentile of a list of values.
+
+    Args:
+        values: The measured values.
+        fraction: The percentile, between 0 and 1.
+
+    Returns:
+        float: The value below which ``fraction`` of the values fall.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Workload:
+    """
+    Concurrent readers and one writer on a benchmark database.
+
+    Args:
+        path: The path of the SQLite file.
+        pragmas: The pragmas applied to each connection.
+        rows: The number of rows of the table.
+    """
+
+    def __init__(self, path, pragmas, rows):
+        self.path = path
+        self.pragmas = pragmas
+        self.rows = rows
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.read_latencies = []
+        self.writes = 0
+        self.errors = 0
+
+    def connect(self):
+        """Open a connection with the pragmas of the profile."""
+        connection = sqlite3.connect(self.path, timeout=CONNECT_TIMEOUT)
+        apply_pragmas(connection.cursor(), self.pragmas)
+        return connection
+
+    def read(self):
+        """Run lookups until stopped, recording their latency."""
+        connection = self.connect()
+        latencies = []
+        errors = 0
+        generator = random.Random()
+        while not self.stop.is_set():
+            letting_id = generator.randint(1, self.rows)
+            started = time.perf_counter()
+            try:
+                connection.execute(
+                    "SELECT id, title, city FROM letting WHERE id = ?", (letting_id,)
+                ).fetchall()
+                connection.execute(
+                    "SELECT id, title FROM letting WHERE id > ? ORDER BY id LIMIT 20",
+                    (letting_id,),
+                ).fetchall()
+            except sqlite3.OperationalError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+        connection.close()
+        with self.lock:
+            self.read_latencies.extend(latencies)
+            self.errors += errors
+
+    def write(self):
+        """Commit small update transactions until stopped."""
+        connection = self.connect()
+        generator = random.Random()
+        writes = 0
+        errors = 0
+        while not self.stop.is_set():
+            try:
+                with connection:
+                    for _ in range(10):
+                        connection.execute(
+                            "UPDATE letting SET updated_at = ? WHERE id = ?",
+                            (time.time(), generator.randint(1, self.rows)),
+                        )
+            except sqlite3.OperationalError:
+                errors += 1
+                continue
+            writes += 1
+        connection.close()
+        with self.lock:
+            self.writes += writes
+            self.errors += errors
+
+    def run(self, readers, duration):
+        """
+        Run the readers and the writer for a duration.
+
+        Args:
+            readers: The number of reader threads.
+            duration: The duration of the run, in seconds.
+
+        Returns:
+            dict: The throughput, latency and error measurements.
+        """
+        threads = [threading.Thread(target=self.read) for _ in range(readers)]
+        threads.append(threading.Thread(target=self.write))
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        latencies = self.read_latencies
+        return {
+            "reads_per_second": round(len(latencies) / elapsed, 1),
+            "read_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "read_p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "read_mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+            "writes_per_second": round(self.writes / elapsed, 1),
+            "lock_errors": self.errors,
+        }
+
+
+class Command(BaseCommand):
+    """Compare SQLite read throughput with and without the performance profile."""
+
+    help = "Benchmark concurrent SQLite reads with one writer, with and without tuning."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--readers", type=int, default=8,
+            help="Number of reader threads (default: 8).",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=5.0,
+            help="Duration of each run, in seconds (default: 5).",
+        )
+        parser.add_argument(
+            "--rows", type=int, default=10000,
+            help="Number of rows of the benchmark table (default: 10000).",
+        )
+        parser.add_argument(
+            "--profile", choices=PROFILES,
+            help="Run a single profile (default: both).",
+        )
+        parser.add_argument(
+            "--json", action="store_true",
+            help="Print the results as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the benchmark."""
+        if options["readers"] < 1 or options["rows"] < 1 or options["duration"] <= 0:
+            raise CommandError("--readers, --rows and --duration must be positive.")
+        if not settings.SQLITE_PRAGMAS and options["profile"] != "default":
+            raise CommandError("The SQLITE_PRAGMAS setting is empty (SQLITE_TUNING=false).")
+        profiles = [options["profile"]] if options["profile"] else list(PROFILES)
+        results = {}
+        for profile in profiles:
+            pragmas = {**WAL_PRAGMAS, **settings.SQLITE_PRAGMAS} if profile == "tuned" else {}
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "benchmark.sqlite3")
+                create_database(path, options["rows"])
+                workload = Workload(path, pragmas, options["rows"])
+                results[profile] = workload.run(options["readers"], options["duration"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{options['readers']} readers, 1 writer, {options['duration']}s per profile, "
+            f"{options['rows']} rows"
+        )
+        self.stdout.write(
+            f"{'profile':<8} {'reads/s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'writes/s':>9} {'locked':>7}"
+        )
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:<8} {result['reads_per_second']:>10} {result['read_p50_ms']:>8} "
+                f"{result['read_p95_ms']:>8} {result['writes_per_second']:>9} "
+                f"{result['lock_errors']:>7}"
+            )
+        if len(results) == 2 and results["default"]["reads_per_second"]:
+            ratio = results["tuned"]["reads_per_second"] / results["default"]["reads_per_second"]
+            self.stdout.write(self.style.SUCCESS(f"Tuned read throughput: x{ratio:.2f}"))
@@ -0,0 +1,132 @@
+"""
+Management command to measure the render time of the cached pages.
+
+The home page and the index pages are rendered through their views in
+three setups:
+
+- "uncached": the template loaders read and compile the templates on
+  every render, and nothing is cached, as before the render caches;
+- "loader": the cached template loader only;
+- "cached": the settings in use, with the cached template loader, the
+  cached home page and the cached list rows, warmed by one render.
+
+The mean and p95 render time of each page are reported for each setup.
+"""
+
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+
+from lettings import views as lettings_views
+from oc_lettings_site import views
+from profiles import views as profiles_views
+
+from .benchmark_sqlite import percentile
+
+PAGES = {
+    "home": views.index,
+    "lettings": lettings_views.index,
+    "profiles": profiles_views.index,
+}
+
+SETUPS = ("uncached", "loader", "cached")
+
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+def get_setup_settings(setup):
+    """
+    Return the settings of a setup.
+
+    Args:
+        setup: One of ``SETUPS``.
+
+    Returns:
+        dict: Settings for ``override_settings``, empty for "cached".
+    """
+    if setup == "cached":
+        return {}
+    if setup == "loader":
+        return {"CACHES": NO_CACHE}
+    templates = [dict(settings.TEMPLATES[0])]
+    templates[0]["OPTIONS"] = {
+        **templates[0]["OPTIONS"],
+        "loaders": settings.TEMPLATE_LOADERS,
+    }
+    return {"TEMPLATES": templates, "CACHES": NO_CACHE}
+
+
+def measure(view, renders):
+    """
+    Render a page repeatedly through its view.
+
+    Args:
+        view: The view function.
+        renders: The number of renders.
+
+    Returns:
+        dict: The mean and p95 render time, in milliseconds.
+    """
+    factory = RequestFactory()
+    view(factory.get("/"))  # Warm up the loaders and the caches
+    durations = []
+    for _ in range(renders):
+        request = factory.get("/")
+        started = time.perf_counter()
+        response = view(request)
+        durations.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise CommandError(f"{view.__module__}.{view.__name__}: {response.status_code}")
+    return {
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+        "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+    }
+
+
+class Command(BaseCommand):
+    """Compare the render time of the pages with and without the render caches."""
+
+    help = "Measure the render time of the home and index pages, uncached then cached."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--renders", type=int, default=200,
+            help="Number of renders per page and setup (default: 200).",
+        )
+        parser.add_argument(
+            "--json", action="store_true",
+            help="Print the results as JSON.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the measurements."""
+        if options["renders"] < 1:
+            raise CommandError("--renders must be positive.")
+        results = {}
+        for setup in SETUPS:
+            with override_settings(**get_setup_settings(setup)):
+                results[setup] = {
+                    name: measure(view, options["renders"]) for name, view in PAGES.items()
+                }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{options['renders']} renders per page")
+        self.stdout.write(
+            f"{'page':<9} {'setup':<9} {'mean ms':>9} {'p95 ms':>9} {'speedup':>8}"
+        )
+        for name in PAGES:
+            before = results["uncached"][name]["mean_ms"]
+            for setup in SETUPS:
+                result = results[setup][name]
+                speedup = before / result["mean_ms"] if result["mean_ms"] else 0.0
+                self.stdout.write(
+                    f"{name:<9} {setup:<9} {result['mean_ms']:>9} {result['p95_ms']:>9} "
+                    f"{f'x{speedup:.1f}':>8}"
+                )
@@ -0,0 +1,187 @@
+"""
+Management command to build the stylesheets of the pages from the theme.
+
+The classes and ids of the project templates are read, and two files are
+written next to the theme stylesheet (``css/styles.css``):
+
+- ``css/site.css``: the rules of the theme whose selectors only use these
+  classes and ids, loaded without blocking the first paint;
+- ``css/critical.css``: the rules used by the templates above their
+  ``{# below-the-fold #}`` marker (navbar, page title), inlined in the
+  ``<head>`` of ``base.html``. Rules with ``url()`` (the fonts) are left
+  to ``site.css``, as their relative URLs would break in the page.
+
+Classes added by JavaScript (Bootstrap, Feather) are listed in
+``SAFELIST``. The report compares the sizes of the stylesheets and
+estimates the time the render-blocking CSS costs the first paint on a slow
+mobile connection. ``--check`` fails if the files are not up to date, so
+that the tests catch a template changed without rebuilding them.
+"""
+
+import gzip
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site.css import find_template_names, parse, prune, serialize
+from oc_lettings_site.template_files import find_templates, get_template_dirs
+
+SOURCE = os.path.join("css", "styles.css")
+SITE = os.path.join("css", "site.css")
+CRITICAL = os.path.join("css", "critical.css")
+
+# Classes set by scripts.js, the Bootstrap bundle and Feather icons
+SAFELIST = {"feather", "show", "fade", "collapsing", "active", "disabled", "navbar-scrolled"}
+
+# Network of Lighthouse's mobile profile ("slow 4G")
+BANDWIDTH_KBPS = 1638.4
+RTT_MS = 150
+
+HEADER = "/* Generated by manage.py build_css from css/styles.css: do not edit. */\n"
+
+# License comments of the theme, kept at the top of site.css
+LICENSE = re.compile(r"/\*!.*?\*/\n?", re.DOTALL)
+
+
+def read_templates(directories):
+    """
+    Read the HTML templates of directories.
+
+    Args:
+        directories: The template directories.
+
+    Returns:
+        dict: The source of each template, by path.
+    """
+    sources = {}
+    for path, _ in find_templates(directories):
+        with open(path, encoding="utf-8") as file:
+            sources[path] = file.read()
+    return sources
+
+
+def build_stylesheet(rules, licenses=""):
+    """
+    Write pruned rules as a generated stylesheet.
+
+    Args:
+        rules: The kept rules.
+        licenses: The license comments to copy.
+
+    Returns:
+        str: The stylesheet, the ``@charset`` rule first as CSS requires.
+    """
+    charset = ""
+    if rules and rules[0].prelude.startswith("@charset"):
+        charset = serialize(rules[:1]) + "\n"
+        rules = rules[1:]
+    return charset + HEADER + licenses + serialize(rules) + "\n"
+
+
+def gzip_size(text):
+    """Return the size of a text compressed like WhiteNoise does."""
+    return len(gzip.compress(text.encode(), compresslevel=9))
+
+
+def transfer_ms(size):
+    """
+    Estimate the time to download a response on the slow 4G profile.
+
+    Args:
+        size: The compressed size, in bytes.
+
+    Returns:
+        float: One round trip plus the transfer time, in milliseconds.
+    """
+    return RTT_MS + size * 8 / BANDWIDTH_KBPS
+
+
+class Command(BaseCommand):
+    """Build the pruned and critical stylesheets from the theme."""
+
+    help = "Write css/site.css and css/critical.css with the theme rules used by the templates."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--static-dir", default=str(settings.STATICFILES_DIRS[0]),
+            help="Directory of the stylesheets (default: the first STATICFILES_DIRS).",
+        )
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Fail if the files are not up to date, without writing them.",
+        )
+
+    def handle(self, *args, **options):
+        """Build the stylesheets."""
+        directory = options["static_dir"]
+        try:
+            with open(os.path.join(directory, SOURCE), encoding="utf-8") as file:
+                source = file.read()
+        except OSError as error:
+            raise CommandError(f"Cannot read the theme stylesheet: {error}")
+        templates = read_templates(get_template_dirs())
+        if not templates:
+            raise CommandError("No template found.")
+
+        names = set(SAFELIST)
+        critical_names = set(SAFELIST)
+        for template in templates.values():
+            names |= find_template_names(template)
+            critical_names |= find_template_names(template, above_the_fold=True)
+        rules = parse(source)
+        licenses = "".join(LICENSE.findall(source[:source.find("{")]))
+        outputs = {
+            SITE: build_stylesheet(prune(rules, names), licenses),
+            CRITICAL: build_stylesheet(prune(rules, critical_names, keep_urls=False)),
+        }
+
+        if options["check"]:
+            stale = [name for name, text in outputs.items() if self.read(directory, name) != text]
+            if stale:
+                raise CommandError(
+                    f"{', '.join(stale)} not up to date: run manage.py build_css."
+                )
+            self.stdout.write(self.style.SUCCESS("The stylesheets are up to date."))
+            return
+        for name, text in outputs.items():
+            with open(os.path.join(directory, name), "w", encoding="utf-8") as file:
+                file.write(text)
+        self.write_report(len(templates), source, outputs)
+
+    @staticmethod
+    def read(directory, name):
+        """Return the content of a built stylesheet, or None if it is missing."""
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def write_report(self, template_count, source, outputs):
+        """
+        Print the sizes of the stylesheets and the first paint estimate.
+
+        Args:
+            template_count: The number of templates read.
+            source: The theme stylesheet.
+            outputs: The built stylesheets, by name.
+        """
+        self.stdout.write(f"{template_count} templates read")
+        self.stdout.write(f"{'file':<18} {'bytes':>9} {'gzip':>8}")
+        sizes = {SOURCE: source, **outputs}
+        for name, text in sizes.items():
+            self.stdout.write(
+                f"{name:<18} {len(text.encode()):>9} {gzip_size(text):>8}"
+            )
+        saved = 1 - len(outputs[SITE]) / len(source)
+        self.stdout.write(f"site.css is {saved:.1%} smaller than styles.css")
+        # The inlined CSS comes with the page: no round trip of its own
+        before = transfer_ms(gzip_size(source))
+        after = transfer_ms(gzip_size(outputs[CRITICAL])) - RTT_MS
+        self.stdout.write(self.style.SUCCESS(
+            f"Render-blocking CSS on slow 4G: {before:.0f} ms before (styles.css), "
+            f"{after:.0f} ms after (critical CSS inlined, site.css loaded after the first paint)"
+        ))
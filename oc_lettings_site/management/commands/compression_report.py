@@ -0,0 +1,151 @@
+"""
+Management command to report the compression of the collected static files.
+
+For each file of ``STATIC_ROOT`` with compressed variants, the report gives
+the size of the file and of its gzip, Brotli and Zstandard variants, as a
+percentage of the original, and the variant served to a browser accepting
+them all. With the manifest storage, only the hashed files (those the pages
+link) are listed, and only the project files (``STATICFILES_DIRS``) unless
+``--all`` is given. Run it after ``collectstatic``.
+"""
+
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site.compression import ENCODINGS, missing_encoders
+from oc_lettings_site.storage import MANIFEST_NAME
+
+
+def is_project_file(name):
+    """Return whether a static file comes from the project STATICFILES_DIRS."""
+    return any(
+        os.path.isfile(os.path.join(directory, name)) for directory in settings.STATICFILES_DIRS
+    )
+
+
+def find_files(static_root, all_files=False):
+    """
+    Return the files of a STATIC_ROOT which have compressed variants.
+
+    Args:
+        static_root: The ``STATIC_ROOT`` directory.
+        all_files: True to include the files of the installed applications.
+
+    Returns:
+        list: The names of the files, relative to ``static_root``.
+    """
+    try:
+        with open(os.path.join(static_root, MANIFEST_NAME), encoding="utf-8") as manifest:
+            # The manifest maps the original names to the hashed ones
+            originals = {value: key for key, value in json.load(manifest)["paths"].items()}
+    except (OSError, ValueError, KeyError, AttributeError):
+        originals = None
+    files = []
+    for root, _, filenames in os.walk(static_root):
+        for filename in filenames:
+            name = os.path.relpath(os.path.join(root, filename), static_root)
+            original = name if originals is None else originals.get(name.replace(os.sep, "/"))
+            if original is None:
+                continue
+            if not all_files and not is_project_file(original):
+                continue
+            if any(os.path.exists(os.path.join(root, filename + suffix)) for suffix in ENCODINGS):
+                files.append(name)
+    return sorted(files)
+
+
+def measure(path):
+    """
+    Return the size of a file and of its compressed variants.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        dict: The size in bytes of each encoding, None for the file itself.
+    """
+    sizes = {None: os.path.getsize(path)}
+    for suffix, encoding in ENCODINGS.items():
+        if os.path.exists(path + suffix):
+            sizes[encoding] = os.path.getsize(path + suffix)
+    return sizes
+
+
+class Command(BaseCommand):
+    """Report the compression ratios of the collected static files."""
+
+    help = "Report the size of the gzip, Brotli and Zstandard variants of the static files."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--static-root", default=settings.STATIC_ROOT,
+            help="Directory of the collected files (default: STATIC_ROOT).",
+        )
+        parser.add_argument(
+            "--all", action="store_true", dest="all_files",
+            help="Include the files of the installed applications (admin).",
+        )
+
+    def handle(self, *args, **options):
+        """Print the report."""
+        static_root = options["static_root"]
+        files = find_files(static_root, options["all_files"])
+        if not files:
+            raise CommandError(f"No compressed file in {static_root}: run collectstatic.")
+        for package in missing_encoders():
+            self.stdout.write(self.style.WARNING(f"{package} is not installed"))
+
+        encodings = list(ENCODINGS.values())
+        width = max(len(name) for name in files)
+        self.stdout.write(
+            f"{'file':<{width}} {'bytes':>9} "
+            + " ".join(f"{encoding:>7}" for encoding in encodings) + "  served"
+        )
+        # Per encoding, the total size of the variants and of their files
+        totals = {encoding: [0, 0] for encoding in encodings}
+        size = served_size = 0
+        for name in files:
+            sizes = measure(os.path.join(static_root, name))
+            served = min(sizes, key=sizes.get)
+            size += sizes[None]
+            served_size += sizes[served]
+            for encoding in encodings:
+                if encoding in sizes:
+                    totals[encoding][0] += sizes[encoding]
+                    totals[encoding][1] += sizes[None]
+            self.stdout.write(self.format_row(name, width, sizes, encodings, served))
+        ratios = {
+            encoding: compressed / original
+            for encoding, (compressed, original) in totals.items() if original
+        }
+        self.stdout.write(self.format_row(
+            "total", width, {None: size, **ratios}, encodings,
+            f"{served_size} bytes ({served_size / size:.1%})", relative=True,
+        ))
+
+    @staticmethod
+    def format_row(name, width, sizes, encodings, served, relative=False):
+        """
+        Format the sizes of a file.
+
+        Args:
+            name: The name of the file.
+            width: The width of the name column.
+            sizes: The size of each encoding, None for the file itself.
+            encodings: The encodings of the columns.
+            served: The encoding of the smallest variant.
+            relative: True if the sizes of the encodings are already ratios.
+
+        Returns:
+            str: The row, with the variants as a percentage of the file.
+        """
+        ratios = [
+            f"{sizes[encoding] / (1 if relative else sizes[None]):>7.1%}"
+            if encoding in sizes else f"{'-':>7}"
+            for encoding in encodings
+        ]
+        return f"{name:<{width}} {sizes[None]:>9} {' '.join(ratios)}  {served or 'identity'}"
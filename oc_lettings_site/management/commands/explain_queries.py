@@ -0,0 +1,187 @@
+"""
+Management command to audit the query plans of the public pages.
+
+Each public view is called in-process with sample arguments taken from
+the database, its SQL queries are captured, and every query is run again
+through ``EXPLAIN`` (``EXPLAIN QUERY PLAN`` on SQLite). Plans that read a
+whole table (``SCAN <table>`` on SQLite, ``Seq Scan`` on PostgreSQL) are
+flagged. The lookups used by reporting on ``Address`` are audited too.
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils.http import urlencode
+
+from lettings.models import Address, Letting
+from profiles.models import Profile
+
+# The page cache would hide the queries of the detail views
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+SQLITE_SEQ_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\S+)$")
+POSTGRESQL_SEQ_SCAN = re.compile(r"Seq Scan on (\S+)")
+
+
+def find_seq_scans(vendor, plan_lines):
+    """
+    Return the tables read by a sequential scan in a query plan.
+
+    Args:
+        vendor: The database vendor, ``"sqlite"`` or ``"postgresql"``.
+        plan_lines: The lines of the plan.
+
+    Returns:
+        list: The names of the scanned tables.
+    """
+    pattern = SQLITE_SEQ_SCAN if vendor == "sqlite" else POSTGRESQL_SEQ_SCAN
+    tables = []
+    for line in plan_lines:
+        match = pattern.search(line.strip())
+        if match:
+            tables.append(match.group(1))
+    return tables
+
+
+def explain(connection, sql):
+    """
+    Return the plan of a query as a list of lines.
+
+    Args:
+        connection: The database connection.
+        sql: The SQL of the query, with its parameters inlined.
+
+    Returns:
+        list: The lines of the plan.
+    """
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        rows = cursor.fetchall()
+    # SQLite returns (id, parent, notused, detail), PostgreSQL one text column
+    return [row[-1] for row in rows]
+
+
+class Command(BaseCommand):
+    """Run EXPLAIN on the queries of each public view and flag table scans."""
+
+    help = "Explain the queries of each public view and flag sequential scans."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--fail-on-seq-scan",
+            action="store_true",
+            help="Exit with an error if an unbounded sequential scan is found.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the audit."""
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"Unsupported database vendor: {connection.vendor}")
+        self.connection = connection
+        unbounded = 0
+        for label, run in self.get_targets():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            with CaptureQueriesContext(connection) as captured:
+                with override_settings(CACHES=NO_CACHE):
+                    run()
+            for query in captured.captured_queries:
+                unbounded += self.report(query["sql"])
+        if unbounded and options["fail_on_seq_scan"]:
+            raise CommandError(f"{unbounded} unbounded sequential scan(s) found.")
+
+    def report(self, sql):
+        """
+        Print the plan of a query and flag its sequential scans.
+
+        Args:
+            sql: The SQL of the query.
+
+        Returns:
+            int: 1 if the query scans a table without a LIMIT, else 0.
+        """
+        plan = explain(self.connection, sql)
+        self.stdout.write(f"  {sql}")
+        for line in plan:
+            self.stdout.write(f"    {line}")
+        tables = find_seq_scans(self.connection.vendor, plan)
+        if not tables:
+            return 0
+        bounded = " LIMIT " in sql.upper()
+        message = f"    SEQUENTIAL SCAN on {', '.join(tables)}"
+        if bounded:
+            self.stdout.write(self.style.WARNING(f"{message} (bounded by LIMIT)"))
+            return 0
+        self.stdout.write(self.style.ERROR(message))
+        return 1
+
+    def get_targets(self):
+        """
+        Return the pages and reporting lookups to audit.
+
+        Returns:
+            list: ``(label, callable)`` pairs running the queries.
+        """
+        factory = RequestFactory()
+
+        def view(name, *args, query=None):
+            url = reverse(name, args=args)
+            match = resolve(url)
+
+            def run():
+                request = factory.get(url, query)
+                response = match.func(request, *match.args, **match.kwargs)
+                if response.streaming:
+                    # Streamed pages only query the database while consumed
+                    b"".join(response.streaming_content)
+            label = f"{url}?{urlencode(query)}" if query else url
+            return f"{name} {label}", run
+
+        targets = [
+            view("index"),
+            view("lettings:index"),
+            view("lettings:index", query={"q": "house"}),
+            view("profiles:index"),
+            view("api:lettings"),
+        ]
+        letting = Letting.objects.select_related("address").first()
+        if letting is not None:
+            address = letting.address
+            lettings = Letting.objects.all()
+            targets += [
+                view("lettings:letting", letting.id),
+                view("api:letting", letting.id),
+                (
+                    "report: lettings by state and city",
+                    lambda: list(lettings.filter(
+                        address__state=address.state, address__city=address.city
+                    )),
+                ),
+                (
+                    "report: lettings by zip code",
+                    lambda: list(lettings.filter(address__zip_code=address.zip_code)),
+                ),
+                (
+                    "report: addresses by country",
+                    lambda: list(Address.objects.filter(
+                        country_iso_code=address.country_iso_code
+                    )[:100]),
+                ),
+                (
+                    "report: lettings ordered by title",
+                    lambda: list(lettings.order_by("title")[:100]),
+                ),
+            ]
+        profile = Profile.objects.select_related("user").first()
+        if profile is not None:
+            targets += [
+                view("profiles:profile", profile.user.username),
+                view("api:profile", profile.user.username),
+            ]
+        return targets
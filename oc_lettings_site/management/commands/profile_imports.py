@@ -0,0 +1,207 @@
+"""
+Management command to profile the imports of a process start.
+
+The module (``oc_lettings_site.wsgi`` by default, what each gunicorn
+worker imports without ``--preload``) is imported in fresh Python
+processes run with ``-X importtime``, and their report is parsed: the
+total import time, the slowest modules by cumulative time (the module
+and its own imports) and by self time, with the module which imported
+them, and the self time of each top-level package. Each module's times
+are the median of ``--runs`` processes; the first one also compiles the
+modules which have no bytecode yet.
+
+``--json`` prints the measurements as JSON, and ``--max-ms`` fails if
+the total exceeds a budget.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_MODULE = "oc_lettings_site.wsgi"
+
+
+def parse_importtime(output):
+    """
+    Parse the report of ``python -X importtime``.
+
+    Each line gives the self and cumulative time of an imported module, in
+    microseconds, its name indented by its depth. A module is listed after
+    the modules it imported.
+
+    Args:
+        output: The standard error of the process.
+
+    Returns:
+        list: A dict per module, in the order of the report, with its name,
+        depth, self and cumulative time and the name of the module which
+        imported it (None at the top level).
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        name = fields[2].rstrip()
+        entries.append({
+            "name": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_us": int(fields[0]),
+            "cumulative_us": int(fields[1]),
+            "parent": None,
+        })
+    # The parent of a module is the next module one level up
+    parents = []
+    for entry in reversed(entries):
+        del parents[entry["depth"]:]
+        if parents:
+            entry["parent"] = parents[-1]["name"]
+        parents.append(entry)
+    return entries
+
+
+def summarize(runs, module):
+    """
+    Combine the imports of several processes.
+
+    Args:
+        runs: The parsed reports, as returned by ``parse_importtime``.
+        module: The profiled module.
+
+    Returns:
+        dict: The median total time of ``module``, in milliseconds, and
+        the median times of each module and of each top-level package.
+    """
+    times = {}
+    for entries in runs:
+        for entry in entries:
+            times.setdefault(entry["name"], []).append(entry)
+    modules = []
+    for name, entries in times.items():
+        modules.append({
+            "name": name,
+            "parent": entries[0]["parent"],
+            "self_ms": statistics.median(entry["self_us"] for entry in entries) / 1000,
+            "cumulative_ms": statistics.median(
+                entry["cumulative_us"] for entry in entries
+            ) / 1000,
+        })
+    packages = {}
+    for entry in modules:
+        package = entry["name"].split(".")[0]
+        packages[package] = packages.get(package, 0) + entry["self_ms"]
+    total = next((entry["cumulative_ms"] for entry in modules if entry["name"] == module), 0)
+    return {
+        "module": module,
+        "runs": len(runs),
+        "total_ms": total,
+        "modules": modules,
+        "packages": dict(sorted(packages.items(), key=lambda item: -item[1])),
+    }
+
+
+class Command(BaseCommand):
+    """Profile the import time of the WSGI application."""
+
+    help = "Report the slowest imports of a module in a new process (python -X importtime)."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--module", default=DEFAULT_MODULE,
+            help=f"Module to import (default: {DEFAULT_MODULE}).",
+        )
+        parser.add_argument(
+            "--runs", type=int, default=5,
+            help="Number of processes, whose median is reported (default: 5).",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=15,
+            help="Number of modules listed per table (default: 15).",
+        )
+        parser.add_argument(
+            "--json", action="store_true",
+            help="Print the measurements as JSON.",
+        )
+        parser.add_argument(
+            "--max-ms", type=float,
+            help="Fail if the import takes longer, in milliseconds.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the profile."""
+        if options["runs"] < 1 or options["limit"] < 1:
+            raise CommandError("--runs and --limit must be positive.")
+        module = options["module"]
+        runs = [self.import_module(module) for _ in range(options["runs"])]
+        summary = summarize(runs, module)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+        else:
+            self.write_report(summary, options["limit"])
+        if options["max_ms"] is not None and summary["total_ms"] > options["max_ms"]:
+            raise CommandError(
+                f"Importing {module} takes {summary['total_ms']:.1f} ms, "
+                f"more than {options['max_ms']:g} ms."
+            )
+
+    @staticmethod
+    def import_module(module):
+        """
+        Import a module in a new process with ``-X importtime``.
+
+        Args:
+            module: The module to import.
+
+        Returns:
+            list: The parsed report, as returned by ``parse_importtime``.
+
+        Raises:
+            CommandError: If the import fails.
+        """
+        environ = {**os.environ}
+        environ.setdefault("DJANGO_SETTINGS_MODULE", "oc_lettings_site.settings")
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=settings.BASE_DIR, env=environ, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(f"Importing {module} failed:\n{process.stderr}")
+        return parse_importtime(process.stderr)
+
+    def write_report(self, summary, limit):
+        """
+        Print the summary as tables.
+
+        Args:
+            summary: The summary, as returned by ``summarize``.
+            limit: The number of rows of the module tables.
+        """
+        self.stdout.write(
+            f"{summary['module']}: {summary['total_ms']:.1f} ms "
+            f"(median of {summary['runs']} processes)"
+        )
+        modules = [entry for entry in summary["modules"] if entry["name"] != summary["module"]]
+        for title, key in (("cumulative", "cumulative_ms"), ("self", "self_ms")):
+            rows = sorted(modules, key=lambda entry: -entry[key])[:limit]
+            width = max((len(entry["name"]) for entry in rows), default=6)
+            self.stdout.write(f"\nSlowest modules by {title} time")
+            self.stdout.write(f"{'module':<{width}} {'ms':>8}  imported by")
+            for entry in rows:
+                self.stdout.write(
+                    f"{entry['name']:<{width}} {entry[key]:>8.1f}  {entry['parent'] or '-'}"
+                )
+        packages = list(summary["packages"].items())[:limit]
+        width = max((len(package) for package, _ in packages), default=7)
+        self.stdout.write("\nSelf time per package")
+        self.stdout.write(f"{'package':<{width}} {'ms':>8}")
+        for package, self_ms in packages:
+            self.stdout.write(f"{package:<{width}} {self_ms:>8.1f}")
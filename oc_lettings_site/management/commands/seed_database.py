@@ -0,0 +1,166 @@
+"""
+Management command to fill the database with generated lettings and profiles.
+
+The rows are built batch by batch and inserted with ``bulk_create``, each
+batch in its own transaction, so that ``benchmark_servers`` can be run on
+large volumes (10k, 100k, 1M rows). Usernames are numbered after the
+highest existing user id, so the command can be run again to add more rows.
+
+``bulk_create`` does not send the model signals: the cached rows of the
+index pages are invalidated once at the end.
+"""
+
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from lettings.models import Address, Letting
+from oc_lettings_site.cache import bump_fragment_version
+from profiles.models import Profile
+
+CITIES = (
+    ("Springfield", "IL"), ("Portland", "OR"), ("Austin", "TX"), ("Denver", "CO"),
+    ("Madison", "WI"), ("Raleigh", "NC"), ("Boise", "ID"), ("Albany", "NY"),
+)
+
+
+def build_letting(number):
+    """
+    Build an unsaved Letting and its Address.
+
+    Args:
+        number: The number of the generated letting.
+
+    Returns:
+        tuple: The unsaved Address and Letting.
+    """
+    city, state = CITIES[number % len(CITIES)]
+    address = Address(
+        number=number % 9999 + 1,
+        street=f"Benchmark Street {number // 9999 + 1}",
+        city=city,
+        state=state,
+        zip_code=number % 99999 + 1,
+        country_iso_code="USA",
+    )
+    return address, Letting(title=f"Benchmark letting {number}")
+
+
+def build_profile(number, password):
+    """
+    Build an unsaved Profile and its User.
+
+    Args:
+        number: The number of the generated profile.
+        password: The (unusable) password hash of the users.
+
+    Returns:
+        tuple: The unsaved User and Profile.
+    """
+    user = User(username=f"benchmark_{number}", password=password)
+    return user, Profile(favorite_city=CITIES[number % len(CITIES)][0])
+
+
+class Command(BaseCommand):
+    """Insert generated lettings and profiles in bulk."""
+
+    help = "Fill the database with generated lettings and profiles for benchmarks."
+
+    def add_arguments(self, parser):
+        """Define the command line arguments."""
+        parser.add_argument(
+            "--lettings", type=int, default=10000,
+            help="Number of lettings to insert (default: 10000).",
+        )
+        parser.add_argument(
+            "--profiles", type=int, default=10000,
+            help="Number of profiles to insert (default: 10000).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Number of rows inserted per transaction (default: 5000).",
+        )
+
+    def handle(self, *args, **options):
+        """Run the seeding."""
+        if options["lettings"] < 0 or options["profiles"] < 0:
+            raise CommandError("--lettings and --profiles cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+        self.verbosity = options["verbosity"]
+        started = time.perf_counter()
+
+        first = (Letting.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+        self.insert(
+            "lettings", self.insert_lettings, build_letting,
+            range(first, first + options["lettings"]), options["batch_size"],
+        )
+        first = (User.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+        password = make_password(None)
+        self.insert(
+            "profiles", self.insert_profiles,
+            lambda number: build_profile(number, password),
+            range(first, first + options["profiles"]), options["batch_size"],
+        )
+
+        elapsed = time.perf_counter() - started
+        rows = options["lettings"] + options["profiles"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {options['lettings']} lettings and {options['profiles']} profiles "
+            f"in {elapsed:.2f}s ({rows / elapsed if elapsed > 0 else 0:.0f} rows/s)."
+        ))
+
+    def insert(self, name, insert_batch, build, numbers, batch_size):
+        """
+        Build and insert pairs of rows in batches, one transaction per batch.
+
+        The rows of a batch are built just before it is inserted, so that
+        large volumes do not have to fit in memory.
+
+        Args:
+            name: The name of the rows, also their fragment cache version.
+            insert_batch: The function inserting a batch of pairs.
+            build: The function building the unsaved (parent, child) pair
+                of a number.
+            numbers: The numbers of the rows to insert.
+            batch_size: The number of pairs per transaction.
+        """
+        if not numbers:
+            return
+        for start in range(0, len(numbers), batch_size):
+            batch = [build(number) for number in numbers[start:start + batch_size]]
+            with transaction.atomic():
+                insert_batch(batch)
+            if self.verbosity >= 2:
+                self.stdout.write(f"{start + len(batch)} {name} inserted")
+        bump_fragment_version(name)
+
+    @staticmethod
+    def insert_lettings(batch):
+        """
+        Insert lettings and their addresses.
+
+        Args:
+            batch: The unsaved (Address, Letting) pairs.
+        """
+        addresses = Address.objects.bulk_create([address for address, _ in batch])
+        for address, (_, letting) in zip(addresses, batch):
+            letting.address = address
+        Letting.objects.bulk_create([letting for _, letting in batch])
+
+    @staticmethod
+    def insert_profiles(batch):
+        """
+        Insert profiles and their users.
+
+        Args:
+            batch: The unsaved (User, Profile) pairs.
+        """
+        users = User.objects.bulk_create([user for user, _ in batch])
+        for user, (_, profile) in zip(users, batch):
+            profile.user = user
+        Profile.objects.bulk_create([profile for _, profile in batch])
@@ -0,0 +1,473 @@
+"""
+Prometheus metrics of the OC Lettings project, shared by every worker.
+
+Each gunicorn or uvicorn worker is a separate process, so the metrics
+cannot live in memory: every process adds its values to its own
+memory-mapped file in ``METRICS_DIR`` (``<pid>.db``), and the
+``/metrics`` view sums the files. Writing a value is a memory write, with
+no system call. The gunicorn master (see gunicorn.conf.py) empties the
+directory when it starts, and adds the values of each stopped worker to
+``archive.db`` before deleting its file, so that the counters never go
+back and the directory does not grow with every restarted worker.
+
+The file starts with the number of bytes used, followed by entries made of
+the length of a key, the key (a JSON list: metric, sample, label values)
+padded to 8 bytes, and its value as a double. Entries are only appended,
+and the header is updated after the entry, so a reader sees whole entries.
+
+The requests are measured by ``oc_lettings_site.timing``, which calls
+``observe_request``, and the response cache counts its lookups with
+``observe_cache_lookup``. Nothing is written when ``METRICS_ENABLED`` is
+off.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+HEADER = struct.Struct("<I4x")
+KEY_LENGTH = struct.Struct("<I")
+VALUE = struct.Struct("<d")
+INITIAL_SIZE = 64 * 1024
+ARCHIVE_NAME = "archive.db"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default buckets of the Prometheus clients, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+DB_QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def iter_entries(data, used):
+    """
+    Iterate over the entries of a metrics file.
+
+    Args:
+        data: The content of the file, or its memory map.
+        used: The number of bytes used, from the header.
+
+    Yields:
+        tuple: The key, the value and the offset of the value of each entry.
+    """
+    position = HEADER.size
+    while position + KEY_LENGTH.size <= used:
+        length = KEY_LENGTH.unpack_from(data, position)[0]
+        start = position + KEY_LENGTH.size
+        offset = start + length + (-(KEY_LENGTH.size + length)) % 8
+        if offset + VALUE.size > used:
+            return
+        key = bytes(data[start:start + length]).decode()
+        yield key, VALUE.unpack_from(data, offset)[0], offset
+        position = offset + VALUE.size
+
+
+def read_file(path):
+    """
+    Read the values of a metrics file.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        list: The ``(key, value)`` pairs of the file.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        return []
+    used = min(HEADER.unpack_from(data, 0)[0], len(data))
+    return [(key, value) for key, value, _ in iter_entries(data, used)]
+
+
+class MetricsFile:
+    """
+    The values written by one process, in a memory-mapped file.
+
+    Reopening the file of a process, e.g. after a restart which reused its
+    pid, keeps its values.
+
+    Attributes:
+        path: The path of the file.
+        directory: The directory of the file.
+        pid: The process owning the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.directory = os.path.dirname(path)
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < INITIAL_SIZE:
+            os.ftruncate(self._file.fileno(), INITIAL_SIZE)
+            size = INITIAL_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = HEADER.unpack_from(self._map, 0)[0] or HEADER.size
+        self._offsets = {
+            key: offset for key, _, offset in iter_entries(self._map, self._used)
+        }
+
+    def increment(self, key, amount):
+        """
+        Add an amount to the value of a key.
+
+        Args:
+            key: The key of the value.
+            amount: The amount to add.
+        """
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            VALUE.pack_into(self._map, offset, VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def _append(self, key):
+        """Append a key with a zero value, and return the offset of the value."""
+        encoded = key.encode()
+        padding = (-(KEY_LENGTH.size + len(encoded))) % 8
+        size = KEY_LENGTH.size + len(encoded) + padding + VALUE.size
+        if self._used + size > len(self._map):
+            new_size = max(len(self._map) * 2, self._used + size)
+            self._map.close()
+            os.ftruncate(self._file.fileno(), new_size)
+            self._map = mmap.mmap(self._file.fileno(), new_size)
+        start = self._used + KEY_LENGTH.size
+        KEY_LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[start:start + len(encoded)] = encoded
+        offset = start + len(encoded) + padding
+        VALUE.pack_into(self._map, offset, 0.0)
+        self._used += size
+        HEADER.pack_into(self._map, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def close(self):
+        """Close the memory map and the file."""
+        self._map.close()
+        self._file.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Return the metrics file of this process, opened on first use.
+
+    A forked worker opens its own file instead of writing to the file of
+    its parent.
+
+    Returns:
+        MetricsFile: The file of the current process in ``METRICS_DIR``.
+    """
+    global _store
+    directory = settings.METRICS_DIR
+    store = _store
+    if store is not None and store.pid == os.getpid() and store.directory == directory:
+        return store
+    with _store_lock:
+        path = os.path.join(directory, f"{os.getpid()}.db")
+        if _store is None or _store.path != path:
+            os.makedirs(directory, exist_ok=True)
+            if _store is not None and _store.pid == os.getpid():
+                _store.close()
+            _store = MetricsFile(path)
+        return _store
+
+
+def collect():
+    """
+    Sum the values of every process.
+
+    Returns:
+        dict: The total value of each key.
+    """
+    totals = defaultdict(float)
+    if not os.path.isdir(settings.METRICS_DIR):
+        return totals
+    for name in os.listdir(settings.METRICS_DIR):
+        if name.endswith(".db"):
+            for key, value in read_file(os.path.join(settings.METRICS_DIR, name)):
+                totals[key] += value
+    return totals
+
+
+def reset_metrics(directory):
+    """
+    Delete the metrics files of a directory, e.g. of a previous server.
+
+    Args:
+        directory: The metrics directory.
+    """
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith(".db"):
+            os.remove(os.path.join(directory, name))
+
+
+def archive_process(directory, pid):
+    """
+    Move the values of a stopped process to the archive file.
+
+    Args:
+        directory: The metrics directory.
+        pid: The process, whose ``<pid>.db`` file is deleted.
+    """
+    path = os.path.join(directory, f"{pid}.db")
+    if not os.path.exists(path):
+        return
+    archive = MetricsFile(os.path.join(directory, ARCHIVE_NAME))
+    try:
+        for key, value in read_file(path):
+            archive.increment(key, value)
+    finally:
+        archive.close()
+    os.remove(path)
+
+
+REGISTRY = []
+
+
+class Counter:
+    """
+    A counter with labels.
+
+    Attributes:
+        name: The name of the metric.
+        documentation: The help text of the metric.
+        labelnames: The names of its labels.
+    """
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._keys = {}
+        REGISTRY.append(self)
+
+    def key(self, sample, labels):
+        """
+        Return the key of a sample of the metric.
+
+        Args:
+            sample: The name of the sample (``_bucket``, ``_sum``... for a histogram).
+            labels: The label values, as a tuple.
+
+        Returns:
+            str: The key of the sample in the metrics files.
+        """
+        key = self._keys.get((sample, labels))
+        if key is None:
+            key = self._keys[(sample, labels)] = json.dumps([self.name, sample, labels])
+        return key
+
+    def inc(self, *labels, amount=1):
+        """
+        Increment the counter.
+
+        Args:
+            *labels: The values of the labels, in the order of ``labelnames``.
+            amount: The amount to add.
+        """
+        get_store().increment(self.key(self.name, tuple(str(label) for label in labels)), amount)
+
+
+class Histogram(Counter):
+    """
+    A histogram with labels.
+
+    Each observation increments a single bucket: the buckets are made
+    cumulative when rendered.
+
+    Attributes:
+        buckets: The upper bounds of the buckets, ``+Inf`` excluded.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self.bucket_sample = f"{name}_bucket"
+        self.sum_sample = f"{name}_sum"
+        self.count_sample = f"{name}_count"
+
+    def observe(self, value, *labels):
+        """
+        Record an observation.
+
+        Args:
+            value: The observed value.
+            *labels: The values of the labels, in the order of ``labelnames``.
+        """
+        labels = tuple(str(label) for label in labels)
+        store = get_store()
+        for bound in self.buckets:
+            if value <= bound:
+                store.increment(self.key(self.bucket_sample, labels + (bound,)), 1)
+                break
+        store.increment(self.key(self.sum_sample, labels), value)
+        store.increment(self.key(self.count_sample, labels), 1)
+
+
+requests_total = Counter(
+    "http_requests_total", "Requests served, by view and status.", ["view", "status"]
+)
+request_duration = Histogram(
+    "http_request_duration_seconds", "Request wall time, by view and status.",
+    ["view", "status"], LATENCY_BUCKETS,
+)
+request_db_queries = Histogram(
+    "http_request_db_queries", "Database queries per request, by view.",
+    ["view"], DB_QUERIES_BUCKETS,
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Database time per request, by view.",
+    ["view"], DB_TIME_BUCKETS,
+)
+cache_lookups = Counter(
+    "view_cache_lookups_total", "Response cache lookups, by page type and result.",
+    ["page", "result"],
+)
+
+
+def observe_request(view, status, duration, queries, db_time):
+    """
+    Record the measurements of a request.
+
+    Args:
+        view: The URL name of the view.
+        status: The status code of the response.
+        duration: The wall time of the request, in seconds.
+        queries: The number of database queries.
+        db_time: The database time, in seconds.
+    """
+    requests_total.inc(view, status)
+    request_duration.observe(duration, view, status)
+    request_db_queries.observe(queries, view)
+    request_db_duration.observe(db_time, view)
+
+
+def observe_cache_lookup(page, hit):
+    """
+    Count a lookup of the response cache, if the metrics are enabled.
+
+    Args:
+        page: The page type of the lookup (the cache prefix).
+        hit: True if the page was found in the cache.
+    """
+    if settings.METRICS_ENABLED:
+        cache_lookups.inc(page, "hit" if hit else "miss")
+
+
+def format_value(value):
+    """Format a sample value, without a decimal part for whole numbers."""
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def format_labels(names, values):
+    """
+    Format the labels of a sample.
+
+    Args:
+        names: The label names.
+        values: The label values.
+
+    Returns:
+        str: The labels between braces, or an empty string without labels.
+    """
+    if not names:
+        return ""
+    pairs = (
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_metric(metric, samples):
+    """
+    Render the samples of a metric in the Prometheus text format.
+
+    Args:
+        metric: The counter or histogram.
+        samples: The ``(sample, labels) -> value`` totals of the metric.
+
+    Returns:
+        list: The lines of the metric.
+    """
+    lines = [
+        f"# HELP {metric.name} {metric.documentation}",
+        f"# TYPE {metric.name} {metric.type}",
+    ]
+    if metric.type == "counter":
+        for (_, labels), value in sorted(samples.items()):
+            lines.append(
+                f"{metric.name}{format_labels(metric.labelnames, labels)} {format_value(value)}"
+            )
+        return lines
+    series = sorted({labels for sample, labels in samples if sample.endswith("_count")})
+    names = metric.labelnames + ("le",)
+    for labels in series:
+        cumulative = 0.0
+        for bound in metric.buckets:
+            cumulative += samples.get((f"{metric.name}_bucket", labels + (bound,)), 0.0)
+            lines.append(
+                f"{metric.name}_bucket{format_labels(names, labels + (bound,))} "
+                f"{format_value(cumulative)}"
+            )
+        count = samples[(f"{metric.name}_count", labels)]
+        lines += [
+            f"{metric.name}_bucket{format_labels(names, labels + ('+Inf',))} "
+            f"{format_value(count)}",
+            f"{metric.name}_sum{format_labels(metric.labelnames, labels)} "
+            f"{format_value(samples.get((f'{metric.name}_sum', labels), 0.0))}",
+            f"{metric.name}_count{format_labels(metric.labelnames, labels)} "
+            f"{format_value(count)}",
+        ]
+    return lines
+
+
+def render_metrics():
+    """
+    Render the metrics of every process in the Prometheus text format.
+
+    The hit ratio of the response cache is derived from its lookups.
+
+    Returns:
+        str: The exposition text.
+    """
+    by_metric = defaultdict(dict)
+    for key, value in collect().items():
+        name, sample, labels = json.loads(key)
+        by_metric[name][(sample, tuple(labels))] = value
+    lines = []
+    for metric in REGISTRY:
+        lines += render_metric(metric, by_metric.get(metric.name, {}))
+
+    lookups = defaultdict(lambda: {"hit": 0.0, "miss": 0.0})
+    for (_, (page, result)), value in by_metric.get(cache_lookups.name, {}).items():
+        lookups[page][result] += value
+    lines += [
+        "# HELP view_cache_hit_ratio Hits over lookups of the response cache, by page type.",
+        "# TYPE view_cache_hit_ratio gauge",
+    ]
+    for page, counts in sorted(lookups.items()):
+        total = counts["hit"] + counts["miss"]
+        ratio = counts["hit"] / total if total else 0.0
+        lines.append(f"view_cache_hit_ratio{format_labels(['page'], [page])} {ratio!r}")
+    return "\n".join(lines) + "\n"
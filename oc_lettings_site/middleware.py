@@ -0,0 +1,107 @@
+"""
+Middleware of the OC Lettings project.
+
+Under ASGI, Django runs each synchronous middleware in a thread and the
+rest of the chain back in the event loop, for every request. WhiteNoise
+only provides a synchronous middleware, so ``StaticFilesMiddleware``
+adds the asynchronous path that keeps the async views of
+``ASYNC_VIEWS`` in the event loop. It also serves the Zstandard variants
+of the files and picks the smallest variant the client accepts (see
+compression.py).
+"""
+
+import os
+from wsgiref.headers import Headers
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError
+
+from oc_lettings_site.compression import ENCODINGS, NegotiatedStaticFile
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """Serve the static files with WhiteNoise, under WSGI and ASGI."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        static_file = self.match_static_file(request)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        static_file = self.match_static_file(request)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+    def match_static_file(self, request):
+        """
+        Return the static file matching the path of a request.
+
+        Args:
+            request: The HTTP request object.
+
+        Returns:
+            StaticFile: The file, or None if the request is not for a static file.
+        """
+        if self.autorefresh:
+            return self.find_file(request.path_info)
+        return self.files.get(request.path_info)
+
+    @staticmethod
+    def is_compressed_variant(path, stat_cache=None):
+        """
+        Return whether a file is a compressed variant of another one.
+
+        Args:
+            path: The path of the file.
+            stat_cache: The files found when scanning STATIC_ROOT, if any.
+
+        Returns:
+            bool: True if the file without its suffix exists.
+        """
+        root, suffix = os.path.splitext(path)
+        if suffix not in ENCODINGS:
+            return False
+        if stat_cache is None:
+            return os.path.isfile(root)
+        return root in stat_cache
+
+    def get_static_file(self, path, url, stat_cache=None):
+        """
+        Return the responder of a file and of its compressed variants.
+
+        Args:
+            path: The path of the file.
+            url: The URL of the file.
+            stat_cache: The files found when scanning STATIC_ROOT, if any.
+
+        Returns:
+            NegotiatedStaticFile: The responder of the file.
+        """
+        if stat_cache is None and not os.path.exists(path):
+            raise MissingFileError(path)
+        headers = Headers([])
+        self.add_mime_headers(headers, path, url)
+        self.add_cache_headers(headers, path, url)
+        if self.allow_all_origins:
+            headers["Access-Control-Allow-Origin"] = "*"
+        if self.add_headers_function is not None:
+            self.add_headers_function(headers, path, url)
+        return NegotiatedStaticFile(
+            path,
+            headers.items(),
+            stat_cache=stat_cache,
+            encodings={encoding: path + suffix for suffix, encoding in ENCODINGS.items()},
+        )
@@ -0,0 +1,149 @@
+"""
+Sentry configuration of the OC Lettings project.
+
+``init_sentry`` starts the Sentry SDK with a ``traces_sampler`` instead of
+a fixed sample rate, so that tracing costs little per request:
+
+- static files, ``/metrics`` and the other ``SENTRY_IGNORED_PATHS`` (health
+  checks) are never traced;
+- a request continuing a trace follows the decision of its caller;
+- by default (head mode, ``SENTRY_SLOW_REQUEST_SECONDS=0``, the
+  cheapest), a ``SENTRY_TRACES_SAMPLE_RATE`` share of the requests is
+  traced, decided when they start. Whether a request will fail or be slow
+  is not known yet, so the traces of the failed and slow requests are
+  dropped like the others outside the sample: only their errors are
+  always reported;
+- with a positive ``SENTRY_SLOW_REQUEST_SECONDS`` (tail mode), every other
+  request is traced, and ``before_send_transaction`` only sends the server
+  errors, the requests slower than the threshold and a
+  ``SENTRY_TRACES_SAMPLE_RATE`` share of the others. Each request then
+  pays for its transaction and spans.
+
+Errors are always reported, whatever the traces sampling. The sampler and
+the filter read the Django settings on each call, so they can be
+overridden in tests.
+
+The SDK is only imported by ``init_sentry``, so that a process without
+``SENTRY_DSN`` does not pay for it (about 80 ms at startup), and only its
+default and Django integrations are enabled: the integrations the SDK
+would otherwise probe for and patch (Redis, Celery, httpx...) are not
+used by the project.
+"""
+
+import random
+from datetime import datetime
+
+from django.conf import settings
+
+HTTP_SERVER_OP = "http.server"
+
+
+def get_request_path(sampling_context):
+    """
+    Return the path of the request of a sampling context.
+
+    Args:
+        sampling_context: The context given to ``traces_sampler``.
+
+    Returns:
+        str: The path, or None if the transaction is not a request.
+    """
+    environ = sampling_context.get("wsgi_environ")
+    if environ is not None:
+        return environ.get("PATH_INFO", "")
+    scope = sampling_context.get("asgi_scope")
+    if scope is not None:
+        return scope.get("path", "")
+    return None
+
+
+def is_tail_sampled(op):
+    """Return True if the transactions of an operation are sampled when they end."""
+    return op == HTTP_SERVER_OP and settings.SENTRY_SLOW_REQUEST_SECONDS > 0
+
+
+def traces_sampler(sampling_context):
+    """
+    Return the probability of tracing a transaction.
+
+    Args:
+        sampling_context: The transaction context, the decision of the
+            parent trace and the WSGI environ or ASGI scope of the request.
+
+    Returns:
+        float: The sample rate of the transaction.
+    """
+    path = get_request_path(sampling_context)
+    if path is not None and path.startswith(tuple(settings.SENTRY_IGNORED_PATHS)):
+        return 0.0
+    parent_sampled = sampling_context.get("parent_sampled")
+    if parent_sampled is not None:
+        return float(parent_sampled)
+    if is_tail_sampled(sampling_context.get("transaction_context", {}).get("op")):
+        return 1.0
+    return settings.SENTRY_TRACES_SAMPLE_RATE
+
+
+def get_duration(event):
+    """
+    Return the duration of a transaction event.
+
+    Args:
+        event: The transaction event.
+
+    Returns:
+        float: The duration in seconds, 0 if a timestamp is missing.
+    """
+    start, end = event.get("start_timestamp"), event.get("timestamp")
+    if start is None or end is None:
+        return 0.0
+    if isinstance(start, str):
+        start, end = datetime.fromisoformat(start), datetime.fromisoformat(end)
+    return (end - start).total_seconds()
+
+
+def before_send_transaction(event, hint):
+    """
+    Keep the failed and slow requests traced in tail mode, and a sample of the others.
+
+    Args:
+        event: The transaction event.
+        hint: The hint of the event (unused).
+
+    Returns:
+        dict: The event to send, or None to drop it.
+    """
+    contexts = event.get("contexts", {})
+    trace = contexts.get("trace", {})
+    if not is_tail_sampled(trace.get("op")) or trace.get("parent_span_id"):
+        return event
+    if trace.get("status") == "internal_error":
+        return event
+    if contexts.get("response", {}).get("status_code", 0) >= 500:
+        return event
+    if get_duration(event) >= settings.SENTRY_SLOW_REQUEST_SECONDS:
+        return event
+    if random.random() < settings.SENTRY_TRACES_SAMPLE_RATE:
+        return event
+    return None
+
+
+def init_sentry(dsn, **options):
+    """
+    Start the Sentry SDK with the sampling of this module.
+
+    Args:
+        dsn: The Sentry DSN.
+        **options: The other options of ``sentry_sdk.init``.
+    """
+    import sentry_sdk
+    from sentry_sdk.integrations.django import DjangoIntegration
+
+    sentry_sdk.init(
+        dsn=dsn,
+        traces_sampler=traces_sampler,
+        before_send_transaction=before_send_transaction,
+        auto_enabling_integrations=False,
+        integrations=[DjangoIntegration()],
+        **options,
+    )
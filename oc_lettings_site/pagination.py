@@ -0,0 +1,213 @@
+"""
+Keyset (cursor) pagination for the OC Lettings project.
+
+This module provides a lightweight alternative to Django's Paginator that
+navigates a queryset by primary key instead of using OFFSET, and never
+issues a COUNT(*) query. Each page costs a single ``LIMIT page_size + 1``
+query, whatever the size of the table, and a page with a cursor a
+bounded ``EXISTS`` query telling whether rows lie beyond the cursor.
+"""
+
+from django.utils.functional import cached_property
+
+
+def parse_cursor(value):
+    """
+    Convert a raw cursor value from the query string to a primary key.
+
+    Args:
+        value: The raw value of the ``after`` or ``before`` parameter.
+
+    Returns:
+        int or None: The cursor, or None if it is missing or malformed.
+    """
+    try:
+        cursor = int(value)
+    except (TypeError, ValueError):
+        return None
+    return cursor if cursor >= 0 else None
+
+
+class KeysetPage:
+    """
+    A single page of a queryset ordered by primary key.
+
+    The query is only executed when the page is first iterated or when one
+    of its navigation attributes is read, or by ``aload`` in async views.
+
+    Attributes:
+        queryset: The base queryset to paginate.
+        page_size: The maximum number of rows on the page.
+        after: Only rows with a primary key greater than this are returned.
+        before: Only rows with a primary key lower than this are returned.
+    """
+
+    def __init__(self, queryset, page_size, after=None, before=None):
+        self.queryset = queryset
+        self.page_size = page_size
+        self.after = after
+        self.before = before if after is None else None
+
+    def _window_queryset(self):
+        """
+        Return the query of the page, with one extra row.
+
+        The extra row tells whether another page exists in the direction
+        of the navigation.
+
+        Returns:
+            QuerySet: The rows, in descending order for a ``before`` page.
+        """
+        if self.before is not None:
+            queryset = self.queryset.filter(pk__lt=self.before).order_by("-pk")
+        else:
+            queryset = self.queryset.order_by("pk")
+            if self.after is not None:
+                queryset = queryset.filter(pk__gt=self.after)
+        return queryset[:self.page_size + 1]
+
+    def _beyond_cursor_queryset(self, rows):
+        """
+        Return the query telling whether rows lie beyond the cursor.
+
+        The rows before an ``after`` cursor make the previous page, and
+        the rows from a ``before`` cursor the next one. A cursor outside
+        the rows (``?after=0``, ``?before=`` past the last row, or a stale
+        one) has no such page, which the cursor alone does not tell.
+
+        Args:
+            rows: The rows of ``_window_queryset``.
+
+        Returns:
+            QuerySet or None: The rows beyond the cursor, or None if the
+            page needs no such query.
+        """
+        if not rows:
+            return None
+        if self.after is not None:
+            return self.queryset.filter(pk__lte=self.after)
+        if self.before is not None:
+            return self.queryset.filter(pk__gte=self.before)
+        return None
+
+    def _make_window(self, rows, beyond_cursor=False):
+        """
+        Split the fetched rows into the page rows and its navigation flags.
+
+        Args:
+            rows: The rows of ``_window_queryset``.
+            beyond_cursor: Whether rows lie beyond the cursor of the page.
+
+        Returns:
+            tuple: The page rows, a has_previous flag and a has_next flag.
+        """
+        if self.before is not None:
+            has_previous = len(rows) > self.page_size
+            rows = rows[:self.page_size]
+            rows.reverse()
+            return rows, has_previous, beyond_cursor
+        has_next = len(rows) > self.page_size
+        return rows[:self.page_size], beyond_cursor, has_next
+
+    @cached_property
+    def _window(self):
+        """
+        Fetch one extra row to know whether another page exists.
+
+        Returns:
+            tuple: The page rows, a has_previous flag and a has_next flag.
+        """
+        rows = list(self._window_queryset())
+        beyond = self._beyond_cursor_queryset(rows)
+        return self._make_window(rows, beyond is not None and beyond.exists())
+
+    async def aload(self):
+        """
+        Fetch the page with the async ORM, before its rows are read.
+
+        Returns:
+            KeysetPage: The page itself.
+        """
+        if "_window" not in self.__dict__:
+            rows = [row async for row in self._window_queryset()]
+            beyond = self._beyond_cursor_queryset(rows)
+            beyond_cursor = beyond is not None and await beyond.aexists()
+            self.__dict__["_window"] = self._make_window(rows, beyond_cursor)
+        return self
+
+    @property
+    def object_list(self):
+        """Return the rows of the page, in ascending primary key order."""
+        return self._window[0]
+
+    @property
+    def has_previous(self):
+        """Return True if rows exist before this page."""
+        return self._window[1] and bool(self.object_list)
+
+    @property
+    def has_next(self):
+        """Return True if rows exist after this page."""
+        return self._window[2]
+
+    @property
+    def has_other_pages(self):
+        """Return True if the page has a previous or a next page."""
+        return self.has_previous or self.has_next
+
+    @property
+    def previous_cursor(self):
+        """Return the ``before`` cursor of the previous page, if any."""
+        return self.object_list[0].pk if self.has_previous else None
+
+    @property
+    def next_cursor(self):
+        """Return the ``after`` cursor of the next page, if any."""
+        return self.object_list[-1].pk if self.has_next else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def get_keyset_page(request, queryset, page_size):
+    """
+    Build the page requested by the ``after``/``before`` query parameters.
+
+    Malformed cursors are ignored and the first page is returned instead,
+    like Django's ``Paginator.get_page``.
+
+    Args:
+        request: The HTTP request object.
+        queryset: The queryset to paginate.
+        page_size: The maximum number of rows on the page.
+
+    Returns:
+        KeysetPage: The requested page.
+    """
+    return KeysetPage(
+        queryset,
+        page_size,
+        after=parse_cursor(request.GET.get("after")),
+        before=parse_cursor(request.GET.get("before")),
+    )
+
+
+async def aget_keyset_page(request, queryset, page_size):
+    """
+    Build and fetch the requested page with the async ORM.
+
+    Args:
+        request: The HTTP request object.
+        queryset: The queryset to paginate.
+        page_size: The maximum number of rows on the page.
+
+    Returns:
+        KeysetPage: The requested page, already fetched.
+    """
+    return await get_keyset_page(request, queryset, page_size).aload()
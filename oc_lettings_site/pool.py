@@ -0,0 +1,233 @@
+"""
+A thread-safe database connection pool for the OC Lettings project.
+
+The pool knows nothing about the database driver: connections are
+created by the callable given to ``acquire`` and checked, reset and closed
+by the callables given to the pool. It is used by the
+``oc_lettings_site.postgresql_pool`` database backend, one pool per
+database alias and per process.
+
+Each pool keeps counters (connections checked out, waits, total wait
+time...) returned by ``stats()`` and logged every ``log_interval``
+seconds on the ``oc_lettings_site.pool`` logger.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection is released before the pool timeout."""
+
+
+class PoolStats:
+    """
+    Counters of a connection pool.
+
+    Attributes:
+        created: Connections opened by the pool.
+        closed: Connections closed by the pool (idle, broken or surplus).
+        checkouts: Connections handed out.
+        waits: Checkouts that had to wait for a released connection.
+        wait_time: Total time spent waiting, in seconds.
+        timeouts: Checkouts abandoned after the pool timeout.
+        ping_failures: Idle connections found broken by the pre-ping.
+    """
+
+    FIELDS = (
+        "created", "closed", "checkouts", "waits", "wait_time", "timeouts", "ping_failures"
+    )
+
+    def __init__(self):
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+
+
+class ConnectionPool:
+    """
+    A bounded pool of reusable connections.
+
+    Args:
+        max_size: The maximum number of open connections.
+        idle_timeout: Seconds after which an idle connection is closed.
+        timeout: Seconds to wait for a connection when all are checked out.
+        pre_ping: True to check idle connections with ``ping`` on checkout.
+        ping: Callable raising an exception if a connection is broken.
+        reset: Callable preparing a released connection for reuse; it
+            returns False if the connection must be closed instead.
+        close: Callable closing a connection.
+        log_interval: Seconds between two stats logs, 0 to disable them.
+        name: The name of the pool in the logs.
+    """
+
+    def __init__(
+        self, max_size=10, idle_timeout=300.0, timeout=30.0, pre_ping=True,
+        ping=None, reset=None, close=None, log_interval=0, name="default",
+    ):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.pre_ping = pre_ping and ping is not None
+        self.ping = ping
+        self.reset = reset or (lambda connection: True)
+        self.close_connection = close or (lambda connection: connection.close())
+        self.log_interval = log_interval
+        self.name = name
+        self.stats_counters = PoolStats()
+        self.idle = deque()  # (connection, released_at), most recent last
+        self.checked_out = 0
+        self.condition = threading.Condition()
+        self.last_log = time.monotonic()
+
+    def acquire(self, create):
+        """
+        Check out an idle connection, or open one with ``create``.
+
+        Args:
+            create: Callable opening a new connection.
+
+        Returns:
+            The connection.
+
+        Raises:
+            PoolTimeout: If the pool stays full for ``timeout`` seconds.
+        """
+        started = None
+        with self.condition:
+            while True:
+                connection = self.pop_idle()
+                if connection is not None:
+                    self.checked_out += 1
+                    break
+                if self.checked_out + len(self.idle) < self.max_size:
+                    # Reserve the slot, then connect outside the lock
+                    self.checked_out += 1
+                    self.condition.release()
+                    try:
+                        connection = create()
+                    except BaseException:
+                        with self.condition:
+                            self.checked_out -= 1
+                            self.condition.notify()
+                        raise
+                    finally:
+                        self.condition.acquire()
+                    self.stats_counters.created += 1
+                    break
+                now = time.monotonic()
+                if started is None:
+                    started = now
+                    self.stats_counters.waits += 1
+                remaining = started + self.timeout - now
+                if remaining <= 0 or not self.condition.wait(remaining):
+                    self.stats_counters.wait_time += time.monotonic() - started
+                    self.stats_counters.timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available in pool {self.name!r} "
+                        f"after {self.timeout}s ({self.max_size} checked out)"
+                    )
+            if started is not None:
+                self.stats_counters.wait_time += time.monotonic() - started
+            self.stats_counters.checkouts += 1
+            return connection
+
+    def pop_idle(self):
+        """
+        Return a usable idle connection, closing expired or broken ones.
+
+        Must be called with the lock held.
+
+        Returns:
+            The connection, or None if no idle connection is usable.
+        """
+        now = time.monotonic()
+        # The oldest connections expire first
+        while self.idle and now - self.idle[0][1] > self.idle_timeout:
+            self.discard(self.idle.popleft()[0])
+        while self.idle:
+            connection, _ = self.idle.pop()
+            if not self.pre_ping:
+                return connection
+            try:
+                self.ping(connection)
+            except Exception:
+                self.stats_counters.ping_failures += 1
+                self.discard(connection)
+                continue
+            return connection
+        return None
+
+    def release(self, connection):
+        """
+        Give a checked out connection back to the pool.
+
+        Args:
+            connection: The connection returned by ``acquire``.
+        """
+        try:
+            reusable = self.reset(connection)
+        except Exception:
+            reusable = False
+        with self.condition:
+            self.checked_out -= 1
+            if reusable:
+                self.idle.append((connection, time.monotonic()))
+            else:
+                self.discard(connection)
+            self.condition.notify()
+            self.maybe_log()
+
+    def discard(self, connection):
+        """
+        Close a connection leaving the pool, ignoring errors.
+
+        Args:
+            connection: The connection to close.
+        """
+        self.stats_counters.closed += 1
+        try:
+            self.close_connection(connection)
+        except Exception:
+            logger.debug("Error closing a pooled connection", exc_info=True)
+
+    def close_all(self):
+        """Close the idle connections, e.g. on shutdown."""
+        with self.condition:
+            while self.idle:
+                self.discard(self.idle.pop()[0])
+
+    def stats(self):
+        """
+        Return the counters and gauges of the pool.
+
+        Returns:
+            dict: The ``PoolStats`` counters, ``checked_out`` and ``idle``.
+        """
+        with self.condition:
+            data = {name: getattr(self.stats_counters, name) for name in PoolStats.FIELDS}
+            data["wait_time"] = round(data["wait_time"], 6)
+            data["checked_out"] = self.checked_out
+            data["idle"] = len(self.idle)
+            data["max_size"] = self.max_size
+        return data
+
+    def maybe_log(self):
+        """Log the stats if ``log_interval`` seconds passed since the last log."""
+        if not self.log_interval:
+            return
+        now = time.monotonic()
+        if now - self.last_log < self.log_interval:
+            return
+        self.last_log = now
+        data = self.stats()
+        logger.info(
+            "Database pool %s: %d checked out, %d idle, %d waits (%.3fs), "
+            "%d timeouts, %d created",
+            self.name, data["checked_out"], data["idle"], data["waits"],
+            data["wait_time"], data["timeouts"], data["created"],
+            extra={"pool": self.name, "pool_stats": data},
+        )
@@ -0,0 +1,6 @@
+"""
+PostgreSQL database backend with a connection pool.
+
+Select it with ``pool=true`` in ``DATABASE_URL`` or ``DB_POOL=true``, see
+``oc_lettings_site.database``.
+"""
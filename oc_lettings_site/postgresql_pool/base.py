@@ -0,0 +1,114 @@
+"""
+PostgreSQL database wrapper borrowing its connections from a pool.
+
+Django opens a connection per thread and closes it at the end of each
+request (``CONN_MAX_AGE = 0``). This wrapper takes the connection from a
+``ConnectionPool`` instead of opening it, and gives it back instead of
+closing it, so the gunicorn threads of a worker share a bounded set of
+open connections. The pool settings come from ``OPTIONS["pool"]``.
+
+Pools are per process: a pool inherited through ``fork`` (e.g. gunicorn
+``--preload``) is dropped and a new one is created in the child.
+"""
+
+import functools
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from oc_lettings_site.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def ping(connection):
+    """
+    Check that a connection still works.
+
+    Args:
+        connection: A psycopg2 connection.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def reset(connection):
+    """
+    Prepare a released connection for reuse.
+
+    Args:
+        connection: A psycopg2 connection.
+
+    Returns:
+        bool: False if the connection is closed and cannot be reused.
+    """
+    if connection.closed:
+        return False
+    if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return True
+
+
+def get_pool(alias, options):
+    """
+    Return the pool of a database alias for the current process.
+
+    Args:
+        alias: The database alias.
+        options: The pool settings: ``max_size``, ``idle_timeout``,
+            ``timeout``, ``pre_ping`` and ``log_interval``.
+
+    Returns:
+        ConnectionPool: The pool.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        entry = _pools.get(alias)
+        if entry is None or entry[0] != pid:
+            # Connections inherited from the parent process are not closed:
+            # the parent still uses the sockets
+            entry = (pid, ConnectionPool(ping=ping, reset=reset, name=alias, **options))
+            _pools[alias] = entry
+        return entry[1]
+
+
+def pool_stats():
+    """
+    Return the stats of the pools of the current process.
+
+    Returns:
+        dict: The ``ConnectionPool.stats()`` of each pool, by alias.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        pools = {alias: pool for alias, (owner, pool) in _pools.items() if owner == pid}
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL wrapper taking its connections from a per-process pool."""
+
+    @property
+    def connection_pool(self):
+        """Return the pool of this database alias."""
+        return get_pool(self.alias, self.settings_dict["OPTIONS"].get("pool", {}))
+
+    def get_connection_params(self):
+        """Return the driver parameters, without the pool settings."""
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        """Check out a pooled connection, opening one if needed."""
+        create = functools.partial(base.DatabaseWrapper.get_new_connection, self, conn_params)
+        return self.connection_pool.acquire(create)
+
+    def _close(self):
+        """Give the connection back to the pool instead of closing it."""
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.connection_pool.release(self.connection)
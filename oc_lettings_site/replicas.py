@@ -0,0 +1,289 @@
+"""
+Read-replica routing for the OC Lettings project.
+
+The replicas listed in ``DATABASE_REPLICA_URLS`` serve the reads of the
+public views decorated with ``replica_reads``; everything else (admin,
+management commands, writes) uses the primary ``default`` database.
+
+- ``ReplicaPinMiddleware`` tracks each request. When a request writes, the
+  response sets a cookie pinning the client to the primary for
+  ``REPLICA_PIN_SECONDS``, so that it reads its own writes.
+- ``replica_reads`` picks the replica of a GET or HEAD request, unless the
+  client is pinned, with the ``REPLICA_SELECTION`` policy: ``round_robin``
+  or ``least_lag`` (replicas lagging more than ``REPLICA_MAX_LAG`` seconds
+  are skipped).
+- ``ReplicaRouter`` sends the reads of the request to that replica and
+  marks the request as having written on every write.
+- ``reads_replica`` tells the response cache not to store a page read
+  from a replica, which may predate a write whose signal already evicted
+  the page.
+
+Without replicas, the middleware is removed at startup and the decorator
+does nothing.
+"""
+
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "db_primary"
+
+# Seconds a PostgreSQL standby is behind, 0 when it replayed everything it received
+POSTGRESQL_LAG_SQL = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class RequestState:
+    """
+    The database routing state of a request.
+
+    Attributes:
+        pinned: True if the client wrote recently and must read the primary.
+        read_alias: The replica serving the reads, or None for the primary.
+        wrote: True once the request has written to the database.
+    """
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.read_alias = None
+        self.wrote = False
+
+
+_request_state = contextvars.ContextVar("replica_request_state", default=None)
+
+
+def measure_lag(alias):
+    """
+    Return the replication lag of a replica.
+
+    Args:
+        alias: The database alias of the replica.
+
+    Returns:
+        float: The lag in seconds (always 0 on SQLite), or None if the
+        replica cannot be queried.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRESQL_LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        logger.warning("Cannot measure the lag of replica %s", alias, exc_info=True)
+        return None
+    return float(lag or 0)
+
+
+class ReplicaSelector:
+    """Choose the replica serving a request."""
+
+    def __init__(self):
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.lags = {}
+        self.lags_checked_at = None
+
+    def choose(self):
+        """
+        Return the replica for the next request.
+
+        Returns:
+            str: The replica alias, or None to read the primary.
+        """
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return None
+        if settings.REPLICA_SELECTION == "least_lag":
+            lags = self.get_lags(replicas)
+            healthy = [
+                (lag, alias) for alias, lag in lags.items()
+                if lag is not None and lag <= settings.REPLICA_MAX_LAG
+            ]
+            return min(healthy)[1] if healthy else None
+        return replicas[next(self.counter) % len(replicas)]
+
+    def get_lags(self, replicas):
+        """
+        Return the lag of each replica, measured at most every few seconds.
+
+        Args:
+            replicas: The replica aliases.
+
+        Returns:
+            dict: The lag of each replica, by alias.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if (
+                self.lags_checked_at is None
+                or now - self.lags_checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL
+                or set(self.lags) != set(replicas)
+            ):
+                self.lags = {alias: measure_lag(alias) for alias in replicas}
+                self.lags_checked_at = now
+            return dict(self.lags)
+
+
+selector = ReplicaSelector()
+
+
+def should_read_replica(request, state):
+    """
+    Return True if the reads of a request may go to a replica.
+
+    Args:
+        request: The HTTP request object.
+        state: The routing state of the request, or None without replicas.
+
+    Returns:
+        bool: True for the GET and HEAD requests of clients not pinned to
+        the primary, until the request writes.
+    """
+    return (
+        state is not None
+        and request.method in ("GET", "HEAD")
+        and not state.pinned
+        and not state.wrote
+    )
+
+
+def reads_replica():
+    """
+    Return True if the reads of the current request go to a replica.
+
+    Returns:
+        bool: False for the requests reading the primary (pinned clients,
+        writes, no replica available or configured).
+    """
+    state = _request_state.get()
+    return state is not None and state.read_alias is not None and not state.wrote
+
+
+def replica_reads(view):
+    """
+    Serve the reads of a read-only view from a replica.
+
+    Async views choose the replica in a thread, as measuring the lag
+    queries the replicas.
+
+    Args:
+        view: The view function.
+
+    Returns:
+        callable: The decorated view.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            state = _request_state.get()
+            if should_read_replica(request, state):
+                state.read_alias = await sync_to_async(selector.choose)()
+            return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _request_state.get()
+        if should_read_replica(request, state):
+            state.read_alias = selector.choose()
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaPinMiddleware:
+    """
+    Track the writes of each request and pin recent writers to the primary.
+
+    The middleware supports both WSGI and ASGI, so async views are not
+    moved to a thread under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        state = RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.process_response(state, response)
+
+    def process_response(self, state, response):
+        """
+        Pin the client to the primary if the request wrote.
+
+        Args:
+            state: The routing state of the request.
+            response: The response of the request.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite="Lax",
+            )
+        return response
+
+
+class ReplicaRouter:
+    """Route the reads of replica-enabled requests to their replica."""
+
+    def db_for_read(self, model, **hints):
+        """Return the replica of the current request, if any."""
+        state = _request_state.get()
+        if state is None or state.wrote:
+            return None
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        """Write to the primary, and pin the current request to it."""
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allow relations across aliases: replicas hold the primary data."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Never migrate a replica: it receives the schema from the primary."""
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,60 @@
+"""
+SQLite performance profile for the OC Lettings project.
+
+The Docker image serves the SQLite file directly, with several gunicorn
+threads per worker. With the default rollback journal, readers block
+while a writer commits and writers fail with "database is locked". The
+``SQLITE_PRAGMAS`` setting lists the pragmas run on every new SQLite
+connection, through the ``connection_created`` signal:
+
+- ``journal_mode=WAL``: readers and one writer run concurrently;
+- ``synchronous=NORMAL``: no fsync per commit, still safe with WAL;
+- ``mmap_size``: reads served from a memory map of the file;
+- ``cache_size``: a larger page cache per connection;
+- ``busy_timeout``: writers wait for the lock instead of failing.
+
+The WAL mode is persistent: it is written to the database file, which
+then comes with ``-wal`` and ``-shm`` files. The first two pragmas are
+therefore only set with ``SQLITE_WAL``, as in the Docker image, so that
+a local command does not change the versioned database. Connections are
+reused between requests (``CONN_MAX_AGE``), so the pragmas run once per
+connection, not once per request.
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_pragmas(cursor, pragmas):
+    """
+    Run ``PRAGMA name = value`` statements on a SQLite connection.
+
+    Args:
+        cursor: A cursor of the connection.
+        pragmas: The pragma values, by name.
+    """
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created)
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    Apply the ``SQLITE_PRAGMAS`` setting to a new SQLite connection.
+
+    In-memory databases (the test databases) keep their ``memory``
+    journal, as WAL needs a file.
+
+    Args:
+        sender: The database wrapper class.
+        connection: The new database connection.
+        **kwargs: Additional signal arguments.
+    """
+    if connection.vendor != "sqlite" or not settings.SQLITE_PRAGMAS:
+        return
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    if connection.is_in_memory_db():
+        pragmas.pop("journal_mode", None)
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, pragmas)
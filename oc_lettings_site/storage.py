@@ -0,0 +1,120 @@
+"""
+Static files storage of the OC Lettings project.
+
+``ManifestStaticFilesStorage`` gives each collected file a name containing
+the hash of its content (``css/styles.3a1f0c9e2b7d.css``), rewrites the
+references between files (``url()`` in the CSS) to the hashed names and
+compresses them like WhiteNoise's ``CompressedManifestStaticFilesStorage``.
+WhiteNoise serves the hashed files with a far-future, ``immutable``
+``Cache-Control``: browsers never revalidate them, and a new version of a
+file gets a new URL.
+
+The theme CSS references images which are not shipped with the project
+(``assets/img/backgrounds``, ``assets/img/device-mockups``): Django's
+storage fails on them, so this storage leaves these references unchanged
+and logs them instead.
+
+Both storages compress the files with ``compression.Compressor``, which
+adds Zstandard (``.zst``) variants to WhiteNoise's gzip and Brotli ones,
+and add the resized WebP and AVIF variants of the images (see images.py).
+
+``read_manifest_version`` gives a short hash of the manifest, mixed into
+the ETags and the cache keys of the pages, so that the pages rendered with
+the URLs of a previous build are not served after a deployment.
+"""
+
+import hashlib
+import logging
+import os
+
+from whitenoise import storage
+
+from oc_lettings_site.compression import Compressor
+from oc_lettings_site.images import ImageVariantsMixin
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "staticfiles.json"
+
+
+def read_manifest_version(static_root):
+    """
+    Return the version of the collected static files.
+
+    Args:
+        static_root: The ``STATIC_ROOT`` directory.
+
+    Returns:
+        str: The first 12 hex digits of the hash of the manifest, or an
+        empty string if ``collectstatic`` was not run with the manifest
+        storage.
+    """
+    try:
+        with open(os.path.join(static_root, MANIFEST_NAME), "rb") as manifest:
+            return hashlib.md5(manifest.read(), usedforsecurity=False).hexdigest()[:12]
+    except OSError:
+        return ""
+
+
+class CompressedStaticFilesStorage(ImageVariantsMixin, storage.CompressedStaticFilesStorage):
+    """Compressed static files without hashed names (``STATIC_MANIFEST=false``)."""
+
+    def create_compressor(self, **kwargs):
+        """Return the compressor of the collected files."""
+        return Compressor(**kwargs)
+
+
+class ManifestStaticFilesStorage(ImageVariantsMixin, storage.CompressedManifestStaticFilesStorage):
+    """
+    Hashed and compressed static files, tolerant of missing references.
+
+    Names which are not in the manifest (``collectstatic`` not run, e.g. in
+    development or tests) are served unhashed instead of failing.
+
+    Attributes:
+        missing_files: The referenced files found missing by
+            ``collectstatic``, logged once each.
+    """
+
+    manifest_name = MANIFEST_NAME
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.missing_files = set()
+        self.collecting = False
+
+    def post_process(self, *args, **kwargs):
+        """Hash, rewrite and compress the collected files, logging the missing ones."""
+        self.missing_files.clear()
+        self.collecting = True
+        try:
+            yield from super().post_process(*args, **kwargs)
+        finally:
+            self.collecting = False
+
+    def create_compressor(self, **kwargs):
+        """Return the compressor of the collected files."""
+        return Compressor(**kwargs)
+
+    def hashed_name(self, name, content=None, filename=None):
+        """
+        Return the hashed name of a file, or its name if it does not exist.
+
+        Args:
+            name: The name of the file.
+            content: The content of the file, opened from the storage if None.
+            filename: The name to open, if different from ``name``.
+
+        Returns:
+            str: The name with the hash of the content.
+        """
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+        if self.collecting and name not in self.missing_files:
+            self.missing_files.add(name)
+            logger.warning("Missing static file %s, its references are left unhashed", name)
+        return name
@@ -0,0 +1,50 @@
+"""
+Discovery of the template files of the OC Lettings project.
+
+``build_css`` reads the project templates to prune the theme stylesheet,
+and ``warm_up`` compiles them before the workers are forked: both list
+them here, from the ``TEMPLATES`` directories and the ``templates``
+directory of each project application, without Django's own (admin...).
+"""
+
+import os
+
+from django.conf import settings
+from django.template.utils import get_app_template_dirs
+
+
+def get_template_dirs():
+    """
+    Return the template directories of the project, without Django's own.
+
+    Returns:
+        list: The directories of ``TEMPLATES`` and of the project applications.
+    """
+    directories = [str(directory) for engine in settings.TEMPLATES for directory in engine["DIRS"]]
+    directories += [
+        str(directory) for directory in get_app_template_dirs("templates")
+        if str(directory).startswith(str(settings.BASE_DIR))
+    ]
+    return directories
+
+
+def find_templates(directories):
+    """
+    List the HTML templates of directories.
+
+    Args:
+        directories: The template directories.
+
+    Returns:
+        list: The path of each template and its name relative to its
+        directory, as given to the template loaders.
+    """
+    templates = []
+    for directory in directories:
+        for root, _, files in sorted(os.walk(directory)):
+            for name in sorted(files):
+                if name.endswith(".html"):
+                    path = os.path.join(root, name)
+                    relative = os.path.relpath(path, directory).replace(os.sep, "/")
+                    templates.append((path, relative))
+    return templates
@@ -0,0 +1,93 @@
+"""
+Template tags writing the responsive markup of the OC Lettings images.
+
+``{% picture "assets/img/logo.png" alt="Logo" sizes="70px" %}`` writes a
+``<picture>`` element with one ``<source>`` per variant format (AVIF, then
+WebP) and an ``<img>`` whose ``srcset`` lists the resized copies in the
+image format, all linked by their hashed URLs. The browser downloads the
+smallest file of the first format it supports at the displayed width.
+The variants are those listed by ``collectstatic`` in ``images.json``
+(see images.py): without it, the tag writes an ``<img>`` of the image.
+"""
+
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from oc_lettings_site.images import read_images
+
+register = template.Library()
+
+
+@lru_cache(maxsize=1)
+def cached_images(static_root, version):
+    """
+    Read the variants of the images once per build.
+
+    Args:
+        static_root: The ``STATIC_ROOT`` directory.
+        version: The ``STATIC_VERSION`` of the build, part of the cache key.
+
+    Returns:
+        dict: The variants of each image, as in ``read_images``.
+    """
+    return read_images(static_root)
+
+
+def get_images():
+    """Return the variants of the images, read again on each page in DEBUG."""
+    if settings.DEBUG:
+        return read_images(settings.STATIC_ROOT)
+    return cached_images(str(settings.STATIC_ROOT), settings.STATIC_VERSION)
+
+
+def srcset(sources):
+    """
+    Format the sources of one format as a ``srcset`` attribute value.
+
+    Args:
+        sources: The (width, name) of each source.
+
+    Returns:
+        str: The hashed URLs with their width descriptors.
+    """
+    return ", ".join(f"{static(name)} {width}w" for width, name in sorted(sources))
+
+
+@register.simple_tag
+def picture(name, alt, sizes="100vw", **attributes):
+    """
+    Return the ``<picture>`` element of an image and its variants.
+
+    Args:
+        name: The static name of the image.
+        alt: The alternative text.
+        sizes: The ``sizes`` attribute: the displayed width of the image.
+        **attributes: Other attributes of the ``<img>`` (class, width, height).
+
+    Returns:
+        str: The ``<picture>`` element, or an ``<img>`` without variants.
+    """
+    attributes = format_html_join("", ' {}="{}"', attributes.items())
+    image = get_images().get(name)
+    if image is None:
+        return format_html('<img src="{}" alt="{}"{} />', static(name), alt, attributes)
+
+    formats = {}
+    for media_type, width, source in image["sources"]:
+        formats.setdefault(media_type, []).append((width, source))
+    fallback_type = image["sources"][0][0]
+    sources = format_html_join(
+        "", '<source type="{}" srcset="{}" sizes="{}" />',
+        (
+            (media_type, srcset(entries), sizes)
+            for media_type, entries in formats.items() if media_type != fallback_type
+        ),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}"{} /></picture>',
+        sources, static(name), srcset(formats[fallback_type]), sizes, alt, attributes,
+    )
@@ -0,0 +1,53 @@
+"""
+Template tags inlining the critical CSS of the OC Lettings pages.
+
+``{% critical_css %}`` writes the content of ``css/critical.css``, built by
+the ``build_css`` command, in a ``<style>`` element, so that the top of
+the page is styled without waiting for a stylesheet request. The file is
+read once per process, or on each page in DEBUG so that a rebuild shows
+without a restart.
+"""
+
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CRITICAL_CSS = "css/critical.css"
+
+
+def read_critical_css():
+    """
+    Read the critical CSS from the static files.
+
+    Returns:
+        str: The stylesheet, or an empty string if it was not built.
+    """
+    path = finders.find(CRITICAL_CSS)
+    if path is None:
+        return ""
+    with open(path, encoding="utf-8") as file:
+        return file.read().strip()
+
+
+cached_critical_css = lru_cache(maxsize=1)(read_critical_css)
+
+
+@register.simple_tag
+def critical_css():
+    """
+    Return the critical CSS in a ``<style>`` element.
+
+    Returns:
+        str: The ``<style>`` element, or an empty string without critical CSS.
+    """
+    css = read_critical_css() if settings.DEBUG else cached_critical_css()
+    if not css:
+        return ""
+    # "</" would close the element: escaped as in a CSS string
+    css = css.replace("</", "<\\/")
+    return mark_safe(f"<style>{css}</style>")
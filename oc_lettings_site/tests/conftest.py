@@ -3,8 +3,27 @@ Pytest fixtures for the oc_lettings_site application tests.
 
 This module provides fixtures for creating test data used in main site tests.
 """
+import importlib
+
 import pytest
+from django.core.management import call_command
+from django.db import connections
 from django.test import Client
+from django.urls import clear_url_caches
+
+import lettings.urls
+import oc_lettings_site.urls
+import profiles.urls
+from oc_lettings_site.cache import get_view_cache, stats
+
+ROUTERS = ["oc_lettings_site.replicas.ReplicaRouter"]
+
+
+@pytest.fixture(autouse=True)
+def clear_view_cache():
+    """Start each test with an empty cache and zeroed counters."""
+    get_view_cache().clear()
+    stats.reset()
 
 
 @pytest.fixture
@@ -16,3 +35,97 @@ def client():
         Client: A Django test client instance.
     """
     return Client()
+
+
+@pytest.fixture
+def replica(db, tmp_path, settings):
+    """
+    Add a migrated SQLite file as the replica of the primary test database.
+
+    Args:
+        db: The pytest-django database fixture, set up first.
+        tmp_path: The pytest temporary directory.
+        settings: The pytest-django settings fixture.
+
+    Yields:
+        str: The alias of the replica.
+    """
+    alias = "replica_test"
+    configured = connections.configure_settings({
+        "default": connections.settings["default"],
+        alias: {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(tmp_path / "replica.sqlite3"),
+        },
+    })
+    connections.settings[alias] = configured[alias]
+    call_command("migrate", database=alias, verbosity=0)
+    settings.DATABASE_REPLICAS = [alias]
+    settings.DATABASE_ROUTERS = ROUTERS
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
+def reload_urlconfs():
+    """Import the URL configurations again, to follow ``ASYNC_VIEWS``."""
+    for module in (lettings.urls, profiles.urls, oc_lettings_site.urls):
+        importlib.reload(module)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_urls(settings):
+    """
+    Route the pages to their async views, as under ASGI.
+
+    Args:
+        settings: The pytest-django settings fixture.
+
+    Yields:
+        None: The URL configurations use the async views meanwhile.
+    """
+    enabled = settings.ASYNC_VIEWS
+    settings.ASYNC_VIEWS = True
+    reload_urlconfs()
+    yield
+    settings.ASYNC_VIEWS = enabled
+    reload_urlconfs()
+
+
+@pytest.fixture
+def manifest_storage(settings, tmp_path):
+    """
+    Use the manifest storage with a temporary STATIC_ROOT.
+
+    Args:
+        settings: The pytest-django settings fixture.
+        tmp_path: The pytest temporary directory.
+
+    Returns:
+        Path: The STATIC_ROOT directory.
+    """
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "oc_lettings_site.storage.ManifestStaticFilesStorage"},
+    }
+    return tmp_path
+
+
+@pytest.fixture
+def collected(manifest_storage):
+    """
+    Collect the project static files with the manifest storage into a temporary directory.
+
+    The admin files are left out, as their compression would slow the tests.
+
+    Args:
+        manifest_storage: The manifest storage fixture.
+
+    Returns:
+        Path: The STATIC_ROOT directory.
+    """
+    call_command("collectstatic", "--noinput", "--ignore", "admin", verbosity=0)
+    return manifest_storage
@@ -0,0 +1,208 @@
+"""
+Tests for the ASGI setup of the oc_lettings_site application.
+
+This module contains integration tests running the async views through
+the ASGI request handler and the middleware, and unit tests for the
+async-capable middleware.
+"""
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory
+from django.urls import resolve, reverse
+
+from lettings import async_views as lettings_async_views
+from lettings.models import Address, Letting
+from oc_lettings_site import async_views
+from oc_lettings_site.middleware import StaticFilesMiddleware
+from oc_lettings_site.replicas import PIN_COOKIE, ReplicaPinMiddleware
+from profiles import async_views as profiles_async_views
+
+
+def create_letting(title, using="default"):
+    """
+    Create a letting and its address in a database.
+
+    Args:
+        title: The title of the letting.
+        using: The database alias.
+
+    Returns:
+        Letting: The created letting.
+    """
+    address = Address.objects.using(using).create(
+        number=1,
+        street="Main Street",
+        city="Springfield",
+        state="IL",
+        zip_code=62701,
+        country_iso_code="USA",
+    )
+    return Letting.objects.using(using).create(title=title, address=address)
+
+
+@pytest.fixture
+def async_client():
+    """
+    Create a Django test client sending requests through the ASGI handler.
+
+    Returns:
+        AsyncClient: A Django async test client instance.
+    """
+    return AsyncClient()
+
+
+def get(client, path, **extra):
+    """
+    Send a GET request with an async client from a synchronous test.
+
+    Args:
+        client: The async test client.
+        path: The URL path.
+        **extra: The extra request headers.
+
+    Returns:
+        HttpResponse: The response.
+    """
+    async def request():
+        return await client.get(path, **extra)
+
+    return async_to_sync(request)()
+
+
+@pytest.mark.django_db
+class TestAsyncViewsRouting:
+    """Tests for the routing of the async views."""
+
+    def test_sync_views_by_default(self):
+        """Test that the synchronous views are routed without ASYNC_VIEWS."""
+        assert not iscoroutinefunction(resolve(reverse("lettings:index")).func)
+
+    def test_async_views_enabled(self, async_urls):
+        """
+        Test that ASYNC_VIEWS routes the pages to their async views.
+
+        Args:
+            async_urls: The fixture enabling the async views.
+        """
+        assert resolve(reverse("index")).func is async_views.index
+        assert resolve(reverse("lettings:index")).func is lettings_async_views.index
+        assert (
+            resolve(reverse("profiles:profile", args=["user1"])).func
+            is profiles_async_views.profile
+        )
+
+    def test_pages_through_asgi(self, async_urls, async_client):
+        """
+        Test that the pages are served through the ASGI handler.
+
+        Args:
+            async_urls: The fixture enabling the async views.
+            async_client: The async test client.
+        """
+        letting = create_letting("Async Letting")
+        assert get(async_client, reverse("index")).status_code == 200
+        response = get(async_client, reverse("lettings:index"))
+        assert response.status_code == 200
+        assert b"Async Letting" in response.content
+        url = reverse("lettings:letting", args=[letting.id])
+        etag = get(async_client, url)["ETag"]
+        assert get(async_client, url, headers={"if-none-match": etag}).status_code == 304
+        assert get(async_client, reverse("profiles:index")).status_code == 200
+
+    def test_unknown_letting_returns_404(self, async_urls, async_client):
+        """
+        Test that the 404 page is served for an unknown letting.
+
+        Args:
+            async_urls: The fixture enabling the async views.
+            async_client: The async test client.
+        """
+        response = get(async_client, reverse("lettings:letting", args=[999]))
+        assert response.status_code == 404
+
+    def test_async_views_read_the_replica(self, async_urls, async_client, replica):
+        """
+        Test that the async views read the replica of the request.
+
+        Args:
+            async_urls: The fixture enabling the async views.
+            async_client: The async test client.
+            replica: The replica fixture.
+        """
+        create_letting("Primary Letting")
+        replica_letting = create_letting("Replica Letting", using=replica)
+        response = get(async_client, reverse("lettings:index"))
+        assert b"Replica Letting" in response.content
+        assert b"Primary Letting" not in response.content
+        url = reverse("lettings:letting", args=[replica_letting.id])
+        assert get(async_client, url).status_code == 200
+        async_client.cookies[PIN_COOKIE] = "1"
+        response = get(async_client, reverse("lettings:index"))
+        assert b"Primary Letting" in response.content
+
+
+class TestAsyncHomeView:
+    """Tests for the async home page view."""
+
+    def test_home_page(self):
+        """Test that the async home page renders."""
+        response = async_to_sync(async_views.index)(RequestFactory().get("/"))
+        assert response.status_code == 200
+
+
+class TestAsyncMiddleware:
+    """Tests for the async path of the project middleware."""
+
+    @staticmethod
+    async def get_response(request):
+        return HttpResponse("view")
+
+    def test_static_files_middleware(self, settings):
+        """
+        Test that static files are served without calling the async view.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        settings.WHITENOISE_AUTOREFRESH = True
+        settings.WHITENOISE_USE_FINDERS = True
+        middleware = StaticFilesMiddleware(self.get_response)
+        assert iscoroutinefunction(middleware)
+        request = RequestFactory().get("/static/css/styles.css")
+        response = async_to_sync(middleware)(request)
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/css")
+        response.file_to_stream.close()
+        response = async_to_sync(middleware)(RequestFactory().get("/lettings/"))
+        assert response.content == b"view"
+
+    def test_static_files_middleware_sync(self, settings):
+        """
+        Test that the middleware keeps its synchronous path under WSGI.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        settings.WHITENOISE_AUTOREFRESH = True
+        settings.WHITENOISE_USE_FINDERS = True
+        middleware = StaticFilesMiddleware(lambda request: HttpResponse("view"))
+        assert not iscoroutinefunction(middleware)
+        response = middleware(RequestFactory().get("/static/css/styles.css"))
+        assert response.status_code == 200
+        response.file_to_stream.close()
+        assert middleware(RequestFactory().get("/")).content == b"view"
+
+    def test_replica_pin_middleware(self, settings):
+        """
+        Test that the async path of the pin middleware is used under ASGI.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        settings.DATABASE_REPLICAS = ["replica1"]
+        middleware = ReplicaPinMiddleware(self.get_response)
+        assert iscoroutinefunction(middleware)
+        response = async_to_sync(middleware)(RequestFactory().get("/"))
+        assert response.content == b"view"
+        assert PIN_COOKIE not in response.cookies
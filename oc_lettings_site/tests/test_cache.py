@@ -0,0 +1,226 @@
+"""
+Tests for the oc_lettings_site response cache.
+
+This module contains unit tests for the cache_response decorator, the
+eviction helper, the fragment versions and the hit/miss counters.
+"""
+from types import SimpleNamespace
+
+import pytest
+from django.http import HttpResponse, HttpResponseNotFound
+from django.test import RequestFactory
+from django.utils import timezone
+
+from oc_lettings_site import cache
+from oc_lettings_site.cache import (
+    CacheStats,
+    bump_fragment_version,
+    cache_response,
+    evict_responses,
+    fragment_context,
+    get_fragment_version,
+    get_view_cache,
+    stats,
+)
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """
+    Record the lookups counted by the metrics.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+
+    Returns:
+        list: The (page type, hit) of each lookup.
+    """
+    recorded = []
+    monkeypatch.setattr(
+        cache.metrics, "observe_cache_lookup", lambda page, hit: recorded.append((page, hit))
+    )
+    return recorded
+
+
+@pytest.fixture
+def counting_view():
+    """
+    Create a cached view that counts its calls.
+
+    Returns:
+        callable: The view, with a ``calls`` list attribute.
+    """
+    calls = []
+
+    @cache_response("item", "item_id")
+    def view(request, item_id):
+        calls.append(item_id)
+        if item_id == 0:
+            return HttpResponseNotFound("missing")
+        return HttpResponse(f"item {item_id}", content_type="text/plain")
+
+    view.calls = calls
+    return view
+
+
+class TestCacheResponse:
+    """Tests for the cache_response decorator."""
+
+    def test_second_get_is_served_from_cache(self, counting_view, lookups):
+        """
+        Test that a page is only rendered once, and each lookup counted once.
+
+        Args:
+            counting_view: The counting_view fixture.
+            lookups: The recorded lookups fixture.
+        """
+        request = RequestFactory().get("/items/1/")
+        first = counting_view(request, item_id=1)
+        second = counting_view(request, item_id=1)
+        assert counting_view.calls == [1]
+        assert first["X-Cache"] == "MISS"
+        assert second["X-Cache"] == "HIT"
+        assert second.content == b"item 1"
+        assert second["Content-Type"] == "text/plain"
+        assert lookups == [("item", False), ("item", True)]
+        assert stats.snapshot() == {"item": {"hits": 1, "misses": 1, "hit_ratio": 0.5}}
+
+    def test_eviction_forces_a_new_render(self, counting_view):
+        """
+        Test that an evicted page is rendered again.
+
+        Args:
+            counting_view: The counting_view fixture.
+        """
+        request = RequestFactory().get("/items/1/")
+        counting_view(request, item_id=1)
+        evict_responses("item", 1)
+        counting_view(request, item_id=1)
+        assert counting_view.calls == [1, 1]
+
+    def test_errors_are_not_cached(self, counting_view):
+        """
+        Test that non-200 responses are not stored.
+
+        Args:
+            counting_view: The counting_view fixture.
+        """
+        request = RequestFactory().get("/items/0/")
+        counting_view(request, item_id=0)
+        counting_view(request, item_id=0)
+        assert counting_view.calls == [0, 0]
+
+    def test_post_bypasses_cache(self, counting_view, lookups):
+        """
+        Test that non-GET requests are never cached.
+
+        Args:
+            counting_view: The counting_view fixture.
+            lookups: The recorded lookups fixture.
+        """
+        request = RequestFactory().post("/items/1/")
+        counting_view(request, item_id=1)
+        counting_view(request, item_id=1)
+        assert counting_view.calls == [1, 1]
+        assert lookups == []
+        assert stats.snapshot() == {}
+
+
+class TestSinglePageCache:
+    """Tests for cache_response on a view without URL argument."""
+
+    def test_page_is_keyed_by_page_version(self, settings):
+        """
+        Test that a single page is cached until PAGE_VERSION changes.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        calls = []
+
+        @cache_response("static")
+        def view(request):
+            calls.append(request.path)
+            return HttpResponse("static")
+
+        request = RequestFactory().get("/")
+        view(request)
+        assert view(request)["X-Cache"] == "HIT"
+        settings.PAGE_VERSION = "2"
+        assert view(request)["X-Cache"] == "MISS"
+        assert len(calls) == 2
+
+
+class TestFragmentVersions:
+    """Tests for the versions of the cached template fragments."""
+
+    def test_version_is_stable_until_bumped(self):
+        """Test that a version only changes when it is bumped."""
+        version = get_fragment_version("items")
+        assert get_fragment_version("items") == version
+        bump_fragment_version("items")
+        assert get_fragment_version("items") != version
+
+    def test_lost_version_is_never_reused(self):
+        """Test that a version lost with the cache does not come back."""
+        version = get_fragment_version("items")
+        get_view_cache().clear()
+        assert get_fragment_version("items") != version
+
+    def test_fragment_context(self, settings):
+        """
+        Test that the fragment key identifies the rows and their state.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        settings.VIEW_CACHE_TIMEOUT = 60
+        updated_at = timezone.now()
+        rows = [SimpleNamespace(pk=pk, updated_at=updated_at) for pk in (1, 2)]
+        context = fragment_context(7, rows)
+        timestamp = updated_at.timestamp()
+        assert context == {
+            "fragment_version": 7,
+            "fragment_key": f"1@{timestamp},2@{timestamp}",
+            "fragment_timeout": 60,
+        }
+
+
+class TestCacheStats:
+    """Tests for the hit and miss counters."""
+
+    def test_counters_are_logged_after_the_interval(self, settings, caplog):
+        """
+        Test that the counters are logged with their ratio, with metrics off.
+
+        Args:
+            settings: The pytest-django settings fixture.
+            caplog: The pytest log capture fixture.
+        """
+        settings.METRICS_ENABLED = False
+        settings.VIEW_CACHE_LOG_INTERVAL = 60
+        counters = CacheStats()
+        with caplog.at_level("INFO", logger="oc_lettings_site.cache"):
+            counters.record("letting", hit=False)
+            assert not caplog.records
+            counters.last_log -= 60
+            counters.record("letting", hit=True)
+        record = caplog.records[-1]
+        assert record.getMessage() == "View cache: letting 1 hits, 1 misses (50%)"
+        assert record.cache_stats == {"letting": {"hits": 1, "misses": 1, "hit_ratio": 0.5}}
+
+    def test_logs_can_be_disabled(self, settings, caplog):
+        """
+        Test that a zero interval never logs the counters.
+
+        Args:
+            settings: The pytest-django settings fixture.
+            caplog: The pytest log capture fixture.
+        """
+        settings.VIEW_CACHE_LOG_INTERVAL = 0
+        counters = CacheStats()
+        counters.last_log -= 3600
+        with caplog.at_level("INFO", logger="oc_lettings_site.cache"):
+            counters.record("profile", hit=True)
+        assert not caplog.records
+        assert counters.snapshot()["profile"]["hits"] == 1
@@ -0,0 +1,522 @@
+"""
+Tests for the oc_lettings_site management commands.
+
+This module contains tests for the explain_queries, seed_database,
+build_css, compression_report, benchmark_sqlite, benchmark_servers, benchmark_templates and
+benchmark_sentry commands.
+"""
+import json
+import subprocess
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from sentry_sdk.envelope import Envelope
+
+from lettings.models import Address, Letting
+from oc_lettings_site.cache import get_fragment_version
+from oc_lettings_site.management.commands import (
+    benchmark_sentry, benchmark_servers, profile_imports,
+)
+from oc_lettings_site.management.commands.explain_queries import find_seq_scans
+from profiles.models import Profile
+
+
+class TestFindSeqScans:
+    """Tests for the find_seq_scans function."""
+
+    def test_sqlite_plan(self):
+        """Test that plain SQLite table scans are detected, index scans are not."""
+        plan = [
+            "SCAN lettings_letting",
+            "SCAN lettings_letting USING INDEX letting_title_idx",
+            "SEARCH lettings_address USING INTEGER PRIMARY KEY (rowid=?)",
+            "SCAN CONSTANT ROW",
+        ]
+        assert find_seq_scans("sqlite", plan) == ["lettings_letting"]
+
+    def test_postgresql_plan(self):
+        """Test that PostgreSQL sequential scans are detected."""
+        plan = [
+            "Hash Join  (cost=1.09..2.20 rows=1 width=8)",
+            "  ->  Seq Scan on lettings_address  (cost=0.00..1.06 rows=6 width=8)",
+            "  ->  Index Scan using lettings_letting_pkey on lettings_letting",
+        ]
+        assert find_seq_scans("postgresql", plan) == ["lettings_address"]
+
+
+@pytest.mark.django_db
+class TestExplainQueriesCommand:
+    """Tests for the explain_queries management command."""
+
+    def test_every_lookup_uses_an_index(self):
+        """Test that the audited pages and reports have no unbounded scan."""
+        address = Address.objects.create(
+            number=1, street="Main Street", city="Springfield",
+            state="IL", zip_code=62701, country_iso_code="USA",
+        )
+        Letting.objects.create(title="Test Letting", address=address)
+        Profile.objects.create(user=User.objects.create(username="testuser"))
+        stdout = StringIO()
+        call_command("explain_queries", "--fail-on-seq-scan", stdout=stdout)
+        output = stdout.getvalue()
+        assert "report: lettings by state and city" in output
+        assert "address_state_city_idx" in output
+        assert "profiles:profile /profiles/testuser/" in output
+
+
+class TestBenchmarkSqliteCommand:
+    """Tests for the benchmark_sqlite management command."""
+
+    def test_both_profiles_are_measured(self):
+        """Test that a short run reports both profiles as JSON."""
+        stdout = StringIO()
+        call_command(
+            "benchmark_sqlite", "--readers", "2", "--rows", "50", "--duration", "0.1",
+            "--json", stdout=stdout,
+        )
+        results = json.loads(stdout.getvalue())
+        assert set(results) == {"default", "tuned"}
+        assert results["tuned"]["reads_per_second"] > 0
+        assert results["default"]["writes_per_second"] > 0
+
+    def test_table_output(self):
+        """Test the text report of a single profile."""
+        stdout = StringIO()
+        call_command(
+            "benchmark_sqlite", "--profile", "default", "--readers", "1", "--rows", "10",
+            "--duration", "0.05", stdout=stdout,
+        )
+        assert "default" in stdout.getvalue()
+        assert "tuned" not in stdout.getvalue()
+
+    def test_disabled_profile(self, settings):
+        """
+        Test that the tuned profile needs SQLITE_PRAGMAS.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        settings.SQLITE_PRAGMAS = {}
+        with pytest.raises(CommandError, match="SQLITE_TUNING"):
+            call_command("benchmark_sqlite", "--duration", "0.05")
+
+
+@pytest.mark.django_db
+class TestSeedDatabaseCommand:
+    """Tests for the seed_database management command."""
+
+    def test_rows_are_inserted_in_batches(self):
+        """Test that the lettings and profiles are inserted with their relations."""
+        stdout = StringIO()
+        call_command(
+            "seed_database", "--lettings", "5", "--profiles", "3", "--batch-size", "2",
+            "--verbosity", "2", stdout=stdout,
+        )
+        assert Letting.objects.count() == 5
+        assert Address.objects.count() == 5
+        assert Profile.objects.filter(user__username__startswith="benchmark_").count() == 3
+        assert "4 lettings inserted" in stdout.getvalue()
+        assert "Inserted 5 lettings and 3 profiles" in stdout.getvalue()
+        assert not Profile.objects.first().user.has_usable_password()
+
+    def test_seeding_again_adds_rows(self):
+        """Test that a second run numbers its users after the existing ones."""
+        call_command("seed_database", "--lettings", "1", "--profiles", "2", stdout=StringIO())
+        call_command("seed_database", "--lettings", "1", "--profiles", "2", stdout=StringIO())
+        assert Letting.objects.count() == 2
+        assert User.objects.count() == 4
+
+    def test_list_fragments_are_invalidated(self):
+        """Test that the cached rows of the index pages are invalidated."""
+        versions = get_fragment_version("lettings"), get_fragment_version("profiles")
+        call_command("seed_database", "--lettings", "1", "--profiles", "1", stdout=StringIO())
+        assert get_fragment_version("lettings") != versions[0]
+        assert get_fragment_version("profiles") != versions[1]
+
+    def test_invalid_options(self):
+        """Test that negative volumes and empty batches are rejected."""
+        with pytest.raises(CommandError, match="negative"):
+            call_command("seed_database", "--lettings", "-1")
+        with pytest.raises(CommandError, match="positive"):
+            call_command("seed_database", "--batch-size", "0")
+
+
+class TestBuildCssCommand:
+    """Tests for the build_css management command."""
+
+    def test_stylesheets_are_up_to_date(self):
+        """Test that site.css and critical.css match the templates."""
+        stdout = StringIO()
+        call_command("build_css", "--check", stdout=stdout)
+        assert "up to date" in stdout.getvalue()
+
+    def test_build(self, tmp_path):
+        """
+        Test that the stylesheets are written and the savings reported.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        (tmp_path / "css").mkdir()
+        (tmp_path / "css" / "styles.css").write_text(
+            '@charset "UTF-8";\n/*! License */\n.navbar { color: red }\n'
+            ".unused { color: blue }\n.footer { color: green }\n"
+        )
+        stdout = StringIO()
+        call_command("build_css", "--static-dir", str(tmp_path), stdout=stdout)
+        site = (tmp_path / "css" / "site.css").read_text()
+        critical = (tmp_path / "css" / "critical.css").read_text()
+        assert site.startswith('@charset "UTF-8";\n/* Generated')
+        assert "/*! License */" in site
+        assert ".navbar{color: red}" in site and ".footer{color: green}" in site
+        assert ".unused" not in site
+        assert ".navbar" in critical and ".footer" not in critical
+        assert "smaller than styles.css" in stdout.getvalue()
+
+    def test_stale_stylesheets(self, tmp_path):
+        """
+        Test that --check fails when the stylesheets were not built.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        (tmp_path / "css").mkdir()
+        (tmp_path / "css" / "styles.css").write_text(".navbar { color: red }")
+        with pytest.raises(CommandError, match="not up to date"):
+            call_command("build_css", "--static-dir", str(tmp_path), "--check")
+
+
+class TestCompressionReportCommand:
+    """Tests for the compression_report management command."""
+
+    def test_report(self, collected):
+        """
+        Test that the project files and their variants are reported.
+
+        Args:
+            collected: The collected static files fixture.
+        """
+        stdout = StringIO()
+        call_command("compression_report", stdout=stdout)
+        output = stdout.getvalue()
+        assert "css/site." in output
+        assert "admin/" not in output
+        assert output.splitlines()[-1].startswith("total")
+
+    def test_not_collected(self, tmp_path):
+        """
+        Test that an empty STATIC_ROOT is an error.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        with pytest.raises(CommandError, match="run collectstatic"):
+            call_command("compression_report", "--static-root", str(tmp_path))
+
+
+class TestCompare:
+    """Tests for the compare function of benchmark_servers."""
+
+    def test_regressions(self):
+        """Test that slower pages and a lower throughput are reported."""
+        previous = {"wsgi": {"requests_per_second": 100.0, "paths": {
+            "/": {"p95_ms": 0.5}, "/lettings/": {"p95_ms": 10.0}, "/gone/": {"p95_ms": 1.0},
+        }}}
+        results = {"wsgi": {"requests_per_second": 70.0, "paths": {
+            "/": {"p95_ms": 1.2}, "/lettings/": {"p95_ms": 15.0}, "/new/": {"p95_ms": 1.0},
+        }}, "asgi": {"requests_per_second": 50.0, "paths": {}}}
+        rows, regressions = benchmark_servers.compare(previous, results, 0.2)
+        assert [row[:2] for row in rows] == [
+            ("wsgi", "/"), ("wsgi", "/lettings/"), ("wsgi", "(all)"),
+        ]
+        assert regressions == ["wsgi /lettings/: p95 +50%", "wsgi: throughput -30%"]
+
+
+class TestBenchmarkServersCommand:
+    """Tests for the benchmark_servers management command."""
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize("server", ["wsgi", "asgi"])
+    def test_single_server(self, server):
+        """
+        Test that a setup is measured in the current process.
+
+        Args:
+            server: The setup to run.
+        """
+        address = Address.objects.create(
+            number=1, street="Main Street", city="Springfield", state="IL",
+            zip_code=62701, country_iso_code="USA",
+        )
+        Letting.objects.create(title="Benchmark Letting", address=address)
+        stdout = StringIO()
+        call_command(
+            "benchmark_servers", "--server", server, "--requests", "3",
+            "--concurrency", "2", "--json", stdout=stdout,
+        )
+        result = json.loads(stdout.getvalue())[server]
+        assert result["requests"] == 12
+        assert result["errors"] == 0
+        assert result["paths"]["/lettings/"]["queries"] >= 1
+        assert len(result["paths"]) == 4
+        assert result["requests_per_second"] > 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_saved_results_are_compared(self, tmp_path):
+        """
+        Test that a run is saved with its context and compared with a later one.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "results.json"
+        arguments = ["benchmark_servers", "--server", "wsgi", "--requests", "2", "--path", "/"]
+        call_command(*arguments, "--output", str(path), stdout=StringIO())
+        saved = json.loads(path.read_text())
+        assert (saved["lettings"], saved["requests"]) == (0, 2)
+        assert saved["results"]["wsgi"]["paths"]["/"]["queries"] == 0
+        stdout = StringIO()
+        call_command(*arguments, "--compare", str(path), "--max-regression", "1000", stdout=stdout)
+        assert "No regression." in stdout.getvalue()
+
+    def test_unreadable_comparison(self, tmp_path):
+        """
+        Test that a missing or invalid results file is reported before the run.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "results.json"
+        path.write_text("{}")
+        with pytest.raises(CommandError, match="Cannot read"):
+            call_command("benchmark_servers", "--compare", str(path))
+
+    @pytest.mark.django_db
+    def test_failing_requests(self):
+        """Test that a run where every request fails is reported."""
+        with pytest.raises(CommandError, match="ALLOWED_HOSTS"):
+            call_command(
+                "benchmark_servers", "--server", "wsgi", "--requests", "1",
+                "--path", "/missing/",
+            )
+
+    def test_both_servers_in_new_processes(self, monkeypatch):
+        """
+        Test that each setup runs in a new process with its environment.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        calls = []
+
+        def run(command, env, **kwargs):
+            server = command[command.index("--server") + 1]
+            calls.append((server, env["ASYNC_VIEWS"]))
+            result = {
+                "requests": 1, "requests_per_second": 10.0 if server == "wsgi" else 5.0,
+                "p50_ms": 1.0, "p95_ms": 1.5, "p99_ms": 2.0, "queries": 0.0, "errors": 0,
+                "paths": {"/": {
+                    "requests": 1, "p50_ms": 1.0, "p95_ms": 1.5, "p99_ms": 2.0,
+                    "queries": 0.0, "errors": 0,
+                }},
+            }
+            return subprocess.CompletedProcess(command, 0, json.dumps({server: result}), "")
+
+        monkeypatch.setattr(benchmark_servers.subprocess, "run", run)
+        stdout = StringIO()
+        call_command("benchmark_servers", "--path", "/", stdout=stdout)
+        assert calls == [("wsgi", "false"), ("asgi", "true")]
+        assert "ASGI throughput: x0.50" in stdout.getvalue()
+
+    def test_failed_process(self, monkeypatch):
+        """
+        Test that the error output of a failed process is reported.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(
+            benchmark_servers.subprocess, "run",
+            lambda command, **kwargs: subprocess.CompletedProcess(command, 1, "", "boom"),
+        )
+        with pytest.raises(CommandError, match="boom"):
+            call_command("benchmark_servers")
+
+    def test_invalid_options(self):
+        """Test that the request count must be positive."""
+        with pytest.raises(CommandError, match="positive"):
+            call_command("benchmark_servers", "--requests", "0")
+
+
+@pytest.mark.django_db
+class TestBenchmarkTemplatesCommand:
+    """Tests for the benchmark_templates management command."""
+
+    def test_all_setups_are_measured(self):
+        """Test that each page is measured in each setup."""
+        stdout = StringIO()
+        call_command("benchmark_templates", "--renders", "2", "--json", stdout=stdout)
+        results = json.loads(stdout.getvalue())
+        assert set(results) == {"uncached", "loader", "cached"}
+        assert set(results["cached"]) == {"home", "lettings", "profiles"}
+        assert results["uncached"]["home"]["mean_ms"] > 0
+
+    def test_table_output(self):
+        """Test the text report."""
+        stdout = StringIO()
+        call_command("benchmark_templates", "--renders", "1", stdout=stdout)
+        assert "uncached" in stdout.getvalue()
+
+    def test_invalid_renders(self):
+        """Test that the render count must be positive."""
+        with pytest.raises(CommandError, match="positive"):
+            call_command("benchmark_templates", "--renders", "0")
+
+
+class TestBenchmarkSentryCommand:
+    """Tests for the benchmark_sentry management command."""
+
+    @pytest.mark.django_db(transaction=True)
+    def test_single_config(self):
+        """Test that the configuration without Sentry is measured in this process."""
+        stdout = StringIO()
+        call_command(
+            "benchmark_sentry", "--config", "off", "--requests", "2", "--json",
+            stdout=stdout,
+        )
+        result = json.loads(stdout.getvalue())["off"]
+        assert result["requests"] == 6
+        assert (result["errors"], result["transactions"], result["sent_kb"]) == (0, 0, 0)
+
+    def test_counting_transport(self):
+        """Test that the stub transport counts the items it would send."""
+        transport = benchmark_sentry.CountingTransport()
+        envelope = Envelope()
+        envelope.add_transaction({"type": "transaction", "transaction": "index"})
+        transport.capture_envelope(envelope)
+        assert transport.items == {"transaction": 1}
+        assert transport.size > 0
+
+    def test_configs_in_new_processes(self, monkeypatch):
+        """
+        Test that each configuration runs in a new process without the real DSN.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        calls = []
+
+        def run(command, env, **kwargs):
+            config = command[command.index("--config") + 1]
+            calls.append((config, env["SENTRY_DSN"], env.get("SENTRY_SLOW_REQUEST_SECONDS")))
+            result = {
+                "requests": 1, "requests_per_second": 10.0, "p50_ms": 1.0, "p99_ms": 2.0,
+                "errors": 0, "paths": {}, "transactions": 1, "profiles": 0, "sent_kb": 1.0,
+            }
+            return subprocess.CompletedProcess(command, 0, json.dumps({config: result}), "")
+
+        monkeypatch.setenv("SENTRY_DSN", "https://key@sentry.example/1")
+        monkeypatch.delenv("SENTRY_SLOW_REQUEST_SECONDS", raising=False)
+        monkeypatch.setattr(benchmark_sentry.subprocess, "run", run)
+        stdout = StringIO()
+        call_command("benchmark_sentry", stdout=stdout)
+        assert calls == [
+            ("off", "", None), ("full", "", None), ("tail", "", "1.0"), ("head", "", "0"),
+        ]
+        assert "+0.00" in stdout.getvalue()
+
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   encodings.aliases
+import time:       400 |        500 | encodings
+import time:       900 |        900 |     django.utils.version
+import time:       300 |       1200 |   django
+import time:      2000 |       2000 |     sentry_sdk.client
+import time:      1000 |       3000 |   sentry_sdk
+import time:       500 |       4700 | oc_lettings_site.wsgi
+"""
+
+
+class TestProfileImportsCommand:
+    """Tests for the profile_imports management command."""
+
+    def test_parse_importtime(self):
+        """Test that each module gets its depth, times and importer."""
+        entries = {entry["name"]: entry for entry in profile_imports.parse_importtime(IMPORTTIME)}
+        assert len(entries) == 7
+        assert entries["django.utils.version"] == {
+            "name": "django.utils.version", "depth": 2, "self_us": 900,
+            "cumulative_us": 900, "parent": "django",
+        }
+        assert entries["django"]["parent"] == "oc_lettings_site.wsgi"
+        assert entries["sentry_sdk"]["parent"] == "oc_lettings_site.wsgi"
+        assert entries["encodings.aliases"]["parent"] == "encodings"
+        assert entries["oc_lettings_site.wsgi"]["parent"] is None
+
+    def test_report(self, monkeypatch):
+        """
+        Test that the median of the processes is reported per module and package.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        outputs = iter([IMPORTTIME, IMPORTTIME.replace("4700", "4900"), IMPORTTIME])
+        commands = []
+
+        def run(command, **kwargs):
+            commands.append(command)
+            return subprocess.CompletedProcess(command, 0, "", next(outputs))
+
+        monkeypatch.setattr(profile_imports.subprocess, "run", run)
+        stdout = StringIO()
+        call_command("profile_imports", "--runs", "3", "--json", stdout=stdout)
+        summary = json.loads(stdout.getvalue())
+        assert commands[0][1:] == ["-X", "importtime", "-c", "import oc_lettings_site.wsgi"]
+        assert summary["total_ms"] == 4.7
+        assert summary["packages"] == {
+            "sentry_sdk": 3.0, "django": 1.2, "oc_lettings_site": 0.5, "encodings": 0.5,
+        }
+
+        outputs = iter([IMPORTTIME])
+        stdout = StringIO()
+        call_command("profile_imports", "--runs", "1", "--limit", "2", stdout=stdout)
+        report = stdout.getvalue()
+        assert "oc_lettings_site.wsgi: 4.7 ms" in report
+        assert ["sentry_sdk", "3.0", "oc_lettings_site.wsgi"] in [
+            line.split() for line in report.splitlines()
+        ]
+        assert "encodings.aliases" not in report
+
+    def test_budget(self, monkeypatch):
+        """
+        Test that an import slower than --max-ms fails.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(
+            profile_imports.subprocess, "run",
+            lambda command, **kwargs: subprocess.CompletedProcess(command, 0, "", IMPORTTIME),
+        )
+        call_command("profile_imports", "--runs", "1", "--max-ms", "5", stdout=StringIO())
+        with pytest.raises(CommandError, match="4.7 ms, more than 4 ms"):
+            call_command("profile_imports", "--runs", "1", "--max-ms", "4", stdout=StringIO())
+
+    def test_failed_import(self, monkeypatch):
+        """
+        Test that a failing import is reported with its error.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        monkeypatch.setattr(
+            profile_imports.subprocess, "run",
+            lambda command, **kwargs: subprocess.CompletedProcess(
+                command, 1, "", "ModuleNotFoundError: No module named 'missing'"
+            ),
+        )
+        with pytest.raises(CommandError, match="No module named"):
+            call_command("profile_imports", "--module", "missing", stdout=StringIO())
@@ -0,0 +1,154 @@
+"""
+Tests for the oc_lettings_site static files compression.
+
+This module contains tests for the Zstandard variants written by the
+compressor, the parsing of Accept-Encoding and the choice of the variant
+served by the static files middleware.
+"""
+import gzip
+import logging
+
+import pytest
+from django.templatetags.static import static
+
+from oc_lettings_site import compression
+from oc_lettings_site.compression import Compressor, NegotiatedStaticFile, parse_accept_encoding
+from oc_lettings_site.middleware import StaticFilesMiddleware
+
+
+@pytest.fixture
+def variants(tmp_path):
+    """
+    Create a file and compressed variants of different sizes.
+
+    Args:
+        tmp_path: The pytest temporary directory.
+
+    Returns:
+        NegotiatedStaticFile: The responder of the file.
+    """
+    path = tmp_path / "styles.css"
+    path.write_bytes(b"x" * 100)
+    for suffix, size in ((".gz", 50), (".zst", 40), (".br", 30)):
+        (tmp_path / f"styles.css{suffix}").write_bytes(b"x" * size)
+    return NegotiatedStaticFile(
+        str(path), [("Content-Type", "text/css")],
+        encodings={encoding: f"{path}{suffix}" for suffix, encoding in
+                   compression.ENCODINGS.items()},
+    )
+
+
+def served_encoding(static_file, accept_encoding):
+    """
+    Return the Content-Encoding of the variant served for an Accept-Encoding.
+
+    Args:
+        static_file: The responder of the file.
+        accept_encoding: The Accept-Encoding header of the request.
+
+    Returns:
+        str: The encoding, or None for the file itself.
+    """
+    _, headers = static_file.get_path_and_headers({"HTTP_ACCEPT_ENCODING": accept_encoding})
+    return dict(headers).get("Content-Encoding")
+
+
+class TestParseAcceptEncoding:
+    """Tests for the parse_accept_encoding function."""
+
+    def test_qualities(self):
+        """Test that the quality values default to 1, names are lowered."""
+        assert parse_accept_encoding("gzip, BR;q=0.5, zstd ; q=0, *;q=.") == {
+            "gzip": 1.0, "br": 0.5, "zstd": 0.0, "*": 1.0
+        }
+        assert parse_accept_encoding("") == {}
+
+
+class TestNegotiatedStaticFile:
+    """Tests for the NegotiatedStaticFile class."""
+
+    @pytest.mark.parametrize("accept_encoding, encoding", [
+        ("gzip, deflate, br, zstd", "br"),
+        ("gzip, zstd", "zstd"),
+        ("gzip", "gzip"),
+        ("br;q=0, *", "zstd"),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ])
+    def test_smallest_accepted_variant(self, variants, accept_encoding, encoding):
+        """
+        Test that the smallest variant the client accepts is served.
+
+        Args:
+            variants: The file with compressed variants fixture.
+            accept_encoding: The Accept-Encoding header of the request.
+            encoding: The expected Content-Encoding.
+        """
+        assert served_encoding(variants, accept_encoding) == encoding
+
+
+class TestCompressor:
+    """Tests for the Compressor class."""
+
+    def test_zstd_variant(self, monkeypatch, tmp_path):
+        """
+        Test that a Zstandard variant is written when it is smaller.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+            tmp_path: The pytest temporary directory.
+        """
+        monkeypatch.setattr(compression, "compress_zstd", gzip.compress)
+        path = tmp_path / "site.css"
+        path.write_text(".navbar { color: red }\n" * 100)
+        filenames = Compressor(use_brotli=False, quiet=True).compress(str(path))
+        assert sorted(filenames) == [f"{path}.gz", f"{path}.zst"]
+
+    def test_missing_encoders_are_logged(self, monkeypatch, caplog):
+        """
+        Test that the encoders which are not installed are logged.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+            caplog: The pytest log capture fixture.
+        """
+        monkeypatch.setattr(compression, "brotli", None)
+        monkeypatch.setattr(compression, "compress_zstd", lambda data: None)
+        with caplog.at_level(logging.WARNING, logger="oc_lettings_site.compression"):
+            compressor = Compressor(quiet=True)
+        assert not compressor.use_brotli and not compressor.use_zstd
+        assert "brotli is not installed" in caplog.text
+        assert "zstandard is not installed" in caplog.text
+
+
+class TestStaticFilesMiddleware:
+    """Tests for the negotiation of the static files middleware."""
+
+    def test_zstd_variant_is_served(self, collected, client):
+        """
+        Test that the Zstandard variants of the collected files are served.
+
+        Args:
+            collected: The collected static files fixture.
+            client: The Django test client.
+        """
+        path = collected / static("css/site.css").removeprefix("/static/")
+        (collected / f"{path}.zst").write_bytes(b"x")
+        response = client.get(static("css/site.css"), HTTP_ACCEPT_ENCODING="gzip, zstd")
+        assert response["Content-Encoding"] == "zstd"
+        assert response["Vary"] == "Accept-Encoding"
+        response = client.get(static("css/site.css"), HTTP_ACCEPT_ENCODING="gzip, zstd;q=0")
+        assert response["Content-Encoding"] == "gzip"
+
+    def test_is_compressed_variant(self, tmp_path):
+        """
+        Test that the .zst files are not served as files of their own.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        (tmp_path / "site.css").write_text("")
+        assert StaticFilesMiddleware.is_compressed_variant(str(tmp_path / "site.css.zst"))
+        assert StaticFilesMiddleware.is_compressed_variant(str(tmp_path / "site.css.gz"))
+        assert not StaticFilesMiddleware.is_compressed_variant(str(tmp_path / "site.css"))
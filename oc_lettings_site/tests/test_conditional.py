@@ -0,0 +1,83 @@
+"""
+Tests for the oc_lettings_site conditional GET helpers.
+
+This module contains unit tests for the conditional_page decorator.
+"""
+import datetime
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from oc_lettings_site.conditional import conditional_page, make_etag, rows_state
+
+UPDATED_AT = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+
+
+def page_state(request, item_id):
+    """Return a fixed state, or None for the missing item 0."""
+    return None if item_id == 0 else rows_state([(item_id, UPDATED_AT)])
+
+
+@conditional_page(page_state)
+def page_view(request, item_id):
+    """Render a trivial page."""
+    return HttpResponse(f"item {item_id}")
+
+
+class TestConditionalPage:
+    """Tests for the conditional_page decorator."""
+
+    def test_validators_are_set(self):
+        """Test that a 200 response carries an ETag and a Last-Modified date."""
+        response = page_view(RequestFactory().get("/"), item_id=1)
+        assert response.status_code == 200
+        assert response["ETag"].startswith('W/"')
+        assert response["Last-Modified"] == "Tue, 02 Jan 2024 03:04:05 GMT"
+        assert "no-cache" in response["Cache-Control"]
+
+    def test_matching_etag_returns_304(self):
+        """Test that a current If-None-Match answers 304 Not Modified."""
+        etag = page_view(RequestFactory().get("/"), item_id=1)["ETag"]
+        request = RequestFactory().get("/", HTTP_IF_NONE_MATCH=etag)
+        response = page_view(request, item_id=1)
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_stale_etag_renders_page(self):
+        """Test that an outdated If-None-Match renders the page again."""
+        request = RequestFactory().get("/", HTTP_IF_NONE_MATCH='W/"stale"')
+        assert page_view(request, item_id=1).status_code == 200
+
+    def test_if_modified_since_returns_304(self):
+        """Test that a current If-Modified-Since answers 304 Not Modified."""
+        request = RequestFactory().get(
+            "/", HTTP_IF_MODIFIED_SINCE="Tue, 02 Jan 2024 03:04:05 GMT"
+        )
+        assert page_view(request, item_id=1).status_code == 304
+
+    def test_missing_state_skips_validators(self):
+        """Test that a page without state is rendered without validators."""
+        response = page_view(RequestFactory().get("/"), item_id=0)
+        assert not response.has_header("ETag")
+
+    def test_page_version_changes_etag(self, settings):
+        """
+        Test that bumping PAGE_VERSION changes every ETag.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        etag = make_etag("fingerprint")
+        settings.PAGE_VERSION = "2"
+        assert make_etag("fingerprint") != etag
+
+    def test_static_version_changes_etag(self, settings):
+        """
+        Test that collecting new static files changes every ETag.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        etag = make_etag("fingerprint")
+        settings.STATIC_VERSION = "0123456789ab"
+        assert make_etag("fingerprint") != etag
@@ -0,0 +1,142 @@
+"""
+Tests for the oc_lettings_site stylesheet pruning.
+
+This module contains tests for the CSS parser, the template class
+extraction, the pruning of rules and the inlining of the critical CSS.
+"""
+from django.template import engines
+
+from oc_lettings_site import css
+from oc_lettings_site.templatetags import stylesheets
+
+STYLESHEET = """@charset "UTF-8";
+/*! License */
+.btn, .unused { color: red; /* comment */ }
+@media (min-width: 768px) {
+  .btn:not(.unused) { margin: 0 }
+  .unused { margin: 1px }
+}
+.spinner { animation: spin 1s }
+@keyframes spin { from { opacity: 0 } to { opacity: 1 } }
+@keyframes fade { from { opacity: 0 } }
+@font-face { font-family: "A;B"; src: url("a.woff2") }
+a[href="#top"] { color: blue }
+#main .btn { padding: 0 }
+"""
+
+
+class TestParse:
+    """Tests for the parse function."""
+
+    def test_rules(self):
+        """Test that the rules, nested blocks and statements are parsed."""
+        rules = css.parse(STYLESHEET)
+        assert rules[0] == css.Rule('@charset "UTF-8"', None)
+        assert rules[1] == css.Rule(".btn, .unused", "color: red;")
+        assert rules[2].prelude == "@media (min-width: 768px)"
+        assert [rule.prelude for rule in rules[2].body] == [".btn:not(.unused)", ".unused"]
+        assert rules[4].body == "from { opacity: 0 } to { opacity: 1 }"
+
+    def test_strings(self):
+        """Test that semicolons and braces in strings do not end a rule."""
+        rules = css.parse('.a { content: "}" } .b { content: ";{" }')
+        assert [rule.prelude for rule in rules] == [".a", ".b"]
+
+
+class TestSelectorNames:
+    """Tests for the selector_names function."""
+
+    def test_names(self):
+        """Test that classes and ids are read, attributes and :not() ignored."""
+        assert css.selector_names("#main > .nav-link.active:hover") == {
+            "#main", "nav-link", "active"
+        }
+        assert css.selector_names('a[href="#top"]:not(.btn)') == set()
+
+    def test_split_selectors(self):
+        """Test that commas inside :is() do not split the selector list."""
+        assert css.split_selectors(".a, :is(.b, .c) .d") == [".a", ":is(.b, .c) .d"]
+
+
+class TestFindTemplateNames:
+    """Tests for the find_template_names function."""
+
+    def test_names(self):
+        """Test that the classes and ids are read without the template code."""
+        source = (
+            '<div id="top" class="btn {% if active %}active{% endif %} {{ extra }}">'
+            "{# below-the-fold #}"
+            '<footer class="footer">'
+        )
+        assert css.find_template_names(source) == {"#top", "btn", "active", "footer"}
+
+    def test_above_the_fold(self):
+        """Test that the names after the marker are not critical."""
+        source = '<nav class="navbar"></nav>{# below-the-fold #}<footer class="footer">'
+        assert css.find_template_names(source, above_the_fold=True) == {"navbar"}
+
+
+class TestPrune:
+    """Tests for the prune function."""
+
+    def test_unused_selectors_are_removed(self):
+        """Test that the rules and selectors of unused classes are removed."""
+        output = css.serialize(css.prune(css.parse(STYLESHEET), {"btn", "spinner"}))
+        assert ".btn{color: red}" in output
+        assert ".btn:not(.unused){margin: 0}" in output
+        assert "margin: 1px" not in output
+        assert 'a[href="#top"]{color: blue}' in output
+        assert "#main" not in output
+
+    def test_unused_keyframes_are_removed(self):
+        """Test that only the animations used by the kept rules are kept."""
+        output = css.serialize(css.prune(css.parse(STYLESHEET), {"spinner"}))
+        assert "@keyframes spin" in output
+        assert "@keyframes fade" not in output
+        output = css.serialize(css.prune(css.parse(STYLESHEET), {"btn"}))
+        assert "@keyframes spin" not in output
+
+    def test_urls_are_dropped(self):
+        """Test that the fonts and statements are left out of inlined CSS."""
+        rules = css.prune(css.parse(STYLESHEET), {"btn"}, keep_urls=False)
+        output = css.serialize(rules)
+        assert "@font-face" not in output
+        assert "@charset" not in output
+        assert ".btn{color: red}" in output
+
+
+class TestCriticalCss:
+    """Tests for the critical_css template tag."""
+
+    def test_inlined(self):
+        """Test that the built critical CSS is inlined in a style element."""
+        output = engines["django"].from_string(
+            "{% load stylesheets %}{% critical_css %}"
+        ).render()
+        assert output.startswith("<style>/* Generated by manage.py build_css")
+        assert ".navbar" in output
+        assert output.endswith("</style>")
+
+    def test_not_built(self, monkeypatch, settings):
+        """
+        Test that nothing is written when the file was not built.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+            settings: The pytest-django settings fixture.
+        """
+        settings.DEBUG = True
+        monkeypatch.setattr(stylesheets.finders, "find", lambda path: None)
+        assert stylesheets.critical_css() == ""
+
+    def test_page_links_the_pruned_stylesheet(self, client):
+        """
+        Test that the pages load site.css without blocking the first paint.
+
+        Args:
+            client: The Django test client.
+        """
+        content = client.get("/").content.decode()
+        assert "<style>" in content
+        assert 'rel="preload" href="/static/css/site.css" as="style"' in content
+        assert "/static/css/styles.css" not in content
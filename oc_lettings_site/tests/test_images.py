@@ -0,0 +1,182 @@
+"""
+Tests for the oc_lettings_site image variants.
+
+This module contains tests for the variants written by collectstatic and
+for the picture template tag linking them. Pillow is optional: the
+encoding tests are skipped without it.
+"""
+import io
+import json
+import logging
+
+import pytest
+from django.core.management import call_command
+from django.template import engines
+from django.templatetags.static import static
+
+from oc_lettings_site import images
+from oc_lettings_site.templatetags import pictures
+
+IMAGE = {
+    "width": 273,
+    "height": 260,
+    "sources": [
+        ["image/png", 273, "assets/img/logo.png"],
+        ["image/png", 70, "assets/img/logo.70w.png"],
+        ["image/webp", 273, "assets/img/logo.webp"],
+        ["image/webp", 70, "assets/img/logo.70w.webp"],
+    ],
+}
+
+
+def render_picture(**attributes):
+    """
+    Render the picture tag of the logo.
+
+    Args:
+        **attributes: The attributes of the tag, passed as context variables.
+
+    Returns:
+        str: The rendered markup.
+    """
+    code = " ".join(f"{key}={key}" for key in attributes)
+    return engines["django"].from_string(
+        '{% load pictures %}{% picture "assets/img/logo.png" ' + code + " %}"
+    ).render(attributes)
+
+
+@pytest.fixture
+def fake_variants(monkeypatch):
+    """
+    Build fixed variants of the images instead of encoding them with Pillow.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    def build_variants(name, data, widths, formats):
+        files = {images.variant_name(name, 70, ".webp"): b"webp"}
+        sources = [("image/png", 273, name), ("image/webp", 70, *files)]
+        return (273, 260), files, sources
+
+    monkeypatch.setattr(images, "load_pillow", object)
+    monkeypatch.setattr(images, "available_formats", lambda: {})
+    monkeypatch.setattr(images, "build_variants", build_variants)
+
+
+class TestVariantName:
+    """Tests for the variant_name function."""
+
+    def test_names(self):
+        """Test that the width and format are part of the name."""
+        assert images.variant_name("assets/img/logo.png", 140, ".webp") == (
+            "assets/img/logo.140w.webp"
+        )
+        assert images.variant_name("assets/img/logo.png", None, ".avif") == "assets/img/logo.avif"
+
+
+class TestBuildVariants:
+    """Tests for the build_variants function."""
+
+    def test_variants(self):
+        """Test that narrower copies are written in each format, if smaller."""
+        image_module = pytest.importorskip("PIL.Image")
+        output = io.BytesIO()
+        image_module.effect_noise((300, 200), 64).convert("RGB").save(output, "PNG")
+        size, files, sources = images.build_variants(
+            "assets/img/photo.png", output.getvalue(), [100, 400],
+            {".webp": images.VARIANT_FORMATS[".webp"]},
+        )
+        assert size == (300, 200)
+        assert "assets/img/photo.100w.png" in files
+        assert "assets/img/photo.100w.webp" in files
+        assert not any("400w" in name for name in files)
+        assert ("image/webp", 300, "assets/img/photo.webp") in sources
+
+
+class TestImageVariantsMixin:
+    """Tests for the variants written by collectstatic."""
+
+    def test_variants_are_hashed(self, manifest_storage, fake_variants):
+        """
+        Test that the variants are collected, hashed and listed.
+
+        Args:
+            manifest_storage: The manifest storage fixture.
+            fake_variants: The fixed variants fixture.
+        """
+        call_command("collectstatic", "--noinput", "--ignore", "admin", verbosity=0)
+        listed = images.read_images(manifest_storage)
+        assert listed["assets/img/logo.png"]["sources"][1] == [
+            "image/webp", 70, "assets/img/logo.70w.webp"
+        ]
+        url = static("assets/img/logo.70w.webp")
+        assert url != "/static/assets/img/logo.70w.webp"
+        assert (manifest_storage / url.removeprefix("/static/")).read_bytes() == b"webp"
+
+    def test_without_pillow(self, manifest_storage, monkeypatch, caplog):
+        """
+        Test that a missing Pillow is logged and no variant is listed.
+
+        Args:
+            manifest_storage: The manifest storage fixture.
+            monkeypatch: The pytest monkeypatch fixture.
+            caplog: The pytest log capture fixture.
+        """
+        monkeypatch.setattr(images, "load_pillow", lambda: None)
+        (manifest_storage / images.IMAGES_NAME).write_text("{}")
+        with caplog.at_level(logging.WARNING, logger="oc_lettings_site.images"):
+            call_command("collectstatic", "--noinput", "--ignore", "admin", verbosity=0)
+        assert "Pillow is not installed" in caplog.text
+        assert not (manifest_storage / images.IMAGES_NAME).exists()
+
+
+class TestPictureTag:
+    """Tests for the picture template tag."""
+
+    def test_picture(self, settings, tmp_path):
+        """
+        Test that each variant format gets a source, the image format the img.
+
+        Args:
+            settings: The pytest-django settings fixture.
+            tmp_path: The pytest temporary directory.
+        """
+        settings.DEBUG = True
+        settings.STATIC_ROOT = tmp_path
+        (tmp_path / images.IMAGES_NAME).write_text(json.dumps({"assets/img/logo.png": IMAGE}))
+        output = render_picture(alt="Logo", sizes="70px", width=70)
+        assert output == (
+            '<picture><source type="image/webp" srcset="/static/assets/img/logo.70w.webp 70w, '
+            '/static/assets/img/logo.webp 273w" sizes="70px" />'
+            '<img src="/static/assets/img/logo.png" srcset="/static/assets/img/logo.70w.png 70w, '
+            '/static/assets/img/logo.png 273w" sizes="70px" alt="Logo" width="70" /></picture>'
+        )
+
+    def test_without_variants(self, settings, tmp_path):
+        """
+        Test that an img is written when collectstatic listed no variants.
+
+        Args:
+            settings: The pytest-django settings fixture.
+            tmp_path: The pytest temporary directory.
+        """
+        settings.STATIC_ROOT = tmp_path
+        settings.STATIC_VERSION = "test"
+        output = render_picture(alt="<Logo>")
+        assert output == '<img src="/static/assets/img/logo.png" alt="&lt;Logo&gt;" />'
+
+    def test_cached_per_build(self, settings, tmp_path):
+        """
+        Test that the list is read once per STATIC_VERSION outside DEBUG.
+
+        Args:
+            settings: The pytest-django settings fixture.
+            tmp_path: The pytest temporary directory.
+        """
+        settings.STATIC_ROOT = tmp_path
+        settings.STATIC_VERSION = "first"
+        assert pictures.get_images() == {}
+        (tmp_path / images.IMAGES_NAME).write_text(json.dumps({"assets/img/logo.png": IMAGE}))
+        assert pictures.get_images() == {}
+        settings.STATIC_VERSION = "second"
+        assert "assets/img/logo.png" in pictures.get_images()
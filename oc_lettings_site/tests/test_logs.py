@@ -0,0 +1,198 @@
+"""
+Tests for the oc_lettings_site logging helpers.
+
+This module contains unit tests for the background stream handler, the
+JSON formatter and the parsing of the per-logger levels, and checks the
+logging configuration of the settings.
+"""
+import io
+import json
+import logging
+import multiprocessing
+import sys
+
+import pytest
+from django.conf import settings
+
+from oc_lettings_site.logs import BackgroundStreamHandler, JsonFormatter, parse_log_levels
+
+
+@pytest.fixture
+def stream_logger():
+    """
+    Create a logger writing to a buffer through a background handler.
+
+    Yields:
+        tuple: The logger, its handler and the buffer.
+    """
+    stream = io.StringIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(logging.Formatter("{levelname} {message}", style="{"))
+    logger = logging.getLogger("oc_lettings_site.tests.background")
+    logger.addHandler(handler)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    yield logger, handler, stream
+    logger.removeHandler(handler)
+    handler.close()
+
+
+def log_in_child():
+    """Log a message from a forked process through an inherited handler."""
+    logger = logging.getLogger("oc_lettings_site.tests.fork")
+    logger.info("from the child")
+    for handler in logger.handlers:
+        handler.close()
+
+
+class TestParseLogLevels:
+    """Tests for the parse_log_levels function."""
+
+    def test_levels(self):
+        """Test that the levels are read per logger, in any case."""
+        assert parse_log_levels(" lettings=debug, oc_lettings_site.timing=WARNING,") == {
+            "lettings": "DEBUG",
+            "oc_lettings_site.timing": "WARNING",
+        }
+        assert parse_log_levels("") == {}
+
+    @pytest.mark.parametrize("value", ["lettings", "lettings=LOUD", "=DEBUG"])
+    def test_invalid_levels(self, value):
+        """
+        Test that a malformed pair is rejected.
+
+        Args:
+            value: The invalid LOG_LEVELS value.
+        """
+        with pytest.raises(ValueError, match="Invalid log level"):
+            parse_log_levels(value)
+
+
+class TestJsonFormatter:
+    """Tests for the JsonFormatter class."""
+
+    def test_record_with_extra_fields(self):
+        """Test that the message and the extra fields are JSON fields."""
+        record = logging.makeLogRecord({
+            "name": "oc_lettings_site.timing", "levelno": logging.INFO, "levelname": "INFO",
+            "msg": "GET %s", "args": ("/lettings/",), "view": "lettings:index",
+            "db_queries": 2,
+        })
+        data = json.loads(JsonFormatter().format(record))
+        assert data["message"] == "GET /lettings/"
+        assert data["level"] == "INFO"
+        assert data["logger"] == "oc_lettings_site.timing"
+        assert (data["view"], data["db_queries"]) == ("lettings:index", 2)
+        assert "args" not in data
+
+    def test_exception(self):
+        """Test that the traceback is a field of the object."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.getLogger("test").makeRecord(
+                "test", logging.ERROR, __file__, 1, "failed", None, sys.exc_info()
+            )
+        data = json.loads(JsonFormatter().format(record))
+        assert "ValueError: boom" in data["exception"]
+
+
+class TestBackgroundStreamHandler:
+    """Tests for the BackgroundStreamHandler class."""
+
+    def test_records_are_written_in_the_background(self, stream_logger):
+        """
+        Test that the records are written by the listener, in order.
+
+        Args:
+            stream_logger: The logger fixture.
+        """
+        logger, handler, stream = stream_logger
+        arguments = ["first"]
+        logger.info("message %s", arguments)
+        arguments.append("changed")
+        logger.debug("second")
+        handler.close()
+        assert stream.getvalue() == "INFO message ['first']\nDEBUG second\n"
+
+    def test_exception_is_rendered_before_queueing(self, stream_logger):
+        """
+        Test that the traceback of a record is kept when it is queued.
+
+        Args:
+            stream_logger: The logger fixture.
+        """
+        logger, handler, stream = stream_logger
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+        handler.close()
+        assert "ValueError: boom" in stream.getvalue()
+
+    def test_level_filters_before_queueing(self, stream_logger, monkeypatch):
+        """
+        Test that the records below the handler level are never queued.
+
+        Args:
+            stream_logger: The logger fixture.
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        logger, handler, stream = stream_logger
+        handler.setLevel(logging.INFO)
+        queued = []
+        enqueue = handler.enqueue
+
+        def record_and_enqueue(record):
+            queued.append(record)
+            enqueue(record)
+
+        monkeypatch.setattr(handler, "enqueue", record_and_enqueue)
+        logger.debug("dropped")
+        logger.info("kept")
+        handler.close()
+        assert [record.msg for record in queued] == ["kept"]
+        assert stream.getvalue() == "INFO kept\n"
+
+    def test_forked_process_restarts_the_listener(self, tmp_path):
+        """
+        Test that a forked worker writes through the handler it inherited.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "child.log"
+        with open(path, "w") as stream:
+            handler = BackgroundStreamHandler(stream)
+            logger = logging.getLogger("oc_lettings_site.tests.fork")
+            logger.addHandler(handler)
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            try:
+                process = multiprocessing.get_context("fork").Process(target=log_in_child)
+                process.start()
+                process.join(10)
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+        assert process.exitcode == 0
+        assert path.read_text() == "from the child\n"
+
+
+class TestLoggingSettings:
+    """Tests for the logging configuration of the settings."""
+
+    def test_console_writes_in_the_background(self):
+        """Test that the console handler is the background handler."""
+        handler = settings.LOGGING["handlers"]["console"]
+        assert handler["()"] == "oc_lettings_site.logs.BackgroundStreamHandler"
+
+    def test_application_loggers(self):
+        """Test that the application loggers use the LOG_LEVEL setting."""
+        for name in ("oc_lettings_site", "lettings", "profiles", "api"):
+            assert settings.LOGGING["loggers"][name]["level"] == settings.LOG_LEVEL
+
+    def test_no_loop_variable_is_left(self):
+        """Test that building the loggers leaves no name in the settings module."""
+        module = sys.modules[settings.SETTINGS_MODULE]
+        assert not {"logger_name", "level"} & set(vars(module))
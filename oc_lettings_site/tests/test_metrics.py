@@ -0,0 +1,283 @@
+"""
+Tests for the oc_lettings_site Prometheus metrics.
+
+This module contains unit tests for the memory-mapped metrics files and
+the text format, a test aggregating the metrics of several processes,
+and integration tests for the ``/metrics`` view.
+"""
+import multiprocessing
+import os
+
+import pytest
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+from oc_lettings_site import metrics
+from oc_lettings_site.metrics import Counter, Histogram, MetricsFile, read_file
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    """
+    Enable the metrics, stored in a temporary directory.
+
+    Args:
+        settings: The pytest-django settings fixture.
+        tmp_path: The pytest temporary directory.
+
+    Returns:
+        Path: The metrics directory.
+    """
+    settings.METRICS_ENABLED = True
+    settings.METRICS_DIR = str(tmp_path / "metrics")
+    return tmp_path / "metrics"
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Give the test its own metric registry."""
+    monkeypatch.setattr(metrics, "REGISTRY", [])
+
+
+def observe_in_child(count):
+    """Record requests in a child process."""
+    for _ in range(count):
+        metrics.observe_request("lettings:index", 200, 0.02, 1, 0.001)
+
+
+class TestMetricsFile:
+    """Tests for the metrics file of a process."""
+
+    def test_values_are_read_back(self, tmp_path):
+        """
+        Test that the incremented values are read from the file.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "1.db"
+        store = MetricsFile(str(path))
+        store.increment("a", 1)
+        store.increment("a", 2.5)
+        store.increment("key-of-another-length", 1)
+        assert read_file(path) == [("a", 3.5), ("key-of-another-length", 1.0)]
+        store.close()
+
+    def test_file_grows(self, tmp_path):
+        """
+        Test that the file grows when its keys do not fit.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = tmp_path / "1.db"
+        store = MetricsFile(str(path))
+        for index in range(3000):
+            store.increment(f"key-{index:04d}", index)
+        assert os.path.getsize(path) > metrics.INITIAL_SIZE
+        values = dict(read_file(path))
+        assert len(values) == 3000
+        assert values["key-2999"] == 2999
+        store.close()
+
+    def test_reopened_file_keeps_its_values(self, tmp_path):
+        """
+        Test that a reopened file continues from its values.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        path = str(tmp_path / "1.db")
+        store = MetricsFile(path)
+        store.increment("a", 1)
+        store.close()
+        store = MetricsFile(path)
+        store.increment("a", 1)
+        store.increment("b", 1)
+        assert read_file(path) == [("a", 2.0), ("b", 1.0)]
+        store.close()
+
+    def test_workers_are_aggregated(self, metrics_dir):
+        """
+        Test that the values of every process are summed.
+
+        Args:
+            metrics_dir: The metrics directory fixture.
+        """
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=observe_in_child, args=(5,)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(10)
+            assert worker.exitcode == 0
+        observe_in_child(1)
+        assert len(os.listdir(metrics_dir)) == 4
+        text = metrics.render_metrics()
+        assert 'http_requests_total{view="lettings:index",status="200"} 16' in text
+
+
+class TestMetricsCleanup:
+    """Tests for the cleanup of the metrics files by the gunicorn master."""
+
+    def test_stale_file_is_not_counted_after_reset(self, metrics_dir):
+        """
+        Test that the file of a previous server is deleted at start.
+
+        Args:
+            metrics_dir: The metrics directory fixture.
+        """
+        metrics_dir.mkdir()
+        stale = MetricsFile(str(metrics_dir / "99999999.db"))
+        stale.increment(metrics.requests_total.key("http_requests_total", ("home", "200")), 7)
+        stale.close()
+        metrics.reset_metrics(str(metrics_dir))
+        assert os.listdir(metrics_dir) == []
+        assert "http_requests_total{" not in metrics.render_metrics()
+
+    def test_reset_without_directory(self, tmp_path):
+        """
+        Test that a missing directory is ignored.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        metrics.reset_metrics(str(tmp_path / "missing"))
+
+    def test_stopped_worker_is_archived(self, metrics_dir):
+        """
+        Test that the values of a stopped worker are kept in the archive.
+
+        Args:
+            metrics_dir: The metrics directory fixture.
+        """
+        context = multiprocessing.get_context("fork")
+        for count in (2, 3):
+            worker = context.Process(target=observe_in_child, args=(count,))
+            worker.start()
+            worker.join(10)
+            assert worker.exitcode == 0
+            metrics.archive_process(str(metrics_dir), worker.pid)
+        assert os.listdir(metrics_dir) == [metrics.ARCHIVE_NAME]
+        text = metrics.render_metrics()
+        assert 'http_requests_total{view="lettings:index",status="200"} 5' in text
+
+    def test_archive_without_file(self, metrics_dir):
+        """
+        Test that a worker which recorded nothing is ignored.
+
+        Args:
+            metrics_dir: The metrics directory fixture.
+        """
+        metrics_dir.mkdir()
+        metrics.archive_process(str(metrics_dir), 99999999)
+        assert os.listdir(metrics_dir) == []
+
+
+class TestRenderMetrics:
+    """Tests for the Prometheus text format."""
+
+    def test_counter(self, metrics_dir, registry):
+        """
+        Test that a counter is rendered with its labels.
+
+        Args:
+            metrics_dir: The metrics directory fixture.
+            registry: The empty registry fixture.
+        """
+        counter = Counter("jobs_total", "Jobs.", ["queue"])
+        counter.inc('say "hi"')
+        counter.inc('say "hi"', amount=2)
+        text = metrics.render_metrics()
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{queue="say \\"hi\\""} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self, metrics_dir, registry):
+        """
+        Test that the buckets of a histogram are made cumulative.
+
+        Args:
+            metrics_dir: The metrics directory fixture.
+            registry: The empty registry fixture.
+        """
+        histogram = Histogram("wait_seconds", "Waits.", ["pool"], (0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, "db")
+        lines = metrics.render_metrics().splitlines()
+        assert lines[2:7] == [
+            'wait_seconds_bucket{pool="db",le="0.1"} 1',
+            'wait_seconds_bucket{pool="db",le="1.0"} 3',
+            'wait_seconds_bucket{pool="db",le="+Inf"} 4',
+            'wait_seconds_sum{pool="db"} 4.25',
+            'wait_seconds_count{pool="db"} 4',
+        ]
+
+    def test_cache_hit_ratio(self, metrics_dir):
+        """
+        Test that the hit ratio is derived from the cache lookups.
+
+        Args:
+            metrics_dir: The metrics directory fixture.
+        """
+        metrics.observe_cache_lookup("letting", hit=False)
+        for _ in range(3):
+            metrics.observe_cache_lookup("letting", hit=True)
+        text = metrics.render_metrics()
+        assert 'view_cache_lookups_total{page="letting",result="hit"} 3' in text
+        assert 'view_cache_hit_ratio{page="letting"} 0.75' in text
+
+    def test_disabled_cache_lookups_are_not_recorded(self, settings, metrics_dir):
+        """
+        Test that nothing is written when the metrics are disabled.
+
+        Args:
+            settings: The pytest-django settings fixture.
+            metrics_dir: The metrics directory fixture.
+        """
+        settings.METRICS_ENABLED = False
+        metrics.observe_cache_lookup("letting", hit=True)
+        assert not metrics_dir.exists()
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+    """Tests for the /metrics view."""
+
+    def test_disabled_by_default(self, client):
+        """
+        Test that the metrics are not exposed without METRICS_ENABLED.
+
+        Args:
+            client: The Django test client.
+        """
+        assert client.get(reverse("metrics")).status_code == 404
+
+    def test_requests_are_exposed(self, metrics_dir, client):
+        """
+        Test that the requests, queries and cache lookups are exposed.
+
+        Args:
+            metrics_dir: The metrics directory fixture.
+            client: The Django test client.
+        """
+        address = Address.objects.create(
+            number=1, street="Main Street", city="Springfield", state="IL",
+            zip_code=62701, country_iso_code="USA",
+        )
+        letting = Letting.objects.create(title="Measured Letting", address=address)
+        client.get(reverse("lettings:index"))
+        client.get(reverse("lettings:letting", args=[letting.id]))
+        client.get(reverse("lettings:letting", args=[letting.id]))
+        response = client.get(reverse("metrics"))
+        assert response.status_code == 200
+        assert response["Content-Type"] == metrics.CONTENT_TYPE
+        text = response.content.decode()
+        assert 'http_requests_total{view="lettings:index",status="200"} 1' in text
+        assert 'http_requests_total{view="lettings:letting",status="200"} 2' in text
+        assert (
+            'http_request_duration_seconds_count{view="lettings:index",status="200"} 1'
+            in text
+        )
+        assert 'http_request_db_queries_bucket{view="lettings:index",le="+Inf"} 1' in text
+        assert 'view_cache_hit_ratio{page="letting"} 0.5' in text
+        assert "Server-Timing" not in response
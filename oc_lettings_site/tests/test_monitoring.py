@@ -0,0 +1,248 @@
+"""
+Tests for the oc_lettings_site Sentry sampling.
+
+This module contains unit tests for the traces sampler, the filter of
+the transactions sent in tail mode and the initialization of the SDK.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+import sentry_sdk
+from sentry_sdk.integrations.django import DjangoIntegration
+
+from oc_lettings_site.monitoring import (
+    before_send_transaction, get_duration, init_sentry, traces_sampler,
+)
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def request_context(path, parent_sampled=None):
+    """
+    Build the sampling context of a request.
+
+    Args:
+        path: The path of the request.
+        parent_sampled: The decision of the caller's trace, if any.
+
+    Returns:
+        dict: The sampling context given to ``traces_sampler``.
+    """
+    return {
+        "transaction_context": {"op": "http.server", "name": path},
+        "parent_sampled": parent_sampled,
+        "wsgi_environ": {"PATH_INFO": path},
+    }
+
+
+def transaction(seconds, status_code=200, status="ok", parent_span_id=None):
+    """
+    Build the event of a request transaction.
+
+    Args:
+        seconds: The duration of the request.
+        status_code: The status code of the response.
+        status: The status of the trace.
+        parent_span_id: The span of the caller, for continued traces.
+
+    Returns:
+        dict: The transaction event.
+    """
+    return {
+        "type": "transaction",
+        "start_timestamp": START,
+        "timestamp": START + timedelta(seconds=seconds),
+        "contexts": {
+            "trace": {"op": "http.server", "status": status, "parent_span_id": parent_span_id},
+            "response": {"status_code": status_code},
+        },
+    }
+
+
+@pytest.fixture
+def sampling(settings):
+    """
+    Configure the tail mode with a zero sample rate.
+
+    Args:
+        settings: The pytest-django settings fixture.
+
+    Returns:
+        The settings fixture.
+    """
+    settings.SENTRY_TRACES_SAMPLE_RATE = 0.0
+    settings.SENTRY_SLOW_REQUEST_SECONDS = 1.0
+    return settings
+
+
+class TestTracesSampler:
+    """Tests for the traces_sampler function."""
+
+    @pytest.mark.parametrize("path", ["/static/css/styles.css", "/metrics", "/health"])
+    def test_ignored_paths(self, sampling, path):
+        """
+        Test that static files, metrics and health checks are never traced.
+
+        Args:
+            sampling: The sampling settings fixture.
+            path: The path of the request.
+        """
+        assert traces_sampler(request_context(path, parent_sampled=True)) == 0.0
+
+    def test_asgi_scope(self, sampling):
+        """
+        Test that the path is read from the ASGI scope.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        context = {
+            "transaction_context": {"op": "http.server"},
+            "asgi_scope": {"path": "/static/css/styles.css"},
+        }
+        assert traces_sampler(context) == 0.0
+
+    def test_parent_decision(self, sampling):
+        """
+        Test that a continued trace follows the decision of its caller.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        assert traces_sampler(request_context("/lettings/", parent_sampled=True)) == 1.0
+        assert traces_sampler(request_context("/lettings/", parent_sampled=False)) == 0.0
+
+    def test_tail_mode_traces_every_request(self, sampling):
+        """
+        Test that every request is traced in tail mode, to be filtered at the end.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        assert traces_sampler(request_context("/lettings/")) == 1.0
+
+    def test_head_mode_samples_at_start(self, sampling):
+        """
+        Test that the sample rate applies when the request starts in head mode.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        sampling.SENTRY_SLOW_REQUEST_SECONDS = 0
+        sampling.SENTRY_TRACES_SAMPLE_RATE = 0.25
+        assert traces_sampler(request_context("/lettings/")) == 0.25
+
+    def test_head_mode_is_the_default(self, settings):
+        """
+        Test that the default settings sample the requests when they start.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        assert settings.SENTRY_SLOW_REQUEST_SECONDS == 0
+        assert traces_sampler(request_context("/lettings/")) == settings.SENTRY_TRACES_SAMPLE_RATE
+
+    def test_other_transactions(self, sampling):
+        """
+        Test that transactions which are not requests use the sample rate.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        sampling.SENTRY_TRACES_SAMPLE_RATE = 0.5
+        assert traces_sampler({"transaction_context": {"op": "task"}}) == 0.5
+
+
+class TestBeforeSendTransaction:
+    """Tests for the before_send_transaction function."""
+
+    def test_fast_request_is_dropped(self, sampling):
+        """
+        Test that a fast successful request is dropped outside the sample.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        assert before_send_transaction(transaction(0.01), {}) is None
+
+    def test_fast_request_in_the_sample_is_kept(self, sampling):
+        """
+        Test that the sample rate keeps fast requests.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        sampling.SENTRY_TRACES_SAMPLE_RATE = 1.0
+        event = transaction(0.01)
+        assert before_send_transaction(event, {}) is event
+
+    @pytest.mark.parametrize("event", [
+        transaction(1.5),
+        transaction(0.01, status_code=500, status="internal_error"),
+        transaction(0.01, status="internal_error"),
+        transaction(0.01, parent_span_id="abc"),
+    ])
+    def test_slow_failed_and_continued_requests_are_kept(self, sampling, event):
+        """
+        Test that slow requests, server errors and continued traces are kept.
+
+        Args:
+            sampling: The sampling settings fixture.
+            event: The transaction event.
+        """
+        assert before_send_transaction(event, {}) is event
+
+    def test_head_mode_keeps_every_traced_request(self, sampling):
+        """
+        Test that nothing is filtered in head mode, the sampler decided.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        sampling.SENTRY_SLOW_REQUEST_SECONDS = 0
+        event = transaction(0.01)
+        assert before_send_transaction(event, {}) is event
+
+    def test_head_mode_samples_failed_requests_like_the_others(self, sampling):
+        """
+        Test that head mode traces a failing request at the base rate only.
+
+        The sampler decides before the error, and the filter keeps what was
+        traced: failed and slow requests outside the sample have no trace.
+
+        Args:
+            sampling: The sampling settings fixture.
+        """
+        sampling.SENTRY_SLOW_REQUEST_SECONDS = 0
+        sampling.SENTRY_TRACES_SAMPLE_RATE = 0.25
+        assert traces_sampler(request_context("/lettings/1/")) == 0.25
+        event = transaction(2.0, status_code=500, status="internal_error")
+        assert before_send_transaction(event, {}) is event
+
+    def test_duration_of_serialized_timestamps(self):
+        """Test that the duration is read from ISO timestamps too."""
+        event = {"start_timestamp": START.isoformat(), "timestamp": "2026-01-01T12:00:02"}
+        assert get_duration(event) == 2.0
+        assert get_duration({}) == 0.0
+
+
+class TestInitSentry:
+    """Tests for the init_sentry function."""
+
+    def test_only_django_integration_is_added(self, monkeypatch):
+        """
+        Test that the integrations the SDK would probe for are not enabled.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        calls = []
+        monkeypatch.setattr(sentry_sdk, "init", lambda **options: calls.append(options))
+        init_sentry("https://key@sentry.example/1", environment="test")
+        options = calls[0]
+        assert options["auto_enabling_integrations"] is False
+        assert [type(integration) for integration in options["integrations"]] == [
+            DjangoIntegration
+        ]
+        assert options["traces_sampler"] is traces_sampler
+        assert options["environment"] == "test"
@@ -0,0 +1,147 @@
+"""
+Tests for the oc_lettings_site keyset pagination helpers.
+
+This module contains unit tests for the KeysetPage class and its helpers.
+"""
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+
+from oc_lettings_site.pagination import KeysetPage, parse_cursor
+
+
+@pytest.fixture
+def users():
+    """
+    Create five users to paginate over.
+
+    Returns:
+        list: The created users, in ID order.
+    """
+    return [User.objects.create(username=f"user{i}") for i in range(5)]
+
+
+class TestParseCursor:
+    """Tests for the parse_cursor function."""
+
+    def test_valid_cursor(self):
+        """Test that a numeric cursor is converted to an integer."""
+        assert parse_cursor("42") == 42
+
+    @pytest.mark.parametrize("value", [None, "", "abc", "-1"])
+    def test_invalid_cursor(self, value):
+        """
+        Test that missing, malformed or negative cursors are ignored.
+
+        Args:
+            value: The raw cursor value.
+        """
+        assert parse_cursor(value) is None
+
+
+@pytest.mark.django_db
+class TestKeysetPage:
+    """Tests for the KeysetPage class."""
+
+    def test_single_page(self, users):
+        """
+        Test that a page holding every row has no other pages.
+
+        Args:
+            users: The users fixture.
+        """
+        page = KeysetPage(User.objects.all(), 10)
+        assert list(page) == users
+        assert len(page) == 5
+        assert not page.has_other_pages
+        assert page.previous_cursor is None
+        assert page.next_cursor is None
+
+    def test_last_page(self, users):
+        """
+        Test that the last page has a previous page but no next page.
+
+        Args:
+            users: The users fixture.
+        """
+        page = KeysetPage(User.objects.all(), 2, after=users[2].pk)
+        assert list(page) == users[3:]
+        assert page.has_previous
+        assert not page.has_next
+
+    def test_first_page_reached_backwards(self, users):
+        """
+        Test that paging backwards to the start has no previous page.
+
+        Args:
+            users: The users fixture.
+        """
+        page = KeysetPage(User.objects.all(), 2, before=users[2].pk)
+        assert list(page) == users[:2]
+        assert not page.has_previous
+        assert page.next_cursor == users[1].pk
+
+    def test_cursor_before_first_row(self, users):
+        """
+        Test that a cursor before the first row has no previous page.
+
+        Args:
+            users: The users fixture.
+        """
+        page = KeysetPage(User.objects.all(), 2, after=0)
+        assert list(page) == users[:2]
+        assert not page.has_previous
+        assert page.previous_cursor is None
+        assert page.has_next
+
+    def test_cursor_after_last_row(self, users):
+        """
+        Test that a cursor after the last row has no next page.
+
+        Args:
+            users: The users fixture.
+        """
+        page = KeysetPage(User.objects.all(), 2, before=users[-1].pk + 1000)
+        assert list(page) == users[-2:]
+        assert not page.has_next
+        assert page.next_cursor is None
+        assert page.has_previous
+
+    def test_after_takes_precedence_over_before(self, users):
+        """
+        Test that the after cursor wins when both cursors are given.
+
+        Args:
+            users: The users fixture.
+        """
+        page = KeysetPage(User.objects.all(), 2, after=users[0].pk, before=users[1].pk)
+        assert list(page) == users[1:3]
+
+    def test_empty_page(self, users):
+        """
+        Test that a cursor past the last row gives an empty page.
+
+        Args:
+            users: The users fixture.
+        """
+        page = KeysetPage(User.objects.all(), 2, after=users[-1].pk)
+        assert not page
+        assert page.previous_cursor is None
+
+    @pytest.mark.parametrize("cursor", ["after", "before"])
+    def test_async_load(self, users, cursor, django_assert_num_queries):
+        """
+        Test that ``aload`` fetches the same page as a synchronous read.
+
+        Args:
+            users: The users fixture.
+            cursor: The navigation direction.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        kwargs = {cursor: users[2].pk}
+        expected = list(KeysetPage(User.objects.all(), 1, **kwargs))
+        page = KeysetPage(User.objects.all(), 1, **kwargs)
+        async_to_sync(page.aload)()
+        with django_assert_num_queries(0):
+            assert list(page) == expected
+            assert page.has_previous and page.has_next
@@ -0,0 +1,258 @@
+"""
+Tests for the oc_lettings_site read-replica routing.
+
+This module contains unit tests for the replica selection and integration
+tests routing the public views to a replica stored in a second SQLite
+file, while admin requests and recent writers read the primary.
+"""
+import sys
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+from oc_lettings_site import replicas
+from oc_lettings_site.cache import get_view_cache, make_cache_key
+from oc_lettings_site.replicas import (
+    PIN_COOKIE,
+    ReplicaRouter,
+    ReplicaSelector,
+    RequestState,
+)
+
+
+def create_letting(title, using="default"):
+    """
+    Create a letting and its address in a database.
+
+    Args:
+        title: The title of the letting.
+        using: The database alias.
+
+    Returns:
+        Letting: The created letting.
+    """
+    address = Address.objects.using(using).create(
+        number=1,
+        street="Main Street",
+        city="Springfield",
+        state="IL",
+        zip_code=62701,
+        country_iso_code="USA",
+    )
+    return Letting.objects.using(using).create(title=title, address=address)
+
+
+class TestReplicaSelector:
+    """Tests for the replica selection policies."""
+
+    def test_round_robin(self, settings):
+        """
+        Test that replicas are used in turn.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        settings.DATABASE_REPLICAS = ["replica1", "replica2"]
+        selector = ReplicaSelector()
+        assert [selector.choose() for _ in range(3)] == ["replica1", "replica2", "replica1"]
+
+    def test_no_replica(self, settings):
+        """
+        Test that the primary is used without replicas.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        settings.DATABASE_REPLICAS = []
+        assert ReplicaSelector().choose() is None
+
+    def test_least_lag(self, settings, monkeypatch):
+        """
+        Test that the least lagging healthy replica is chosen, lags being cached.
+
+        Args:
+            settings: The pytest-django settings fixture.
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        settings.DATABASE_REPLICAS = ["replica1", "replica2", "replica3"]
+        settings.REPLICA_SELECTION = "least_lag"
+        settings.REPLICA_MAX_LAG = 10
+        settings.REPLICA_LAG_CHECK_INTERVAL = 60
+        lags = {"replica1": 4.0, "replica2": 2.0, "replica3": None}
+        measured = []
+
+        def measure_lag(alias):
+            measured.append(alias)
+            return lags[alias]
+
+        monkeypatch.setattr(replicas, "measure_lag", measure_lag)
+        selector = ReplicaSelector()
+        assert selector.choose() == "replica2"
+        lags["replica2"] = 30.0
+        assert selector.choose() == "replica2"
+        assert len(measured) == 3
+
+        settings.REPLICA_LAG_CHECK_INTERVAL = 0
+        assert selector.choose() == "replica1"
+        lags["replica1"] = 11.0
+        assert selector.choose() is None
+
+    @pytest.mark.django_db
+    def test_sqlite_has_no_lag(self):
+        """Test that a SQLite database reports no replication lag."""
+        assert replicas.measure_lag("default") == 0.0
+
+
+class TestReplicaRouter:
+    """Tests for the database router."""
+
+    def test_reads_follow_the_request_state(self):
+        """Test that reads use the replica of the request until it writes."""
+        router = ReplicaRouter()
+        assert router.db_for_read(Letting) is None
+        state = RequestState()
+        state.read_alias = "replica1"
+        token = replicas._request_state.set(state)
+        try:
+            assert router.db_for_read(Letting) == "replica1"
+            assert router.db_for_write(Letting) == "default"
+            assert state.wrote
+            assert router.db_for_read(Letting) is None
+        finally:
+            replicas._request_state.reset(token)
+
+    def test_replicas_are_not_migrated(self, settings):
+        """
+        Test that migrations only run on the primary.
+
+        Args:
+            settings: The pytest-django settings fixture.
+        """
+        settings.DATABASE_REPLICAS = ["replica1"]
+        router = ReplicaRouter()
+        assert router.allow_migrate("replica1", "lettings") is False
+        assert router.allow_migrate("default", "lettings") is None
+
+    def test_no_loop_variable_is_left(self):
+        """Test that building the replicas leaves no name in the settings module."""
+        module = sys.modules[django_settings.SETTINGS_MODULE]
+        assert not {"index", "replica_url"} & set(vars(module))
+
+
+class TestReplicaRouting:
+    """Integration tests with a second SQLite file as the replica."""
+
+    def test_public_views_read_the_replica(self, client, replica):
+        """
+        Test that the public pages and the API read the replica.
+
+        Args:
+            client: The Django test client.
+            replica: The replica fixture.
+        """
+        create_letting("Primary Letting")
+        replica_letting = create_letting("Replica Letting", using=replica)
+        response = client.get(reverse("lettings:index"))
+        assert b"Replica Letting" in response.content
+        assert b"Primary Letting" not in response.content
+        response = client.get(reverse("api:lettings"))
+        assert b"Replica Letting" in b"".join(response.streaming_content)
+        response = client.get(reverse("lettings:letting", args=[replica_letting.id]))
+        assert response.status_code == 200
+
+    def test_search_reads_the_replica(self, client, replica):
+        """
+        Test that the full-text search reads the replica.
+
+        Args:
+            client: The Django test client.
+            replica: The replica fixture.
+        """
+        create_letting("Replica Cottage", using=replica)
+        response = client.get(reverse("lettings:index"), {"q": "cottage"})
+        assert [letting.title for letting in response.context["page"]] == [
+            "Replica Cottage"
+        ]
+
+    def test_pinned_clients_read_the_primary(self, client, replica):
+        """
+        Test that a client pinned by a recent write reads the primary.
+
+        Args:
+            client: The Django test client.
+            replica: The replica fixture.
+        """
+        create_letting("Primary Letting")
+        client.cookies[PIN_COOKIE] = "1"
+        response = client.get(reverse("lettings:index"))
+        assert b"Primary Letting" in response.content
+
+    def test_writes_pin_the_client(self, client, replica, settings):
+        """
+        Test that a request writing to the database sets the pin cookie.
+
+        Args:
+            client: The Django test client.
+            replica: The replica fixture.
+            settings: The pytest-django settings fixture.
+        """
+        settings.REPLICA_PIN_SECONDS = 7
+        User.objects.create_superuser("admin", "admin@example.com", "secret")
+        response = client.post(
+            reverse("admin:login"), {"username": "admin", "password": "secret"}
+        )
+        assert response.status_code == 302
+        assert response.cookies[PIN_COOKIE]["max-age"] == 7
+        response = client.get(reverse("lettings:index"))
+        assert PIN_COOKIE not in response.cookies
+
+    def test_middleware_is_removed_without_replicas(self, client, db):
+        """
+        Test that a write does not set the pin cookie without replicas.
+
+        Args:
+            client: The Django test client.
+            db: The pytest-django database fixture.
+        """
+        User.objects.create_superuser("admin", "admin@example.com", "secret")
+        response = client.post(
+            reverse("admin:login"), {"username": "admin", "password": "secret"}
+        )
+        assert PIN_COOKIE not in response.cookies
+
+    def test_replica_reads_do_not_fill_the_page_cache(self, client, replica):
+        """
+        Test that a detail page read from a replica after an eviction is not cached.
+
+        Args:
+            client: The Django test client.
+            replica: The replica fixture.
+        """
+        letting = create_letting("Primary Letting")
+        create_letting("Stale Letting", using=replica)
+        url = reverse("lettings:letting", args=[letting.id])
+        client.get(url)
+        letting.title = "Renamed Letting"
+        letting.save()
+        response = client.get(url)
+        assert b"Stale Letting" in response.content
+        assert response["X-Cache"] == "MISS"
+        assert get_view_cache().get(make_cache_key("letting", letting.id)) is None
+
+    def test_pinned_reads_fill_the_page_cache(self, client, replica):
+        """
+        Test that a detail page read from the primary is cached.
+
+        Args:
+            client: The Django test client.
+            replica: The replica fixture.
+        """
+        letting = create_letting("Primary Letting")
+        client.cookies[PIN_COOKIE] = "1"
+        client.get(reverse("lettings:letting", args=[letting.id]))
+        response = client.get(reverse("lettings:letting", args=[letting.id]))
+        assert response["X-Cache"] == "HIT"
+        assert b"Primary Letting" in response.content
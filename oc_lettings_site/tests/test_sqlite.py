@@ -0,0 +1,100 @@
+"""
+Tests for the oc_lettings_site SQLite performance profile.
+
+This module contains tests for the pragmas applied to new SQLite
+connections by the connection_created signal handler.
+"""
+import pytest
+from django.db import connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+
+@pytest.fixture
+def file_connection(tmp_path, django_db_blocker):
+    """
+    Create a database wrapper on a SQLite file, outside the test databases.
+
+    Args:
+        tmp_path: The pytest temporary directory.
+        django_db_blocker: The pytest-django database access blocker.
+
+    Yields:
+        DatabaseWrapper: The unconnected wrapper.
+    """
+    configured = connections.configure_settings({
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(tmp_path / "tuned.sqlite3"),
+        },
+    })
+    wrapper = DatabaseWrapper(configured["default"], alias="tuned")
+    with django_db_blocker.unblock():
+        yield wrapper
+        wrapper.close()
+
+
+def pragma(wrapper, name):
+    """
+    Read a pragma value.
+
+    Args:
+        wrapper: The database wrapper.
+        name: The pragma name.
+
+    Returns:
+        The value of the pragma.
+    """
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_file_database_is_tuned(file_connection):
+    """
+    Test that a new connection to a SQLite file gets the profile pragmas.
+
+    The journal of the file is left unchanged without ``SQLITE_WAL``.
+
+    Args:
+        file_connection: The file_connection fixture.
+    """
+    assert pragma(file_connection, "journal_mode") == "delete"
+    assert pragma(file_connection, "synchronous") == 2  # FULL
+    assert pragma(file_connection, "busy_timeout") == 5000
+    assert pragma(file_connection, "cache_size") == -65536
+    assert pragma(file_connection, "mmap_size") == 256 * 1024 * 1024
+
+
+def test_wal_profile(file_connection, settings):
+    """
+    Test that the WAL pragmas of SQLITE_WAL are applied with the others.
+
+    Args:
+        file_connection: The file_connection fixture.
+        settings: The pytest-django settings fixture.
+    """
+    settings.SQLITE_PRAGMAS = {
+        "journal_mode": "WAL", "synchronous": "NORMAL", **settings.SQLITE_PRAGMAS
+    }
+    assert pragma(file_connection, "journal_mode") == "wal"
+    assert pragma(file_connection, "synchronous") == 1  # NORMAL
+
+
+def test_disabled_profile(file_connection, settings):
+    """
+    Test that SQLite keeps its defaults when the profile is disabled.
+
+    Args:
+        file_connection: The file_connection fixture.
+        settings: The pytest-django settings fixture.
+    """
+    settings.SQLITE_PRAGMAS = {}
+    assert pragma(file_connection, "journal_mode") == "delete"
+    assert pragma(file_connection, "synchronous") == 2  # FULL
+
+
+@pytest.mark.django_db
+def test_in_memory_database_keeps_its_journal():
+    """Test that the in-memory test database is tuned, except its journal."""
+    assert pragma(connection, "journal_mode") == "memory"
+    assert pragma(connection, "busy_timeout") == 5000
@@ -0,0 +1,104 @@
+"""
+Tests for the oc_lettings_site static files storage.
+
+This module contains tests collecting the project static files with the
+manifest storage, and checking the hashed URLs of the pages and their
+``Cache-Control`` headers.
+"""
+import logging
+import re
+
+from django.core.management import call_command
+from django.templatetags.static import static
+
+from oc_lettings_site.storage import read_manifest_version
+
+HASHED_CSS = re.compile(r"^/static/css/styles\.[0-9a-f]{12}\.css$")
+HASHED_FONT = re.compile(
+    r'url\("\.\./assets/fonts/metropolis/Metropolis-Bold\.[0-9a-f]{12}\.otf"\)'
+)
+
+
+class TestManifestStaticFilesStorage:
+    """Tests for the ManifestStaticFilesStorage class."""
+
+    def test_files_are_hashed(self, collected):
+        """
+        Test that the templates link the hashed files.
+
+        Args:
+            collected: The collected static files fixture.
+        """
+        url = static("css/styles.css")
+        assert HASHED_CSS.match(url)
+        assert (collected / url.removeprefix("/static/")).exists()
+
+    def test_css_references(self, collected):
+        """
+        Test that the fonts are linked by their hashed names, the missing images unchanged.
+
+        Args:
+            collected: The collected static files fixture.
+        """
+        css = (collected / static("css/styles.css").removeprefix("/static/")).read_text()
+        assert HASHED_FONT.search(css)
+        assert 'url("../assets/img/backgrounds/bg-waves.svg")' in css
+
+    def test_missing_references_are_logged(self, manifest_storage, caplog):
+        """
+        Test that each missing file is logged once.
+
+        Args:
+            manifest_storage: The manifest storage fixture.
+            caplog: The pytest log capture fixture.
+        """
+        with caplog.at_level(logging.WARNING, logger="oc_lettings_site.storage"):
+            call_command("collectstatic", "--noinput", verbosity=0)
+        missing = [
+            record.args[0] for record in caplog.records
+            if record.name == "oc_lettings_site.storage"
+        ]
+        assert "assets/img/backgrounds/bg-waves.svg" in missing
+        assert len(missing) == len(set(missing))
+
+    def test_without_manifest(self, manifest_storage):
+        """
+        Test that the files are linked unhashed when collectstatic was not run.
+
+        Args:
+            manifest_storage: The manifest storage fixture.
+        """
+        assert static("css/styles.css") == "/static/css/styles.css"
+
+
+class TestReadManifestVersion:
+    """Tests for the read_manifest_version function."""
+
+    def test_version(self, collected, tmp_path_factory):
+        """
+        Test that the version is a short hash of the manifest.
+
+        Args:
+            collected: The collected static files fixture.
+            tmp_path_factory: The pytest temporary directory factory.
+        """
+        assert re.match(r"^[0-9a-f]{12}$", read_manifest_version(collected))
+        assert read_manifest_version(tmp_path_factory.mktemp("empty")) == ""
+
+
+class TestStaticFilesCaching:
+    """Tests for the Cache-Control headers of the collected files."""
+
+    def test_hashed_files_are_immutable(self, collected, client):
+        """
+        Test that the hashed files are cached forever, the others revalidated.
+
+        Args:
+            collected: The collected static files fixture.
+            client: The Django test client.
+        """
+        response = client.get(static("css/styles.css"))
+        assert response.status_code == 200
+        assert "immutable" in response["Cache-Control"]
+        response = client.get("/static/css/styles.css")
+        assert response["Cache-Control"] == "max-age=60, public"
@@ -0,0 +1,48 @@
+"""
+Tests for the oc_lettings_site template discovery.
+
+This module contains unit tests for the template directories of the
+project and the listing of their HTML templates.
+"""
+from django.conf import settings
+
+from oc_lettings_site.template_files import find_templates, get_template_dirs
+
+
+class TestGetTemplateDirs:
+    """Tests for the get_template_dirs function."""
+
+    def test_project_directories(self):
+        """Test that the project directories are listed, not Django's."""
+        directories = get_template_dirs()
+        assert str(settings.BASE_DIR / "templates") in directories
+        assert str(settings.BASE_DIR / "lettings" / "templates") in directories
+        assert all(directory.startswith(str(settings.BASE_DIR)) for directory in directories)
+
+
+class TestFindTemplates:
+    """Tests for the find_templates function."""
+
+    def test_html_templates_with_their_names(self, tmp_path):
+        """
+        Test that the HTML files are listed with their loader names.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        (tmp_path / "lettings").mkdir()
+        for name in ("base.html", "lettings/index.html", "notes.txt"):
+            (tmp_path / name).write_text("", encoding="utf-8")
+        assert find_templates([str(tmp_path)]) == [
+            (str(tmp_path / "base.html"), "base.html"),
+            (str(tmp_path / "lettings" / "index.html"), "lettings/index.html"),
+        ]
+
+    def test_missing_directory(self, tmp_path):
+        """
+        Test that a missing directory has no templates.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+        """
+        assert find_templates([str(tmp_path / "missing")]) == []
@@ -0,0 +1,166 @@
+"""
+Tests for the oc_lettings_site request timing middleware.
+
+This module contains integration tests checking the logs and the
+``Server-Timing`` header of the pages, and unit tests for the execute
+wrapper and the async path of the middleware.
+"""
+import re
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+from oc_lettings_site import timing
+from oc_lettings_site.timing import RequestTimingMiddleware, record_query
+
+SERVER_TIMING = re.compile(r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries"$')
+
+
+@pytest.fixture
+def request_timing(settings):
+    """
+    Enable the request timing middleware.
+
+    Args:
+        settings: The pytest-django settings fixture.
+    """
+    settings.REQUEST_TIMING = True
+
+
+@pytest.fixture(autouse=True)
+def remove_query_recorder():
+    """Remove the execute wrapper installed on the connection by a test."""
+    yield
+    while record_query in connection.execute_wrappers:
+        connection.execute_wrappers.remove(record_query)
+
+
+@pytest.mark.django_db
+class TestRequestTimingMiddleware:
+    """Tests for the measurements of the pages."""
+
+    def test_disabled_by_default(self, client):
+        """
+        Test that the middleware is removed without REQUEST_TIMING.
+
+        Args:
+            client: The Django test client.
+        """
+        with pytest.raises(MiddlewareNotUsed):
+            RequestTimingMiddleware(lambda request: HttpResponse())
+        assert "Server-Timing" not in client.get(reverse("index"))
+
+    def test_server_timing_header(self, request_timing, client):
+        """
+        Test that the header reports the queries of the page.
+
+        Args:
+            request_timing: The fixture enabling the middleware.
+            client: The Django test client.
+        """
+        address = Address.objects.create(
+            number=1, street="Main Street", city="Springfield", state="IL",
+            zip_code=62701, country_iso_code="USA",
+        )
+        Letting.objects.create(title="Timed Letting", address=address)
+        response = client.get(reverse("lettings:index"))
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        assert match is not None
+        assert int(match.group(1)) >= 1
+
+    def test_measurements_are_logged(self, request_timing, client, caplog):
+        """
+        Test that the view and the measurements are fields of the log record.
+
+        Args:
+            request_timing: The fixture enabling the middleware.
+            client: The Django test client.
+            caplog: The pytest log capture fixture.
+        """
+        with caplog.at_level("INFO", logger="oc_lettings_site.timing"):
+            client.get(reverse("profiles:index"))
+        record = [r for r in caplog.records if r.name == "oc_lettings_site.timing"][-1]
+        assert record.view == "profiles:index"
+        assert record.status_code == 200
+        assert record.db_queries >= 1
+        assert record.duration_ms >= record.db_time_ms
+        assert "view=profiles:index" in record.getMessage()
+
+    def test_unknown_url_is_logged(self, request_timing, client, caplog):
+        """
+        Test that a request matching no URL is logged without a view name.
+
+        Args:
+            request_timing: The fixture enabling the middleware.
+            client: The Django test client.
+            caplog: The pytest log capture fixture.
+        """
+        with caplog.at_level("INFO", logger="oc_lettings_site.timing"):
+            client.get("/unknown/")
+        record = [r for r in caplog.records if r.name == "oc_lettings_site.timing"][-1]
+        assert (record.view, record.status_code) == ("-", 404)
+
+
+@pytest.mark.django_db
+class TestRecordQuery:
+    """Tests for the execute wrapper counting the queries."""
+
+    def test_queries_outside_a_request_are_not_counted(self):
+        """Test that the wrapper runs the queries of untimed code unchanged."""
+        with connection.execute_wrapper(record_query):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                assert cursor.fetchone() == (1,)
+
+    def test_queries_are_counted(self):
+        """Test that the queries of a timed request are counted."""
+        timing.install_query_recorder()
+        with timing.timed() as timer:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.execute("SELECT 2")
+        assert timer.queries == 2
+        assert timer.db_time > 0
+
+    def test_nested_timers(self):
+        """Test that the queries of a nested timer are counted by the outer one."""
+        timing.install_query_recorder()
+        with timing.timed() as outer:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                with timing.timed() as inner:
+                    cursor.execute("SELECT 2")
+        assert (outer.queries, inner.queries) == (2, 1)
+        assert outer.db_time >= inner.db_time
+
+    def test_recorder_is_installed_once(self):
+        """Test that the wrapper is not stacked by successive requests."""
+        timing.install_query_recorder()
+        timing.install_query_recorder()
+        assert connection.execute_wrappers.count(record_query) == 1
+
+
+class TestAsyncRequestTimingMiddleware:
+    """Tests for the async path of the middleware."""
+
+    def test_async_path(self, request_timing):
+        """
+        Test that the middleware measures async views in the event loop.
+
+        Args:
+            request_timing: The fixture enabling the middleware.
+        """
+        async def get_response(request):
+            return HttpResponse("view")
+
+        middleware = RequestTimingMiddleware(get_response)
+        assert iscoroutinefunction(middleware)
+        response = async_to_sync(middleware)(RequestFactory().get("/"))
+        assert response.content == b"view"
+        assert SERVER_TIMING.match(response["Server-Timing"]).group(1) == "0"
@@ -30,3 +30,15 @@ class TestIndexView:
         """
         response = client.get(reverse("index"))
         assert "index.html" in [t.name for t in response.templates]
+
+    def test_index_is_cached(self, client):
+        """
+        Test that the static home page is rendered once.
+
+        Args:
+            client: The Django test client.
+        """
+        assert client.get(reverse("index"))["X-Cache"] == "MISS"
+        response = client.get(reverse("index"))
+        assert response["X-Cache"] == "HIT"
+        assert b"Holiday Homes" in response.content
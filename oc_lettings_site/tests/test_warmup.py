@@ -0,0 +1,65 @@
+"""
+Tests for the oc_lettings_site start of a process.
+
+This module contains tests for the warm-up of a preloaded application and
+for the modules imported by a worker at startup.
+"""
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.template import engines
+
+from oc_lettings_site import warmup
+from oc_lettings_site.warmup import get_template_names, warm_up
+
+
+class TestGetTemplateNames:
+    """Tests for the get_template_names function."""
+
+    def test_project_templates(self):
+        """Test that the project templates are listed, not Django's."""
+        names = get_template_names()
+        assert "base.html" in names
+        assert "includes/keyset_pagination.html" in names
+        assert "lettings/index.html" in names
+        assert not any(name.startswith("admin/") for name in names)
+
+
+class TestWarmUp:
+    """Tests for the warm_up function."""
+
+    def test_templates_are_compiled(self, monkeypatch):
+        """
+        Test that the templates are in the cached loader and the connections closed.
+
+        Args:
+            monkeypatch: The pytest monkeypatch fixture.
+        """
+        closed = []
+        monkeypatch.setattr(warmup.connections, "close_all", lambda: closed.append(True))
+        loader = engines["django"].engine.template_loaders[0]
+        loader.reset()
+        assert warm_up() > 0
+        assert "lettings/index.html" in loader.get_template_cache
+        assert closed == [True]
+
+
+class TestStartup:
+    """Tests for the modules imported by a worker."""
+
+    def test_optional_packages_are_not_imported(self):
+        """Test that Sentry, python-dotenv and Pillow are imported on first use only."""
+        environ = {**os.environ, "SENTRY_DSN": "", "SECRET_KEY": "test"}
+        environ.setdefault("DJANGO_SETTINGS_MODULE", "oc_lettings_site.settings")
+        process = subprocess.run(
+            [sys.executable, "-c", "import sys, oc_lettings_site.wsgi; print(*sys.modules)"],
+            cwd=settings.BASE_DIR, env=environ, capture_output=True, text=True,
+        )
+        assert process.returncode == 0, process.stderr
+        modules = set(process.stdout.split())
+        assert "django.contrib.admin" in modules
+        assert not modules & {"sentry_sdk", "PIL"}
+        if not (settings.BASE_DIR / ".env").exists():
+            assert "dotenv" not in modules
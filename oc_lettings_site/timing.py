@@ -0,0 +1,228 @@
+"""
+Request timing instrumentation for the OC Lettings project.
+
+When ``REQUEST_TIMING`` or ``METRICS_ENABLED`` is enabled,
+``RequestTimingMiddleware`` measures for each request:
+
+- the wall time spent in the middleware below it and the view;
+- the number of database queries and the time spent running them,
+  counted by ``record_query``, an execute wrapper installed on the
+  database connections of the thread serving the request.
+
+The measurements are logged on the ``oc_lettings_site.timing`` logger,
+with the view name and the numbers as fields of the log record (``extra``),
+and returned to the client in a ``Server-Timing`` header, shown by the
+network panel of the browsers, if ``REQUEST_TIMING`` is enabled. If
+``METRICS_ENABLED`` is, they are recorded in the Prometheus metrics of
+``oc_lettings_site.metrics``.
+
+When both settings are disabled, the middleware is removed at startup and
+no execute wrapper is installed: requests pay nothing.
+"""
+
+import contextlib
+import contextvars
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimer:
+    """
+    The measurements of a request.
+
+    Attributes:
+        started: The ``time.perf_counter()`` value at the start of the request.
+        queries: The number of database queries run so far.
+        db_time: The time spent running them, in seconds.
+        parent: The timer active when this one started (e.g. the one of
+            ``benchmark_servers`` around the middleware), which counts the
+            queries too.
+    """
+
+    def __init__(self, parent=None):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.parent = parent
+
+
+_request_timer = contextvars.ContextVar("request_timer", default=None)
+
+
+@contextlib.contextmanager
+def timed():
+    """
+    Count the database queries run in a block.
+
+    The queries are counted on the connections where ``record_query`` is
+    installed, i.e. those of the requests started since
+    ``install_query_recorder`` was connected to ``request_started``.
+
+    Yields:
+        RequestTimer: The measurements of the block.
+    """
+    timer = RequestTimer(_request_timer.get())
+    token = _request_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _request_timer.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Count a database query and its duration in the timer of the request.
+
+    This is a database execute wrapper: queries run outside a timed
+    request are executed unchanged.
+
+    Args:
+        execute: The next callable of the execute wrappers.
+        sql: The SQL of the query.
+        params: The parameters of the query.
+        many: True for ``executemany``.
+        context: The connection and cursor running the query.
+
+    Returns:
+        The result of ``execute``.
+    """
+    timer = _request_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        while timer is not None:
+            timer.queries += 1
+            timer.db_time += duration
+            timer = timer.parent
+
+
+def install_query_recorder(**kwargs):
+    """
+    Install ``record_query`` on the database connections of this thread.
+
+    Connected to ``request_started``, which WSGI servers send in the thread
+    of the request and the ASGI handler in the thread running the
+    synchronous code (the ORM queries) of the request.
+    """
+    for connection in connections.all():
+        if record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(record_query)
+
+
+def get_view_name(request):
+    """
+    Return the name of the view which served a request.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        str: The URL name with its namespace (``lettings:index``), or "-"
+        if no URL matched.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "-"
+    return match.view_name
+
+
+def server_timing(duration, timer):
+    """
+    Format the ``Server-Timing`` header of a request.
+
+    Args:
+        duration: The wall time of the request, in seconds.
+        timer: The measurements of the request.
+
+    Returns:
+        str: The header value, with the durations in milliseconds.
+    """
+    return (
+        f"app;dur={duration * 1000:.2f}, "
+        f'db;dur={timer.db_time * 1000:.2f};desc="{timer.queries} queries"'
+    )
+
+
+class RequestTimingMiddleware:
+    """
+    Log the wall time and database usage of each request.
+
+    The measurements are logged if ``REQUEST_TIMING`` is enabled, and
+    recorded in the metrics if ``METRICS_ENABLED`` is. The middleware
+    supports both WSGI and ASGI, so async views are not moved to a thread
+    under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.log = settings.REQUEST_TIMING
+        self.metrics = settings.METRICS_ENABLED
+        if not (self.log or self.metrics):
+            raise MiddlewareNotUsed
+        request_started.connect(install_query_recorder, dispatch_uid="request_timing")
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with timed() as timer:
+            response = self.get_response(request)
+        return self.process_response(request, timer, response)
+
+    async def __acall__(self, request):
+        with timed() as timer:
+            response = await self.get_response(request)
+        return self.process_response(request, timer, response)
+
+    def process_response(self, request, timer, response):
+        """
+        Log or record the measurements of a request.
+
+        Args:
+            request: The HTTP request object.
+            timer: The measurements of the request.
+            response: The response of the request.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        duration = time.perf_counter() - timer.started
+        view = get_view_name(request)
+        if self.metrics:
+            metrics.observe_request(
+                view, response.status_code, duration, timer.queries, timer.db_time
+            )
+        if not self.log:
+            return response
+        response["Server-Timing"] = server_timing(duration, timer)
+        logger.info(
+            "%s %s %s view=%s duration_ms=%.2f db_queries=%d db_ms=%.2f",
+            request.method, request.path, response.status_code, view,
+            duration * 1000, timer.queries, timer.db_time * 1000,
+            extra={
+                "view": view,
+                "status_code": response.status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "db_queries": timer.queries,
+                "db_time_ms": round(timer.db_time * 1000, 3),
+            },
+        )
+        return response
@@ -2,13 +2,18 @@
 URL configuration for the OC Lettings project.
 
 This module defines the URL patterns for the main application,
-including routes to the home page, lettings, profiles, and admin interface.
+including routes to the home page, lettings, profiles, the JSON API,
+the Prometheus metrics and admin interface.
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
-from . import views
+from . import async_views, views
+
+# The async views serve the same pages under ASGI
+pages = async_views if settings.ASYNC_VIEWS else views
 
 
 def test_500(request):
@@ -25,9 +30,12 @@ def test_500(request):
 
 
 urlpatterns = [
-    path("", views.index, name="index"),
+    path("", pages.index, name="index"),
     path("lettings/", include("lettings.urls")),
     path("profiles/", include("profiles.urls")),
+    path("api/", include("api.urls")),
     path("admin/", admin.site.urls),
+    # Default path of the Prometheus scrapers, without a trailing slash
+    path("metrics", views.metrics, name="metrics"),
     path("test-500/", test_500),
 ]
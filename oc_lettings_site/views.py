@@ -6,15 +6,24 @@ This module contains the view functions for the main site pages.
 
 import logging
 
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 
+from .cache import cache_response
+from .metrics import CONTENT_TYPE, render_metrics
+
 logger = logging.getLogger(__name__)
 
 
+@cache_response("home")
 def index(request):
     """
     Display the home page.
 
+    The page is static: it is rendered once and served from the cache
+    until ``PAGE_VERSION`` changes.
+
     Args:
         request: The HTTP request object.
 
@@ -23,3 +32,21 @@ def index(request):
     """
     logger.info("Home page accessed")
     return render(request, "index.html")
+
+
+def metrics(request):
+    """
+    Expose the metrics of every worker in the Prometheus text format.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        HttpResponse: The metrics.
+
+    Raises:
+        Http404: If ``METRICS_ENABLED`` is disabled.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404("Metrics are disabled")
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,56 @@
+"""
+Warm-up of a preloaded OC Lettings process.
+
+Django loads the URLconf, and with it the views, forms and admin of each
+application, on the first request of a process, and compiles each
+template on its first rendering. With gunicorn's ``--preload`` (see
+gunicorn.conf.py), ``warm_up`` does this once in the master before it
+forks the workers: they start with the loaded modules and compiled
+templates in memory shared copy-on-write, and none of them pays for it
+on its first request.
+"""
+
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver
+
+from oc_lettings_site.template_files import find_templates, get_template_dirs
+from oc_lettings_site.templatetags.pictures import get_images
+from oc_lettings_site.templatetags.stylesheets import cached_critical_css
+
+
+def get_template_names():
+    """
+    Return the names of the project templates, without Django's own.
+
+    Returns:
+        list: The names of the HTML templates of ``TEMPLATES`` and of the
+        project applications, relative to their directory.
+    """
+    return sorted({name for _, name in find_templates(get_template_dirs())})
+
+
+def warm_up():
+    """
+    Load what the first request of a process would otherwise load.
+
+    The connections opened meanwhile are closed, so that no worker
+    inherits them.
+
+    Returns:
+        float: The duration of the warm-up, in seconds.
+    """
+    start = time.perf_counter()
+    # Imports the URLconf, and the views, and builds the reverse lookups
+    get_resolver().reverse_dict
+    engine = engines["django"]
+    for name in get_template_names():
+        engine.get_template(name)
+    if not settings.DEBUG:
+        cached_critical_css()
+        get_images()
+    connections.close_all()
+    return time.perf_counter() - start
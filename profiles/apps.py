@@ -9,3 +9,7 @@ class ProfilesConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self):
+        """Connect the signal handlers of the application."""
+        from . import signals  # noqa: F401
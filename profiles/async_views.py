@@ -0,0 +1,133 @@
+"""
+Async views for the profiles application.
+
+These views serve the same pages as ``profiles.views`` with the async ORM,
+so that an ASGI server runs them in its event loop instead of a thread.
+They are routed instead of the synchronous views when the
+``ASYNC_VIEWS`` setting is enabled.
+"""
+import logging
+
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import render
+
+from oc_lettings_site.cache import aget_fragment_version, cache_response, fragment_context
+from oc_lettings_site.conditional import conditional_page, rows_state
+from oc_lettings_site.pagination import aget_keyset_page
+from oc_lettings_site.replicas import replica_reads
+
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+
+async def get_index_page(request):
+    """
+    Return the profiles index page requested by the cursors of the query string.
+
+    The page is fetched once per request and shared by the view and its
+    conditional GET state.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        KeysetPage: The requested page.
+    """
+    if not hasattr(request, "profiles_page"):
+        request.profiles_page = await aget_keyset_page(
+            request,
+            Profile.objects.select_related("user").only(
+                "id", "updated_at", "user__username"
+            ),
+            settings.PROFILES_PAGE_SIZE,
+        )
+    return request.profiles_page
+
+
+async def index_state(request):
+    """
+    Compute the state of a profiles index page for conditional GET.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        tuple: The fingerprint and the last modification date of the page.
+    """
+    page = await get_index_page(request)
+    fingerprint, last_modified = rows_state((row.pk, row.updated_at) for row in page)
+    return f"{fingerprint}|{page.has_previous}|{page.has_next}", last_modified
+
+
+async def profile_state(request, username):
+    """
+    Compute the state of a profile detail page for conditional GET.
+
+    Args:
+        request: The HTTP request object.
+        username: The username of the profile.
+
+    Returns:
+        tuple: The fingerprint and the last modification date of the page,
+        or None if the profile does not exist.
+    """
+    row = await (
+        Profile.objects.filter(user__username=username)
+        .values_list("id", "updated_at")
+        .afirst()
+    )
+    if row is None:
+        return None
+    return rows_state([row])
+
+
+@replica_reads
+@conditional_page(index_state)
+async def index(request):
+    """
+    Display a page of profiles, like ``profiles.views.index``.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        HttpResponse: The rendered profiles list template.
+    """
+    logger.info("Profiles index page accessed")
+    page = await get_index_page(request)
+    context = {
+        'profiles_list': page,
+        'page': page,
+        **fragment_context(await aget_fragment_version("profiles"), page),
+    }
+    return render(request, 'profiles/index.html', context)
+
+
+@replica_reads
+@conditional_page(profile_state)
+@cache_response("profile", "username")
+async def profile(request, username):
+    """
+    Display details of a specific profile, like ``profiles.views.profile``.
+
+    Args:
+        request: The HTTP request object.
+        username: The username of the profile to display.
+
+    Returns:
+        HttpResponse: The rendered profile detail template.
+
+    Raises:
+        Http404: If no profile with the given username exists.
+    """
+    logger.info("Profile detail page accessed for username: %s", username)
+    try:
+        profile = await Profile.objects.select_related("user").aget(user__username=username)
+        logger.debug("Found profile for user: %s", username)
+    except Profile.DoesNotExist:
+        logger.error("Profile for username '%s' not found", username)
+        raise Http404(f"Profile for username '{username}' does not exist")
+    context = {'profile': profile}
+    return render(request, 'profiles/profile.html', context)
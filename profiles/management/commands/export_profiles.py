@@ -0,0 +1,30 @@
+"""
+Management command to export profiles with the fields of their user.
+
+Passwords and permissions are never exported.
+"""
+from oc_lettings_site.exporting import ExportCommand
+from profiles.models import Profile
+
+
+class Command(ExportCommand):
+    """Stream every profile and its user as CSV or JSON Lines."""
+
+    help = "Export profiles and their user as CSV or JSONL (optionally gzipped)."
+
+    columns = (
+        ("id", "id"),
+        ("username", "user__username"),
+        ("first_name", "user__first_name"),
+        ("last_name", "user__last_name"),
+        ("email", "user__email"),
+        ("is_active", "user__is_active"),
+        ("date_joined", "user__date_joined"),
+        ("last_login", "user__last_login"),
+        ("favorite_city", "favorite_city"),
+        ("updated_at", "updated_at"),
+    )
+
+    def get_queryset(self):
+        """Return every profile."""
+        return Profile.objects.all()
@@ -0,0 +1,23 @@
+"""
+Add the updated_at timestamp to the Profile model.
+
+Existing rows are backfilled with the date of the migration.
+"""
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_alter_profile_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -16,10 +16,13 @@ class Profile(models.Model):
     Attributes:
         user: One-to-one relationship with Django's User model.
         favorite_city: The user's favorite city (optional).
+        updated_at: Date of the last modification of the profile or of
+            its user.
     """
 
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     favorite_city = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         """Return the username as string representation."""
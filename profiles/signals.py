@@ -0,0 +1,122 @@
+"""
+Signal handlers for the profiles application.
+
+This module evicts the cached profile detail pages when a Profile or its
+User is saved or deleted. It also evicts the cached rows of the profiles
+index when a profile is saved or deleted, or when a username changes.
+Renaming a user evicts the page of the old username as well. As the User
+model has no modification date, saving a user also touches the
+``updated_at`` date of its profile.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from oc_lettings_site.cache import bump_fragment_version, evict_responses
+
+from .models import Profile
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def evict_profile_page(sender, instance, **kwargs):
+    """
+    Evict the cached detail page of a saved or deleted profile.
+
+    Args:
+        sender: The Profile model class.
+        instance: The saved or deleted profile.
+        **kwargs: Additional signal arguments.
+    """
+    evict_responses("profile", instance.user.username)
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_username(sender, instance, update_fields=None, **kwargs):
+    """
+    Store the username of a user before it is saved.
+
+    Saves restricted to fields other than the username, such as the
+    ``last_login`` update done at login, skip the lookup.
+
+    Args:
+        sender: The User model class.
+        instance: The user about to be saved.
+        update_fields: The fields being saved, or None for all of them.
+        **kwargs: Additional signal arguments.
+    """
+    instance._previous_username = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and "username" not in update_fields:
+        return
+    instance._previous_username = (
+        User.objects.filter(pk=instance.pk)
+        .values_list("username", flat=True)
+        .first()
+    )
+
+
+@receiver([post_save, post_delete], sender=User)
+def evict_user_profile_page(sender, instance, **kwargs):
+    """
+    Evict the cached profile page of a saved or deleted user.
+
+    Args:
+        sender: The User model class.
+        instance: The saved or deleted user.
+        **kwargs: Additional signal arguments.
+    """
+    usernames = {instance.username}
+    previous_username = getattr(instance, "_previous_username", None)
+    if previous_username:
+        usernames.add(previous_username)
+    evict_responses("profile", *usernames)
+
+
+@receiver(post_save, sender=User)
+def touch_user_profile(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Update the modification date of the profile of a saved user.
+
+    Saves restricted to ``last_login`` do not change the profile page and
+    are ignored.
+
+    Args:
+        sender: The User model class.
+        instance: The saved user.
+        created: True if the user was just created.
+        update_fields: The fields being saved, or None for all of them.
+        **kwargs: Additional signal arguments.
+    """
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    Profile.objects.filter(user=instance).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def bump_profiles_fragments(sender, instance, **kwargs):
+    """
+    Invalidate the cached rows of the profiles index.
+
+    Args:
+        sender: The Profile model class.
+        instance: The saved or deleted profile.
+        **kwargs: Additional signal arguments.
+    """
+    bump_fragment_version("profiles")
+
+
+@receiver(post_save, sender=User)
+def bump_renamed_user_fragments(sender, instance, **kwargs):
+    """
+    Invalidate the cached rows of the profiles index when a user is renamed.
+
+    Args:
+        sender: The User model class.
+        instance: The saved user.
+        **kwargs: Additional signal arguments.
+    """
+    previous_username = getattr(instance, "_previous_username", None)
+    if previous_username and previous_username != instance.username:
+        bump_fragment_version("profiles")
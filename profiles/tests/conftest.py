@@ -35,3 +35,20 @@ def profile(user):
         Profile: A test profile object.
     """
     return Profile.objects.create(user=user, favorite_city="Paris")
+
+
+@pytest.fixture
+def profiles_batch():
+    """
+    Create five Profile instances with their users.
+
+    Returns:
+        list: The created profiles, in ID order.
+    """
+    return [
+        Profile.objects.create(
+            user=User.objects.create_user(username=f"user{number}"),
+            favorite_city="Paris",
+        )
+        for number in range(1, 6)
+    ]
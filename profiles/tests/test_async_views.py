@@ -0,0 +1,88 @@
+"""
+Tests for the async views of the profiles application.
+
+The views are called directly, as an ASGI server would, with their async
+ORM queries run against the test database.
+"""
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import Http404
+from django.test import RequestFactory
+
+from profiles import async_views
+
+
+@pytest.fixture
+def rf():
+    """
+    Create a request factory.
+
+    Returns:
+        RequestFactory: A Django request factory.
+    """
+    return RequestFactory()
+
+
+@pytest.mark.django_db
+class TestAsyncProfilesIndexView:
+    """Tests for the async profiles index view."""
+
+    def test_index_lists_profiles(self, rf, settings, profiles_batch):
+        """
+        Test that the async index renders the first page of profiles.
+
+        Args:
+            rf: The request factory.
+            settings: The pytest-django settings fixture.
+            profiles_batch: Five profiles.
+        """
+        settings.PROFILES_PAGE_SIZE = 2
+        request = rf.get("/profiles/")
+        response = async_to_sync(async_views.index)(request)
+        assert response.status_code == 200
+        assert list(request.profiles_page) == profiles_batch[:2]
+        assert b"user1" in response.content
+
+    def test_page_runs_a_single_query(
+        self, rf, profiles_batch, django_assert_num_queries
+    ):
+        """
+        Test that the users are joined in the single query of the page.
+
+        Args:
+            rf: The request factory.
+            profiles_batch: Five profiles.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        with django_assert_num_queries(1):
+            async_to_sync(async_views.index)(rf.get("/profiles/"))
+
+
+@pytest.mark.django_db
+class TestAsyncProfileDetailView:
+    """Tests for the async profile detail view."""
+
+    def test_profile_detail(self, rf, profile):
+        """
+        Test that the async detail view renders the profile.
+
+        Args:
+            rf: The request factory.
+            profile: The profile fixture.
+        """
+        response = async_to_sync(async_views.profile)(
+            rf.get("/profiles/"), username="testuser"
+        )
+        assert response.status_code == 200
+        assert b"Paris" in response.content
+        assert response.has_header("ETag")
+
+    def test_unknown_profile_raises_404(self, rf):
+        """
+        Test that an unknown profile raises Http404.
+
+        Args:
+            rf: The request factory.
+        """
+        with pytest.raises(Http404):
+            async_to_sync(async_views.profile)(rf.get("/profiles/"), username="nobody")
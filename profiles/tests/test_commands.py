@@ -0,0 +1,52 @@
+"""
+Tests for the profiles application management commands.
+
+This module contains tests for the export_profiles command.
+"""
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestExportProfilesCommand:
+    """Tests for the export_profiles management command."""
+
+    def test_export_csv(self, tmp_path, profiles_batch):
+        """
+        Test that profiles are exported with the fields of their user.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+            profiles_batch: The profiles_batch fixture.
+        """
+        path = tmp_path / "profiles.csv"
+        call_command("export_profiles", "-o", str(path), stderr=StringIO())
+        with open(path, newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert [row["username"] for row in rows] == [f"user{n}" for n in range(1, 6)]
+        assert rows[0]["favorite_city"] == "Paris"
+        assert "password" not in rows[0]
+
+    def test_export_jsonl_single_query(
+        self, tmp_path, profiles_batch, django_assert_num_queries
+    ):
+        """
+        Test that the JSONL export joins the users in a single query.
+
+        Args:
+            tmp_path: The pytest temporary directory.
+            profiles_batch: The profiles_batch fixture.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        path = tmp_path / "profiles.jsonl"
+        with django_assert_num_queries(1):
+            call_command(
+                "export_profiles", "-o", str(path), "--format", "jsonl", stderr=StringIO()
+            )
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert records[0]["username"] == "user1"
+        assert records[0]["last_login"] is None
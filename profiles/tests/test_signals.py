@@ -0,0 +1,116 @@
+"""
+Tests for the profiles application signals.
+
+This module checks that cached profile pages and the cached rows of the
+profiles index are invalidated when a Profile or its User changes.
+"""
+import pytest
+from django.urls import reverse
+
+from oc_lettings_site.cache import get_fragment_version
+
+
+@pytest.mark.django_db
+class TestProfilePageEviction:
+    """Tests for the eviction of cached profile detail pages."""
+
+    def test_profile_save_evicts_page(self, client, profile):
+        """
+        Test that saving a profile refreshes its cached page.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+        """
+        url = reverse("profiles:profile", args=["testuser"])
+        client.get(url)
+        assert client.get(url)["X-Cache"] == "HIT"
+        profile.favorite_city = "Lyon"
+        profile.save()
+        response = client.get(url)
+        assert response["X-Cache"] == "MISS"
+        assert b"Lyon" in response.content
+
+    def test_user_save_evicts_page(self, client, profile):
+        """
+        Test that saving the user of a profile refreshes its page.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+        """
+        url = reverse("profiles:profile", args=["testuser"])
+        client.get(url)
+        profile.user.email = "new@example.com"
+        profile.user.save()
+        assert b"new@example.com" in client.get(url).content
+
+    def test_username_change_evicts_old_page(self, client, profile):
+        """
+        Test that renaming a user evicts the page of the old username.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+        """
+        old_url = reverse("profiles:profile", args=["testuser"])
+        client.get(old_url)
+        profile.user.username = "renamed"
+        profile.user.save()
+        assert client.get(old_url).status_code == 404
+        assert client.get(reverse("profiles:profile", args=["renamed"])).status_code == 200
+
+    def test_last_login_update_skips_username_lookup(
+        self, profile, django_assert_num_queries
+    ):
+        """
+        Test that a save restricted to last_login does not look up the username.
+
+        Args:
+            profile: The profile fixture.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        with django_assert_num_queries(1):
+            profile.user.save(update_fields=["last_login"])
+
+
+@pytest.mark.django_db
+class TestProfilesRowsFragment:
+    """Tests for the cached rows of the profiles index."""
+
+    def test_rename_bumps_version(self, client, profile):
+        """
+        Test that renaming a user refreshes the rows of the index.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+        """
+        url = reverse("profiles:index")
+        assert b"testuser" in client.get(url).content
+        profile.user.username = "renamed"
+        profile.user.save()
+        assert b"renamed" in client.get(url).content
+
+    def test_other_user_saves_keep_version(self, profile):
+        """
+        Test that saving a user without renaming it keeps the cached rows.
+
+        Args:
+            profile: The profile fixture.
+        """
+        version = get_fragment_version("profiles")
+        profile.user.email = "new@example.com"
+        profile.user.save()
+        assert get_fragment_version("profiles") == version
+
+    def test_profile_delete_bumps_version(self, profile):
+        """
+        Test that deleting a profile invalidates the rows.
+
+        Args:
+            profile: The profile fixture.
+        """
+        version = get_fragment_version("profiles")
+        profile.delete()
+        assert get_fragment_version("profiles") != version
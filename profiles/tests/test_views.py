@@ -75,3 +75,104 @@ class TestProfileDetailView:
         )
         assert response.context["profile"].user.username == "testuser"
         assert response.context["profile"].favorite_city == "Paris"
+
+
+@pytest.mark.django_db
+class TestProfilesIndexPagination:
+    """Tests for the keyset pagination of the profiles index view."""
+
+    def test_pages(self, client, settings, profiles_batch):
+        """
+        Test that the cursors navigate between pages of profiles.
+
+        Args:
+            client: The Django test client.
+            settings: The pytest-django settings fixture.
+            profiles_batch: The profiles_batch fixture.
+        """
+        settings.PROFILES_PAGE_SIZE = 2
+        url = reverse("profiles:index")
+        page = client.get(url).context["page"]
+        assert list(page) == profiles_batch[:2]
+
+        page = client.get(url, {"after": page.next_cursor}).context["page"]
+        assert list(page) == profiles_batch[2:4]
+        assert page.has_previous and page.has_next
+
+    def test_usernames_are_listed(self, client, profiles_batch):
+        """
+        Test that each profile of the page links to its username.
+
+        Args:
+            client: The Django test client.
+            profiles_batch: The profiles_batch fixture.
+        """
+        response = client.get(reverse("profiles:index"))
+        for profile in profiles_batch:
+            assert f'href="/profiles/{profile.user.username}/"' in response.content.decode()
+
+    @pytest.mark.parametrize("page_size", [1, 5])
+    def test_page_query_count_is_constant(
+        self, client, settings, profiles_batch, page_size, django_assert_num_queries
+    ):
+        """
+        Test that a page runs one query whatever its size (no N+1 on User).
+
+        Args:
+            client: The Django test client.
+            settings: The pytest-django settings fixture.
+            profiles_batch: The profiles_batch fixture.
+            page_size: The number of profiles per page.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        settings.PROFILES_PAGE_SIZE = page_size
+        with django_assert_num_queries(1):
+            client.get(reverse("profiles:index"))
+
+
+@pytest.mark.django_db
+class TestProfilesConditionalGet:
+    """Tests for the conditional GET support of the profiles views."""
+
+    def test_unchanged_profile_returns_304(
+        self, client, profile, django_assert_num_queries
+    ):
+        """
+        Test that a current ETag answers 304 after a single query.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+            django_assert_num_queries: The pytest-django query counter.
+        """
+        url = reverse("profiles:profile", args=["testuser"])
+        etag = client.get(url)["ETag"]
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_user_change_invalidates_etag(self, client, profile):
+        """
+        Test that changing the user changes the profile ETag.
+
+        Args:
+            client: The Django test client.
+            profile: The profile fixture.
+        """
+        url = reverse("profiles:profile", args=["testuser"])
+        etag = client.get(url)["ETag"]
+        profile.user.first_name = "Ada"
+        profile.user.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_unchanged_index_returns_304(self, client, profiles_batch):
+        """
+        Test that an unchanged profiles index page answers 304.
+
+        Args:
+            client: The Django test client.
+            profiles_batch: The profiles_batch fixture.
+        """
+        url = reverse("profiles:index")
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
@@ -4,13 +4,17 @@ URL configuration for the profiles application.
 This module defines the URL patterns for the profiles app,
 including the list view and detail view for individual profiles.
 """
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'profiles'
 
+# The async views serve the same pages under ASGI
+pages = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('<str:username>/', views.profile, name='profile'),
+    path('', pages.index, name='index'),
+    path('<str:username>/', pages.profile, name='profile'),
 ]
@@ -5,17 +5,92 @@ This module contains the view functions for displaying user profiles.
 """
 import logging
 
+from django.conf import settings
 from django.http import Http404
 from django.shortcuts import render
 
+from oc_lettings_site.cache import cache_response, fragment_context, get_fragment_version
+from oc_lettings_site.conditional import conditional_page, rows_state
+from oc_lettings_site.pagination import get_keyset_page
+from oc_lettings_site.replicas import replica_reads
+
 from .models import Profile
 
 logger = logging.getLogger(__name__)
 
 
+def get_index_page(request):
+    """
+    Return the profiles index page requested by the cursors of the query string.
+
+    The page is built once per request and shared by the view and its
+    conditional GET state, so both run the same single query.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        KeysetPage: The requested page.
+    """
+    if not hasattr(request, "profiles_page"):
+        request.profiles_page = get_keyset_page(
+            request,
+            Profile.objects.select_related("user").only(
+                "id", "updated_at", "user__username"
+            ),
+            settings.PROFILES_PAGE_SIZE,
+        )
+    return request.profiles_page
+
+
+def index_state(request):
+    """
+    Compute the state of a profiles index page for conditional GET.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        tuple: The fingerprint and the last modification date of the page.
+    """
+    page = get_index_page(request)
+    fingerprint, last_modified = rows_state((row.pk, row.updated_at) for row in page)
+    return f"{fingerprint}|{page.has_previous}|{page.has_next}", last_modified
+
+
+def profile_state(request, username):
+    """
+    Compute the state of a profile detail page for conditional GET.
+
+    Args:
+        request: The HTTP request object.
+        username: The username of the profile.
+
+    Returns:
+        tuple: The fingerprint and the last modification date of the page,
+        or None if the profile does not exist.
+    """
+    row = (
+        Profile.objects.filter(user__username=username)
+        .values_list("id", "updated_at")
+        .first()
+    )
+    if row is None:
+        return None
+    return rows_state([row])
+
+
+@replica_reads
+@conditional_page(index_state)
 def index(request):
     """
-    Display list of all profiles.
+    Display a page of profiles.
+
+    Profiles are paginated by ID with the ``after``/``before`` cursors of
+    the query string. The user is joined in the same query and only the
+    username is loaded, so a page runs a single query whatever its size.
+    The rendered rows are cached until a profile or a username changes,
+    and unchanged pages are answered with 304 Not Modified.
 
     Args:
         request: The HTTP request object.
@@ -24,16 +99,25 @@ def index(request):
         HttpResponse: The rendered profiles list template.
     """
     logger.info("Profiles index page accessed")
-    profiles_list = Profile.objects.all()
-    logger.debug("Retrieved %d profiles", profiles_list.count())
-    context = {'profiles_list': profiles_list}
+    page = get_index_page(request)
+    context = {
+        'profiles_list': page,
+        'page': page,
+        **fragment_context(get_fragment_version("profiles"), page),
+    }
     return render(request, 'profiles/index.html', context)
 
 
+@replica_reads
+@conditional_page(profile_state)
+@cache_response("profile", "username")
 def profile(request, username):
     """
     Display details of a specific profile.
 
+    Rendered pages are cached until the profile or its user changes,
+    and unchanged pages are answered with 304 Not Modified.
+
     Args:
         request: The HTTP request object.
         username: The username of the profile to display.
@@ -46,7 +130,7 @@ def profile(request, username):
     """
     logger.info("Profile detail page accessed for username: %s", username)
     try:
-        profile = Profile.objects.get(user__username=username)
+        profile = Profile.objects.select_related("user").get(user__username=username)
         logger.debug("Found profile for user: %s", username)
     except Profile.DoesNotExist:
         logger.error("Profile for username '%s' not found", username)